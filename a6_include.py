@@ -5,6 +5,17 @@
 #              are available and how they're implemented.
 #              Don't modify the contents of this file.
 
+import functools
+import os
+import pickle
+import struct
+import zlib
+
+try:
+    import numpy as np
+except ImportError:  # batch hashing falls back to the scalar functions
+    np = None
+
 
 # -------------- Used by both HashMaps (SC & OA)  -------------- #
 
@@ -96,6 +107,498 @@ def hash_function_2(key: str) -> int:
     return hash
 
 
+# hashes below are kept to 64 bits, like the C implementations
+_MASK_64 = (1 << 64) - 1
+
+_FNV_OFFSET_BASIS = 0xCBF29CE484222325
+_FNV_PRIME = 0x100000001B3
+
+
+def fnv1a_hash(key: str, seed: int = 0) -> int:
+    """
+    64-bit FNV-1a hash of the UTF-8 bytes of the key.
+    Unlike the sample functions, anagrams and keys that only differ in
+    their last characters spread over the whole table. A seed is folded
+    into the offset basis with XOR, so the default of 0 gives standard
+    FNV-1a.
+    """
+    hash = _FNV_OFFSET_BASIS ^ (seed & _MASK_64)
+    for byte in key.encode('utf-8', 'surrogatepass'):
+        hash = ((hash ^ byte) * _FNV_PRIME) & _MASK_64
+    return hash
+
+
+_XXH_PRIME_1 = 0x9E3779B185EBCA87
+_XXH_PRIME_2 = 0xC2B2AE3D27D4EB4F
+_XXH_PRIME_3 = 0x165667B19E3779F9
+_XXH_PRIME_4 = 0x85EBCA77C2B2AE63
+_XXH_PRIME_5 = 0x27D4EB2F165667C5
+
+
+def _rotate_left(value: int, bits: int) -> int:
+    """Rotate a 64-bit value left by the given amount of bits."""
+    return ((value << bits) | (value >> (64 - bits))) & _MASK_64
+
+
+def _xxh_round(accumulator: int, lane: int) -> int:
+    """Mix one 8-byte lane into an xxHash64 accumulator."""
+    accumulator = (accumulator + lane * _XXH_PRIME_2) & _MASK_64
+    return (_rotate_left(accumulator, 31) * _XXH_PRIME_1) & _MASK_64
+
+
+def _xxh_merge(hash: int, accumulator: int) -> int:
+    """Fold one of the four xxHash64 accumulators into the hash."""
+    hash ^= _xxh_round(0, accumulator)
+    return (hash * _XXH_PRIME_1 + _XXH_PRIME_4) & _MASK_64
+
+
+def xxh64_hash(key: str, seed: int = 0) -> int:
+    """
+    xxHash64 of the UTF-8 bytes of the key, matching the reference
+    implementation. Maps built with different seeds (for example through
+    functools.partial(xxh64_hash, seed=...)) place the same keys
+    differently, so colliding key sets can't be prepared in advance.
+    """
+    data = key.encode('utf-8', 'surrogatepass')
+    length = len(data)
+    seed &= _MASK_64
+    position = 0
+
+    if length >= 32:
+        # four accumulators over 32-byte stripes
+        accumulators = [(seed + _XXH_PRIME_1 + _XXH_PRIME_2) & _MASK_64,
+                        (seed + _XXH_PRIME_2) & _MASK_64,
+                        seed,
+                        (seed - _XXH_PRIME_1) & _MASK_64]
+        while position + 32 <= length:
+            for lane in range(4):
+                accumulators[lane] = _xxh_round(
+                    accumulators[lane], int.from_bytes(
+                        data[position:position + 8], 'little'))
+                position += 8
+
+        hash = (_rotate_left(accumulators[0], 1)
+                + _rotate_left(accumulators[1], 7)
+                + _rotate_left(accumulators[2], 12)
+                + _rotate_left(accumulators[3], 18)) & _MASK_64
+        for accumulator in accumulators:
+            hash = _xxh_merge(hash, accumulator)
+    else:
+        hash = (seed + _XXH_PRIME_5) & _MASK_64
+
+    hash = (hash + length) & _MASK_64
+
+    # the tail that didn't fill a whole stripe
+    while position + 8 <= length:
+        lane = int.from_bytes(data[position:position + 8], 'little')
+        hash ^= _xxh_round(0, lane)
+        hash = (_rotate_left(hash, 27) * _XXH_PRIME_1
+                + _XXH_PRIME_4) & _MASK_64
+        position += 8
+    if position + 4 <= length:
+        word = int.from_bytes(data[position:position + 4], 'little')
+        hash ^= (word * _XXH_PRIME_1) & _MASK_64
+        hash = (_rotate_left(hash, 23) * _XXH_PRIME_2
+                + _XXH_PRIME_3) & _MASK_64
+        position += 4
+    while position < length:
+        hash ^= (data[position] * _XXH_PRIME_5) & _MASK_64
+        hash = (_rotate_left(hash, 11) * _XXH_PRIME_1) & _MASK_64
+        position += 1
+
+    # final avalanche
+    hash ^= hash >> 33
+    hash = (hash * _XXH_PRIME_2) & _MASK_64
+    hash ^= hash >> 29
+    hash = (hash * _XXH_PRIME_3) & _MASK_64
+    hash ^= hash >> 32
+    return hash
+
+
+def builtin_hash(key: str) -> int:
+    """
+    Python's own hash of the key, as a non-negative 64-bit int.
+    It is the fastest of the functions here, but string hashes change
+    between interpreter runs unless PYTHONHASHSEED is set.
+    """
+    return hash(key) & _MASK_64
+
+
+def seeded_hash(function, seed) -> object:
+    """
+    Return a hash function with a seed mixed into the hash of every key,
+    so that where keys land can't be predicted without the seed.
+
+    Mixing the seed into what function returns wouldn't help, the keys it
+    already hashes alike (every anagram, for hash_function_1) would still
+    collide. The seed has to go in with the key, so only functions that
+    take a seed of their own can be seeded: xxh64_hash and fnv1a_hash.
+    Both hash the same way in every process, so the same int seed always
+    gives the same placement.
+
+    :param function: The hash function the map was given.
+    :param seed: An int, or "random" for one from os.urandom().
+    :return: The seeded hash function.
+    :raise ValueError: The seed is invalid, or function takes no seed.
+    """
+    if function not in SEEDABLE_HASH_FUNCTIONS:
+        raise ValueError(_function_name(function) + " takes no seed, use "
+                         "xxh64_hash or fnv1a_hash to seed a map")
+    if seed == "random":
+        seed = int.from_bytes(os.urandom(8), "little")
+    elif not isinstance(seed, int) or isinstance(seed, bool):
+        raise ValueError("seed must be an int or 'random'")
+    seed &= _MASK_64
+
+    def seeded(key: str) -> int:
+        return function(key, seed)
+
+    return functools.wraps(function)(seeded)
+
+
+# every hash function above, by name
+HASH_FUNCTIONS = {
+    "hash_function_1": hash_function_1,
+    "hash_function_2": hash_function_2,
+    "fnv1a_hash": fnv1a_hash,
+    "xxh64_hash": xxh64_hash,
+    "builtin_hash": builtin_hash,
+}
+
+# hash functions that take a seed as their second argument
+SEEDABLE_HASH_FUNCTIONS = (fnv1a_hash, xxh64_hash)
+
+
+# longest key whose hash_function_2 value is sure to fit in an int64
+_MAX_BATCH_KEY_LENGTH = 4000000
+
+
+def _code_points(keys: list) -> tuple:
+    """
+    Flatten the keys into one array of code points, along with where each
+    key starts in it and how long each key is.
+    """
+    lengths = np.fromiter((len(key) for key in keys), dtype=np.int64,
+                          count=len(keys))
+    starts = np.cumsum(lengths) - lengths
+    encoded = ''.join(keys).encode('utf-32-le', 'surrogatepass')
+    points = np.frombuffer(encoded, dtype='<u4').astype(np.int64)
+    return points, starts, lengths
+
+
+def _sum_per_key(values, starts, lengths):
+    """Add up the values that belong to each key, 0 for empty keys."""
+    sums = np.zeros(len(lengths), dtype=np.int64)
+    filled = lengths > 0
+    if filled.any():
+        # empty keys add no values, so the next start ends each segment
+        sums[filled] = np.add.reduceat(values, starts[filled])
+    return sums
+
+
+def hash_function_1_batch(keys) -> object:
+    """
+    Hash many keys at once, matching hash_function_1 for every key.
+    Returns an int64 numpy array, or a list when numpy isn't installed.
+    """
+    keys = list(keys)
+    if np is None:
+        return [hash_function_1(key) for key in keys]
+    if not keys:
+        return np.zeros(0, dtype=np.int64)
+
+    points, starts, lengths = _code_points(keys)
+    return _sum_per_key(points, starts, lengths)
+
+
+def hash_function_2_batch(keys) -> object:
+    """
+    Hash many keys at once, matching hash_function_2 for every key.
+    Returns an int64 numpy array, or a list when numpy isn't installed.
+    """
+    keys = list(keys)
+    if np is None:
+        return [hash_function_2(key) for key in keys]
+    if not keys:
+        return np.zeros(0, dtype=np.int64)
+
+    points, starts, lengths = _code_points(keys)
+
+    # hashes of very long keys could overflow an int64
+    if lengths.max() > _MAX_BATCH_KEY_LENGTH:
+        return np.array([hash_function_2(key) for key in keys], dtype=object)
+
+    # weight every code point by its 1-based position inside its key
+    positions = np.arange(len(points), dtype=np.int64) - \
+        np.repeat(starts, lengths) + 1
+    return _sum_per_key(points * positions, starts, lengths)
+
+
+# batch form of each sample hash function
+BATCH_HASH_FUNCTIONS = {
+    hash_function_1: hash_function_1_batch,
+    hash_function_2: hash_function_2_batch,
+}
+
+
+def hash_keys(function, keys: list) -> list:
+    """
+    Hash every key with the provided function, through its batch form
+    when it has one. Returns a list of ints.
+    """
+    batch_function = BATCH_HASH_FUNCTIONS.get(function)
+    if batch_function is None:
+        return [function(key) for key in keys]
+
+    key_hashes = batch_function(keys)
+    if isinstance(key_hashes, list):
+        return key_hashes
+    return key_hashes.tolist()
+
+
+class MapStats:
+    """
+    Counters a HashMap keeps when it is built with stats=True.
+    The maps only touch it behind an 'is not None' check, so a map
+    without stats pays next to nothing for it.
+    """
+
+    def __init__(self, lengths_name: str) -> None:
+        """
+        Initialize zeroed counters.
+        lengths_name labels the length histogram in snapshots, since the
+        maps measure different things (chain or probe lengths).
+        """
+        self.lengths_name = lengths_name
+        self.operations = {"put": 0, "get": 0, "contains_key": 0,
+                           "remove": 0}
+        self.hits = 0
+        self.misses = 0
+        self.lengths = {}
+        self.resizes = 0
+        self.resize_seconds = 0.0
+        self.compactions = 0
+
+    def count(self, operation: str, amount: int = 1) -> None:
+        """Count calls of an operation."""
+        self.operations[operation] += amount
+
+    def lookup(self, operation: str, hit: bool) -> None:
+        """Count a call of an operation that looks a key up."""
+        self.operations[operation] += 1
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def batch(self, operation: str, calls: int, hits: int) -> None:
+        """Count many calls of an operation that looks keys up."""
+        self.operations[operation] += calls
+        self.hits += hits
+        self.misses += calls - hits
+
+    def length(self, length: int) -> None:
+        """Add a chain or probe length to the histogram."""
+        self.lengths[length] = self.lengths.get(length, 0) + 1
+
+    def resized(self, seconds: float) -> None:
+        """Count a resize and the time it took."""
+        self.resizes += 1
+        self.resize_seconds += seconds
+
+    def snapshot(self) -> dict:
+        """Return a copy of the counters as plain dicts and numbers."""
+        total = sum(self.lengths.values())
+        weighted = sum(length * amount
+                       for length, amount in self.lengths.items())
+        return {
+            "operations": dict(self.operations),
+            "hits": self.hits,
+            "misses": self.misses,
+            self.lengths_name: {
+                "histogram": dict(sorted(self.lengths.items())),
+                "mean": weighted / total if total else 0.0,
+                "max": max(self.lengths) if self.lengths else 0,
+            },
+            "resizes": self.resizes,
+            "resize_seconds": self.resize_seconds,
+            "compactions": self.compactions,
+        }
+
+
+# snapshot files: header and its CRC-32, length-prefixed records, then a
+# CRC-32 of everything before it
+_SNAPSHOT_MAGIC = b"HMSN"
+_SNAPSHOT_VERSION = 1
+_SNAPSHOT_HEADER = struct.Struct("<4sHQQB")
+_SNAPSHOT_RECORD = struct.Struct("<II")
+_SNAPSHOT_CHECKSUM = struct.Struct("<I")
+
+# bytes buffered per write, and read per chunk
+_SNAPSHOT_CHUNK = 1 << 16
+
+
+def _function_name(function) -> str:
+    """Return the HASH_FUNCTIONS name of a function, or its own name."""
+    # a seeded function is saved under the name of the one it wraps
+    function = getattr(function, "__wrapped__", function)
+    for name, known_function in HASH_FUNCTIONS.items():
+        if known_function is function:
+            return name
+    return function.__name__
+
+
+def write_snapshot(path: str, capacity: int, function, size: int,
+                   pairs) -> None:
+    """
+    Writes the pairs of a map to a snapshot file: a header with the
+    format version, capacity, size and hash function name, then a
+    (key length, value length) prefixed record per pair, with the key in
+    UTF-8 and the value pickled. The header has a CRC-32 of its own so it
+    can be trusted before any record is read, and the file ends with a
+    CRC-32 of everything before it.
+    Records are written in chunks, so the file is never built in memory.
+
+    :param path: The file to write.
+    :param capacity: The capacity of the map.
+    :param function: The hash function of the map.
+    :param size: The amount of pairs.
+    :param pairs: An iterable of exactly size (key, value) tuples.
+    """
+    name = _function_name(function).encode("utf-8")
+    if len(name) > 255:
+        raise ValueError("hash function names are limited to 255 bytes")
+
+    buffer = bytearray(_SNAPSHOT_HEADER.pack(
+        _SNAPSHOT_MAGIC, _SNAPSHOT_VERSION, capacity, size, len(name)))
+    buffer += name
+    buffer += _SNAPSHOT_CHECKSUM.pack(zlib.crc32(buffer))
+    checksum = 0
+    written = 0
+
+    with open(path, "wb") as file:
+        for key, value in pairs:
+            key_bytes = key.encode("utf-8", "surrogatepass")
+            value_bytes = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            buffer += _SNAPSHOT_RECORD.pack(len(key_bytes), len(value_bytes))
+            buffer += key_bytes
+            buffer += value_bytes
+            written += 1
+
+            if len(buffer) >= _SNAPSHOT_CHUNK:
+                checksum = zlib.crc32(buffer, checksum)
+                file.write(buffer)
+                buffer = bytearray()
+
+        if written != size:
+            raise ValueError("the map changed while it was written")
+
+        checksum = zlib.crc32(buffer, checksum)
+        buffer += _SNAPSHOT_CHECKSUM.pack(checksum)
+        file.write(buffer)
+
+
+def read_snapshot(path: str, function=None) -> (int, object, int, object):
+    """
+    Opens a snapshot file written by write_snapshot(). The values are
+    unpickled, so only read snapshots from a trusted source.
+
+    :param path: The file to read.
+    :param function: The hash function for the map, looked up in
+    HASH_FUNCTIONS by the stored name when not given.
+    :return: int: The capacity of the map that was written.
+    :return: function: The hash function to use.
+    :return: int: The amount of pairs.
+    :return: generator: Yields the pairs as lists of (key, value) tuples,
+    a chunk at a time, and raises ValueError once it finds the file is
+    corrupt or truncated.
+    """
+    file = open(path, "rb")
+    try:
+        header = file.read(_SNAPSHOT_HEADER.size)
+        if len(header) < _SNAPSHOT_HEADER.size:
+            raise ValueError(path + " is not a hash map snapshot")
+
+        magic, version, capacity, size, name_length = \
+            _SNAPSHOT_HEADER.unpack(header)
+        if magic != _SNAPSHOT_MAGIC:
+            raise ValueError(path + " is not a hash map snapshot")
+        if version != _SNAPSHOT_VERSION:
+            raise ValueError(path + " has unsupported snapshot version " +
+                             str(version))
+
+        name_bytes = file.read(name_length)
+        header_checksum = file.read(_SNAPSHOT_CHECKSUM.size)
+        checksum = zlib.crc32(name_bytes, zlib.crc32(header))
+        if len(header_checksum) < _SNAPSHOT_CHECKSUM.size or \
+                _SNAPSHOT_CHECKSUM.unpack(header_checksum)[0] != checksum:
+            raise ValueError(path + " has a corrupt header")
+
+        name = name_bytes.decode("utf-8")
+        if function is None:
+            function = HASH_FUNCTIONS.get(name)
+            if function is None:
+                raise ValueError(path + " was written with the hash "
+                                 "function " + name + ", pass it in")
+    except BaseException:
+        file.close()
+        raise
+
+    checksum = zlib.crc32(header_checksum, checksum)
+    return capacity, function, size, _snapshot_chunks(path, file, checksum,
+                                                      size)
+
+
+def _snapshot_chunks(path: str, file, checksum: int, size: int):
+    """
+    Reads the records of a snapshot a chunk at a time, keeping the CRC-32
+    up to date, and checks it and the record count at the end.
+    """
+    with file:
+        pending = b""
+        found = 0
+
+        while True:
+            data = file.read(_SNAPSHOT_CHUNK)
+            if not data:
+                break
+            pending += data
+
+            # parse every complete record, the checksum's 4 bytes and any
+            # cut-off record wait for the next chunk
+            pairs = []
+            offset = 0
+            while len(pending) - offset >= \
+                    _SNAPSHOT_RECORD.size + _SNAPSHOT_CHECKSUM.size:
+                key_length, value_length = \
+                    _SNAPSHOT_RECORD.unpack_from(pending, offset)
+                end = offset + _SNAPSHOT_RECORD.size + key_length + \
+                    value_length
+                if end + _SNAPSHOT_CHECKSUM.size > len(pending) or \
+                        found + len(pairs) == size:
+                    break
+
+                key_start = offset + _SNAPSHOT_RECORD.size
+                try:
+                    pairs.append((
+                        pending[key_start:key_start + key_length]
+                        .decode("utf-8", "surrogatepass"),
+                        pickle.loads(pending[key_start + key_length:end])))
+                except Exception as error:
+                    raise ValueError(path + " is corrupt") from error
+                offset = end
+
+            checksum = zlib.crc32(pending[:offset], checksum)
+            pending = pending[offset:]
+            found += len(pairs)
+            if pairs:
+                yield pairs
+
+        if found != size or len(pending) != _SNAPSHOT_CHECKSUM.size or \
+                _SNAPSHOT_CHECKSUM.unpack(pending)[0] != checksum:
+            raise ValueError(path + " is corrupt or truncated")
+
+
 # --------- For use in Separate Chaining (SC) HashMap  --------- #
 
 class SLNode:
@@ -103,6 +606,8 @@ class SLNode:
     Singly Linked List node for use in a hash map
     """
 
+    __slots__ = ("key", "value", "next")
+
     def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
         """Initialize node given a key and value."""
         self.key = key
@@ -141,7 +646,8 @@ class LinkedListIterator:
 class LinkedList:
     """
     Class implementing a Singly Linked List
-    Supported methods are: insert, remove, contains, length, iterator
+    Supported methods are: insert, insert_node, remove, remove_node,
+    pop_front, contains, length, iterator
     """
 
     def __init__(self) -> None:
@@ -173,11 +679,24 @@ class LinkedList:
         self._head = SLNode(key, value, self._head)
         self._size += 1
 
+    def insert_node(self, node: SLNode) -> None:
+        """Link an existing node in at front of the list."""
+        node.next = self._head
+        self._head = node
+        self._size += 1
+
     def remove(self, key: str) -> bool:
         """
         Remove first node with matching key.
         Return True if removal was successful, False otherwise.
         """
+        return self.remove_node(key) is not None
+
+    def remove_node(self, key: str) -> SLNode:
+        """
+        Remove first node with matching key.
+        Return the unlinked node, or None if no match.
+        """
         previous, node = None, self._head
         while node:
 
@@ -187,10 +706,20 @@ class LinkedList:
                 else:
                     self._head = node.next
                 self._size -= 1
-                return True
+                node.next = None
+                return node
 
             previous, node = node, node.next
-        return False
+        return None
+
+    def pop_front(self) -> SLNode:
+        """Unlink the node at front of the list and return it."""
+        node = self._head
+        if node:
+            self._head = node.next
+            self._size -= 1
+            node.next = None
+        return node
 
     def contains(self, key: str) -> SLNode:
         """Return node with matching key, or None if no match"""
@@ -206,14 +735,200 @@ class LinkedList:
         return self._size
 
 
+class _TreeNode:
+    """
+    Node of a TreeChain, holding one SLNode of the chain
+    """
+
+    __slots__ = ("node", "left", "right", "height")
+
+    def __init__(self, node: SLNode) -> None:
+        """Initialize a leaf holding the SLNode."""
+        self.node = node
+        self.left = None
+        self.right = None
+        self.height = 1
+
+
+def _tree_height(tree: _TreeNode) -> int:
+    """Return the height of a subtree, 0 for an empty one."""
+    return tree.height if tree else 0
+
+
+def _tree_rotate_left(tree: _TreeNode) -> _TreeNode:
+    """Rotate a subtree left and return its new root."""
+    root = tree.right
+    tree.right = root.left
+    root.left = tree
+    tree.height = 1 + max(_tree_height(tree.left), _tree_height(tree.right))
+    root.height = 1 + max(_tree_height(root.left), _tree_height(root.right))
+    return root
+
+
+def _tree_rotate_right(tree: _TreeNode) -> _TreeNode:
+    """Rotate a subtree right and return its new root."""
+    root = tree.left
+    tree.left = root.right
+    root.right = tree
+    tree.height = 1 + max(_tree_height(tree.left), _tree_height(tree.right))
+    root.height = 1 + max(_tree_height(root.left), _tree_height(root.right))
+    return root
+
+
+def _tree_rebalance(tree: _TreeNode) -> _TreeNode:
+    """
+    Fix the height of a subtree whose children changed, rotating it when
+    they differ in height by more than one. Returns its new root.
+    """
+    left, right = _tree_height(tree.left), _tree_height(tree.right)
+    tree.height = 1 + max(left, right)
+
+    if left > right + 1:
+        if _tree_height(tree.left.left) < _tree_height(tree.left.right):
+            tree.left = _tree_rotate_left(tree.left)
+        return _tree_rotate_right(tree)
+    if right > left + 1:
+        if _tree_height(tree.right.right) < _tree_height(tree.right.left):
+            tree.right = _tree_rotate_right(tree.right)
+        return _tree_rotate_left(tree)
+    return tree
+
+
+class TreeChain:
+    """
+    Class implementing a chain as an AVL tree ordered by key, for a bucket
+    whose linked list grew too long. It holds SLNodes and supports the
+    methods of LinkedList, but contains, insert_node and remove_node take
+    O(log n) time. Iterating goes in key order, and keys must be orderable.
+    """
+
+    def __init__(self, nodes=None) -> None:
+        """
+        Initialize new tree, with the SLNodes of an iterable if given.
+        """
+        self._root = None
+        self._size = 0
+        for node in nodes or ():
+            self.insert_node(node)
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return 'TREE [' + ' -> '.join(str(node) for node in self) + ']'
+
+    def __iter__(self):
+        """Return an iterator over the nodes, in key order."""
+        stack, tree = [], self._root
+        while stack or tree:
+            while tree:
+                stack.append(tree)
+                tree = tree.left
+            tree = stack.pop()
+            yield tree.node
+            tree = tree.right
+
+    def insert(self, key: str, value: object) -> None:
+        """Insert new node for a key that isn't in the tree."""
+        self.insert_node(SLNode(key, value))
+
+    def insert_node(self, node: SLNode) -> None:
+        """Link an existing node, whose key isn't in the tree, in."""
+        node.next = None
+        self._root = self._insert(self._root, node)
+        self._size += 1
+
+    def _insert(self, tree: _TreeNode, node: SLNode) -> _TreeNode:
+        """Insert a node into a subtree and return its new root."""
+        if tree is None:
+            return _TreeNode(node)
+        if node.key < tree.node.key:
+            tree.left = self._insert(tree.left, node)
+        else:
+            tree.right = self._insert(tree.right, node)
+        return _tree_rebalance(tree)
+
+    def remove(self, key: str) -> bool:
+        """
+        Remove node with matching key.
+        Return True if removal was successful, False otherwise.
+        """
+        return self.remove_node(key) is not None
+
+    def remove_node(self, key: str) -> SLNode:
+        """
+        Remove node with matching key.
+        Return the unlinked node, or None if no match.
+        """
+        self._root, node = self._remove(self._root, key)
+        if node:
+            self._size -= 1
+        return node
+
+    def _remove(self, tree: _TreeNode, key: str) -> (_TreeNode, SLNode):
+        """Remove a key from a subtree, returning its new root and node."""
+        if tree is None:
+            return None, None
+
+        if key == tree.node.key:
+            node = tree.node
+            if tree.left is None:
+                return tree.right, node
+            if tree.right is None:
+                return tree.left, node
+
+            # the smallest node on the right takes the removed one's place
+            tree.right, tree.node = self._pop_min(tree.right)
+        elif key < tree.node.key:
+            tree.left, node = self._remove(tree.left, key)
+        else:
+            tree.right, node = self._remove(tree.right, key)
+
+        return (_tree_rebalance(tree) if node else tree), node
+
+    def _pop_min(self, tree: _TreeNode) -> (_TreeNode, SLNode):
+        """Unlink the smallest node of a subtree, returning its new root."""
+        if tree.left is None:
+            return tree.right, tree.node
+        tree.left, node = self._pop_min(tree.left)
+        return _tree_rebalance(tree), node
+
+    def pop_front(self) -> SLNode:
+        """Unlink the node with the smallest key and return it."""
+        if self._root is None:
+            return None
+        self._root, node = self._pop_min(self._root)
+        self._size -= 1
+        return node
+
+    def contains(self, key: str) -> SLNode:
+        """Return node with matching key, or None if no match"""
+        tree = self._root
+        while tree:
+            if key == tree.node.key:
+                return tree.node
+            tree = tree.left if key < tree.node.key else tree.right
+        return None
+
+    def length(self) -> int:
+        """Return the amount of nodes in the tree."""
+        return self._size
+
+
 # ---------- For use in Open Addressing (OA) HashMap  ---------- #
 
 class HashEntry:
 
-    def __init__(self, key: str, value: object) -> None:
-        """Initialize an entry for use in a hash map."""
+    __slots__ = ("key", "value", "hash_value", "is_tombstone")
+
+    def __init__(self, key: str, value: object,
+                 hash_value: int = None) -> None:
+        """
+        Initialize an entry for use in a hash map.
+        The full (unreduced) hash of the key can be kept in hash_value so
+        the map never has to hash the key again.
+        """
         self.key = key
         self.value = value
+        self.hash_value = hash_value
         self.is_tombstone = False
 
     def __str__(self) -> str:
@@ -0,0 +1,235 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: An asyncio facade for both HashMaps. The methods that walk
+#              the whole table (resize_table, clear, get_keys, find_mode)
+#              run in chunks and hand control back to the event loop in
+#              between, and lookups made by many coroutines at once are
+#              answered together with a single batched get_many().
+
+
+import asyncio
+
+from a6_include import DynamicArray
+from hash_map_sc import FrequencyCounter
+
+
+class AsyncHashMap:
+    """
+    Wraps a chaining or open addressing HashMap for use from an event
+    loop. The single-key methods are plain calls, since they take next
+    to no time. The whole-table methods are coroutines that work through
+    chunk buckets at a time and yield to the loop after each chunk, so
+    other coroutines keep running, and keep using the map, meanwhile.
+
+    A resize runs as an incremental resize of the map: the old and new
+    tables live side by side until every old bucket was moved. Build the
+    map with rehash_step to make the resizes put() starts on its own
+    incremental as well.
+    """
+
+    def __init__(self, hash_map, chunk: int = 1024) -> None:
+        """
+        Initialize the facade.
+
+        :param hash_map: A hash_map_sc or hash_map_oa HashMap.
+        :param chunk: Buckets (or elements) handled between two yields.
+        """
+        if chunk < 1:
+            raise ValueError("chunk must be at least 1")
+
+        self._map = hash_map
+        self._chunk = chunk
+
+        # lookups waiting for the next batch, as (keys, future) tuples
+        self._pending = []
+        self._flush_scheduled = False
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return str(self._map)
+
+    def get_map(self) -> object:
+        """Return the wrapped HashMap."""
+        return self._map
+
+    # ------------------------------------------------------------------ #
+
+    def get_size(self) -> int:
+        """Return size of map."""
+        return self._map.get_size()
+
+    def get_capacity(self) -> int:
+        """Return capacity of map."""
+        return self._map.get_capacity()
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Places or updates an existing key/value pair in the hash map.
+
+        :param key: A string to serve as the key in the key-value pair.
+        :param value: The desired value to store in the hash map.
+        """
+        self._map.put(key, value)
+
+    def get(self, key: str) -> object:
+        """
+        Provides the associated value of the provided key. If key doesn't
+        exist in the hash map, then it returns None.
+
+        :param key: A string as the key in the desired key-value pair.
+        :return: value: An object of the key-value pair.
+        :return: None: The key was not found in the hash map.
+        """
+        return self._map.get(key)
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Verifies if the provided key is in the hash map as a key-value
+        pair.
+
+        :param key: A string as the key in a key-value pair.
+        :return: True: The provided key matched a key-value pair.
+        :return: False: The provided key was not found.
+        """
+        return self._map.contains_key(key)
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the associated key-value pair of the provided key. If key
+        is not in the hash map, then there are no changes to the hash map.
+
+        :param key: A string as the key in the key-value pair.
+        """
+        self._map.remove(key)
+
+    # ------------------------------------------------------------------ #
+
+    async def _run(self, steps) -> object:
+        """
+        Drives a steps generator of the map, yielding to the loop after
+        every step.
+
+        :param steps: A generator from one of the *_steps() methods.
+        :return: The value the generator finished with.
+        """
+        while True:
+            try:
+                next(steps)
+            except StopIteration as finished:
+                return finished.value
+            await asyncio.sleep(0)
+
+    async def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the hash map to the provided capacity, as resize_table()
+        of the map would. The new table is built, and the pairs moved into
+        it, a chunk of buckets at a time; the map stays usable throughout.
+
+        :param new_capacity: A positive integer that must be at least 1.
+        """
+        await self._run(self._map.resize_table_steps(new_capacity,
+                                                     self._chunk))
+
+    async def clear(self) -> None:
+        """
+        Clears all stored data in the hash map, keeping its capacity. The
+        empty table is built a chunk at a time and swapped in at once.
+        """
+        await self._run(self._map.clear_steps(self._chunk))
+
+    async def get_keys(self) -> DynamicArray:
+        """
+        Provides all the keys in the hash map, a chunk of buckets at a
+        time.
+
+        :return: A dynamic array with all the keys in the hash map.
+        :raise RuntimeError: The map was changed before all keys were read.
+        """
+        return await self._run(self._map.get_keys_steps(self._chunk))
+
+    async def find_mode(self, da) -> (DynamicArray, int):
+        """
+        Provides the mode of a collection, like find_mode() of the chaining
+        map, counting a chunk of elements at a time with the map's hash
+        function.
+
+        :param da: A DynamicArray or any iterable of elements.
+        :return: da: A new collection of the mode(s) found.
+        :return: int: A positive integer to represent the freq of the
+        mode, 0 for an empty collection.
+        """
+        if isinstance(da, DynamicArray):
+            counter = FrequencyCounter(capacity=max(da.length() // 3, 1),
+                                       function=self._map.get_hash_function())
+            for start in range(0, da.length(), self._chunk):
+                for index in range(start, min(start + self._chunk,
+                                              da.length())):
+                    counter.add(da.get_at_index(index))
+                await asyncio.sleep(0)
+        else:
+            counter = FrequencyCounter(function=self._map.get_hash_function())
+            counted = 0
+            for element in da:
+                counter.add(element)
+                counted += 1
+                if counted % self._chunk == 0:
+                    await asyncio.sleep(0)
+
+        return counter.mode()
+
+    # ------------------------------------------------------------------ #
+
+    async def aget_many(self, keys) -> DynamicArray:
+        """
+        Provides the values of many keys, with None for every key that
+        isn't in the hash map. The lookups of every coroutine that asks
+        before the loop comes around again are answered by one get_many()
+        over their keys, each distinct key looked up once.
+
+        :param keys: An iterable of keys.
+        :return: A dynamic array with the value of each key, in order.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((list(keys), future))
+
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush)
+
+        return await future
+
+    async def aget(self, key: str) -> object:
+        """
+        Provides the value of a key through the next batch of aget_many().
+
+        :param key: A string as the key in the desired key-value pair.
+        :return: value: An object of the key-value pair.
+        :return: None: The key was not found in the hash map.
+        """
+        values = await self.aget_many((key,))
+        return values.get_at_index(0)
+
+    def _flush(self) -> None:
+        """Answers every pending lookup with a single batched pass."""
+        pending, self._pending = self._pending, []
+        self._flush_scheduled = False
+
+        # look every distinct key up once, in the order first asked
+        distinct = list(dict.fromkeys(key for keys, _ in pending
+                                      for key in keys))
+        try:
+            found = self._map.get_many(distinct)
+        except Exception as error:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        values = {}
+        for index in range(len(distinct)):
+            values[distinct[index]] = found.get_at_index(index)
+
+        for keys, future in pending:
+            if not future.done():
+                future.set_result(DynamicArray([values[key]
+                                                for key in keys]))
@@ -0,0 +1,461 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Reproducible benchmark suite for both HashMap implementations.
+#              Measures throughput and latency percentiles of every map
+#              operation over a sweep of map sizes, key lengths, key
+#              distributions and hash functions, and writes the results
+#              as JSON so runs from different branches can be compared.
+#
+#              python hash_map_bench.py --output results.json
+#              python hash_map_bench.py --baseline main.json --output pr.json
+
+
+import argparse
+import json
+import platform
+import random
+import signal
+import string
+import sys
+import time
+
+import hash_map_oa
+import hash_map_sc
+from a6_include import HASH_FUNCTIONS, SEEDABLE_HASH_FUNCTIONS, DynamicArray
+
+# map variants the sweep can use, by name, each built from a capacity, a
+# hash function and the seed of the sweep
+MAP_FACTORIES = {
+    "sc": lambda capacity, function, seed: hash_map_sc.HashMap(
+        capacity, function, max_load_factor=1.0),
+    "oa": lambda capacity, function, seed: hash_map_oa.HashMap(
+        capacity, function),
+    "oa-compact": lambda capacity, function, seed: hash_map_oa.HashMap(
+        capacity, function, storage="compact"),
+    "oa-robin_hood": lambda capacity, function, seed: hash_map_oa.HashMap(
+        capacity, function, probing="robin_hood"),
+    "oa-group": lambda capacity, function, seed: hash_map_oa.HashMap(
+        capacity, function, probing="group"),
+    "oa-prime": lambda capacity, function, seed: hash_map_oa.HashMap(
+        capacity, function, capacity_policy="prime"),
+    "oa-power_of_two": lambda capacity, function, seed: hash_map_oa.HashMap(
+        capacity, function, capacity_policy="power_of_two"),
+    "sc-tree": lambda capacity, function, seed: hash_map_sc.HashMap(
+        capacity, function, max_load_factor=1.0, treeify_threshold=8),
+    "sc-seeded": lambda capacity, function, seed: hash_map_sc.HashMap(
+        capacity, function, max_load_factor=1.0, seed=seed),
+    "oa-seeded": lambda capacity, function, seed: hash_map_oa.HashMap(
+        capacity, function, seed=seed),
+}
+
+# variants that mix a seed into their hashing, which only run with the
+# hash functions that take a seed
+SEEDED_MAPS = ("sc-seeded", "oa-seeded")
+
+DISTRIBUTIONS = ("uniform", "zipf", "collide")
+
+# capacity every map starts with, so put() pays for its own growth
+INITIAL_CAPACITY = 16
+
+# exponent of the Zipf access pattern
+ZIPF_EXPONENT = 1.1
+
+# latency percentiles reported for every operation
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+class CaseTimeout(Exception):
+    """Raised when a single benchmark case runs past its time budget."""
+    pass
+
+
+# ------------------------- workload generation ------------------------- #
+
+def make_keys(rng: random.Random, count: int, length: int,
+              distribution: str) -> list:
+    """
+    Builds a list of distinct keys.
+
+    :param rng: The random generator to draw from.
+    :param count: The amount of keys.
+    :param length: The length of every key.
+    :param distribution: "collide" builds anagrams of one string, so every
+    key has the same hash_function_1 value. Any other distribution builds
+    random lowercase keys.
+    :return: A list of distinct keys.
+    """
+    keys = set()
+
+    if distribution == "collide":
+        if length < 2:
+            raise ValueError("colliding keys need a length of at least 2")
+
+        # anagrams of a single string all add up to the same ordinals
+        letters = [string.ascii_lowercase[i % 26] for i in range(length)]
+        attempts = 0
+        while len(keys) < count:
+            rng.shuffle(letters)
+            keys.add(''.join(letters))
+            attempts += 1
+            if attempts > count * 50:
+                raise ValueError("not enough anagrams of length "
+                                 + str(length) + " for " + str(count)
+                                 + " keys")
+    else:
+        alphabet = string.ascii_lowercase + string.digits
+        while len(keys) < count:
+            keys.add(''.join(rng.choice(alphabet) for _ in range(length)))
+
+    # sort first so the order only depends on the seed
+    keys = sorted(keys)
+    rng.shuffle(keys)
+    return keys
+
+
+def make_accesses(rng: random.Random, keys: list, count: int,
+                  distribution: str) -> list:
+    """
+    Picks the keys that lookups will ask for.
+
+    :param rng: The random generator to draw from.
+    :param keys: The keys to pick from.
+    :param count: The amount of lookups.
+    :param distribution: "zipf" favors the first keys with a Zipf law,
+    any other distribution picks uniformly.
+    :return: A list of keys in lookup order.
+    """
+    if distribution == "zipf":
+        weights = [1 / (rank + 1) ** ZIPF_EXPONENT
+                   for rank in range(len(keys))]
+        return rng.choices(keys, weights=weights, k=count)
+
+    return [rng.choice(keys) for _ in range(count)]
+
+
+# ----------------------------- measurement ----------------------------- #
+
+def summarize(latencies: list, total: float) -> dict:
+    """
+    Turns the latencies of one operation into a result.
+
+    :param latencies: The time of every call, in nanoseconds.
+    :param total: The time of all calls together, in seconds.
+    :return: A dict with the amount of calls, their throughput and their
+    latency percentiles.
+    """
+    ordered = sorted(latencies)
+    count = len(ordered)
+
+    latency = {"mean": sum(ordered) / count, "max": ordered[-1]}
+    for percentile in PERCENTILES:
+        index = min(count - 1, int(count * percentile / 100))
+        latency["p" + str(percentile).replace(".", "")] = ordered[index]
+
+    return {
+        "ops": count,
+        "total_s": total,
+        "ops_per_s": count / total if total > 0 else None,
+        "latency_ns": latency,
+    }
+
+
+def time_calls(function, arguments: list) -> dict:
+    """
+    Calls a function once per argument and times every call.
+
+    :param function: A function taking a single argument.
+    :param arguments: The argument of every call, in order.
+    :return: The summary of the calls.
+    """
+    clock = time.perf_counter_ns
+    latencies = [0] * len(arguments)
+
+    start = time.perf_counter()
+    for index in range(len(arguments)):
+        before = clock()
+        function(arguments[index])
+        latencies[index] = clock() - before
+    total = time.perf_counter() - start
+
+    return summarize(latencies, total)
+
+
+def time_repeated(function, repeat: int) -> dict:
+    """
+    Calls a function without arguments a few times and times every call.
+
+    :param function: The function to call.
+    :param repeat: How many times to call it.
+    :return: The summary of the calls.
+    """
+    return time_calls(lambda _: function(), [None] * repeat)
+
+
+def bench_map(map_name: str, function, keys: list, accesses: list,
+              misses: list, repeat: int, seed: int = 0) -> dict:
+    """
+    Runs every operation of one map variant over one workload.
+
+    :param map_name: A key of MAP_FACTORIES.
+    :param function: The hash function.
+    :param keys: The keys to insert.
+    :param accesses: The keys lookups ask for, all present.
+    :param misses: Keys that are not in the map.
+    :param repeat: How many times the whole-table operations run.
+    :param seed: The seed of the sweep, for the seeded variants.
+    :return: A dict with the summary of every operation.
+    """
+    factory = MAP_FACTORIES[map_name]
+    results = {}
+
+    hash_map = factory(INITIAL_CAPACITY, function, seed)
+    results["put"] = time_calls(lambda key: hash_map.put(key, key), keys)
+    results["get_hit"] = time_calls(hash_map.get, accesses)
+    results["get_miss"] = time_calls(hash_map.get, misses)
+    results["contains_key"] = time_calls(hash_map.contains_key,
+                                         accesses[::2] + misses[::2])
+    results["get_keys"] = time_repeated(hash_map.get_keys, repeat)
+
+    # grow and shrink back so every resize moves the same pairs
+    capacities = [hash_map.get_capacity() * 2, hash_map.get_capacity()]
+    results["resize_table"] = time_calls(
+        hash_map.resize_table, (capacities * repeat)[:repeat])
+
+    results["remove"] = time_calls(hash_map.remove, keys)
+    return results
+
+
+def bench_find_mode(accesses: list, repeat: int) -> dict:
+    """
+    Times find_mode over the accessed keys.
+
+    :param accesses: The elements to find the mode of.
+    :param repeat: How many times to run it.
+    :return: The summary of the calls.
+    """
+    da = DynamicArray(accesses)
+    return time_repeated(lambda: hash_map_sc.find_mode(da), repeat)
+
+
+def runs_with(map_name: str, function_name: str) -> bool:
+    """
+    Return True when a map variant can be built with a hash function,
+    False for a seeded variant given a function that takes no seed.
+    """
+    return map_name not in SEEDED_MAPS or \
+        HASH_FUNCTIONS[function_name] in SEEDABLE_HASH_FUNCTIONS
+
+
+def run_case(case_timeout: float, function, *args) -> object:
+    """
+    Runs one benchmark case, giving up after its time budget when the
+    platform has interval timers. Weak hash functions can make probing
+    very slow on colliding keys, and one case shouldn't stall the sweep.
+
+    :param case_timeout: The budget in seconds, 0 for none.
+    :param function: The case to run.
+    :return: What the case returned.
+    """
+    if not case_timeout or not hasattr(signal, "setitimer"):
+        return function(*args)
+
+    def on_timeout(signum, frame):
+        raise CaseTimeout
+
+    previous = signal.signal(signal.SIGALRM, on_timeout)
+    signal.setitimer(signal.ITIMER_REAL, case_timeout)
+    try:
+        return function(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def run_sweep(sizes: list, key_lengths: list, distributions: list,
+              hash_functions: list, maps: list, seed: int = 0,
+              repeat: int = 5, case_timeout: float = 60,
+              log=None) -> list:
+    """
+    Runs every combination of the sweep.
+
+    :param sizes: Amounts of keys.
+    :param key_lengths: Lengths of the keys.
+    :param distributions: Names from DISTRIBUTIONS.
+    :param hash_functions: Names from HASH_FUNCTIONS.
+    :param maps: Names from MAP_FACTORIES.
+    :param seed: Seed of every workload, the same seed gives the same keys.
+    :param repeat: How many times the whole-table operations run.
+    :param case_timeout: Seconds a single case may take, 0 for no limit.
+    :param log: A file to report progress to, or None.
+    :return: A list with a result dict per operation and case.
+    """
+    results = []
+
+    for size in sizes:
+        for key_length in key_lengths:
+            for distribution in distributions:
+                # the workload only depends on the seed and its parameters
+                rng = random.Random(
+                    "{}-{}-{}-{}".format(seed, size, key_length,
+                                         distribution))
+                try:
+                    keys = make_keys(rng, size * 2, key_length, distribution)
+                except ValueError as error:
+                    if log:
+                        print("skipped:", error, file=log)
+                    continue
+                keys, misses = keys[:size], keys[size:]
+                accesses = make_accesses(rng, keys, size, distribution)
+
+                case = {"size": size, "key_length": key_length,
+                        "distribution": distribution}
+
+                for function_name in hash_functions:
+                    for map_name in maps:
+                        if not runs_with(map_name, function_name):
+                            continue
+
+                        if log:
+                            print("running", map_name, function_name, case,
+                                  file=log)
+                        labels = dict(case, map=map_name,
+                                      hash_function=function_name)
+                        try:
+                            operations = run_case(
+                                case_timeout, bench_map, map_name,
+                                HASH_FUNCTIONS[function_name], keys,
+                                accesses, misses, repeat, seed)
+                        except CaseTimeout:
+                            results.append(dict(labels, operation=None,
+                                                error="timed out"))
+                            continue
+
+                        for operation, summary in operations.items():
+                            results.append(dict(labels, operation=operation,
+                                                **summary))
+
+                # find_mode always builds its own chaining map
+                labels = dict(case, map="sc", hash_function=None,
+                              operation="find_mode")
+                try:
+                    summary = run_case(case_timeout, bench_find_mode,
+                                       accesses, repeat)
+                    results.append(dict(labels, **summary))
+                except CaseTimeout:
+                    results.append(dict(labels, error="timed out"))
+
+    return results
+
+
+# ----------------------------- comparison ------------------------------ #
+
+def result_key(result: dict) -> tuple:
+    """Return what identifies a result across runs."""
+    return (result["map"], result["hash_function"], result["size"],
+            result["key_length"], result["distribution"],
+            result["operation"])
+
+
+def compare_results(baseline: list, current: list,
+                    threshold: float = 0.1) -> list:
+    """
+    Finds the operations whose throughput dropped between two runs.
+
+    :param baseline: The results of the earlier run.
+    :param current: The results of the later run.
+    :param threshold: The relative drop that counts as a regression.
+    :return: A list of dicts, one per regression, worst first.
+    """
+    earlier = {result_key(result): result for result in baseline
+               if result.get("ops_per_s")}
+
+    regressions = []
+    for result in current:
+        before = earlier.get(result_key(result))
+        if before is None or not result.get("ops_per_s"):
+            continue
+
+        change = result["ops_per_s"] / before["ops_per_s"] - 1
+        if change < -threshold:
+            regressions.append({
+                "case": dict(zip(("map", "hash_function", "size",
+                                  "key_length", "distribution",
+                                  "operation"), result_key(result))),
+                "baseline_ops_per_s": before["ops_per_s"],
+                "ops_per_s": result["ops_per_s"],
+                "change": change,
+            })
+
+    regressions.sort(key=lambda regression: regression["change"])
+    return regressions
+
+
+def main(argv: list = None) -> int:
+    """Run the benchmark suite from the command line."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark both HashMap implementations.")
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[1000, 10000])
+    parser.add_argument("--key-lengths", type=int, nargs="+",
+                        default=[8, 32])
+    parser.add_argument("--distributions", nargs="+",
+                        choices=DISTRIBUTIONS, default=list(DISTRIBUTIONS))
+    parser.add_argument("--hash-functions", nargs="+",
+                        choices=sorted(HASH_FUNCTIONS),
+                        default=sorted(HASH_FUNCTIONS))
+    parser.add_argument("--maps", nargs="+", choices=sorted(MAP_FACTORIES),
+                        default=sorted(MAP_FACTORIES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="runs of the whole-table operations")
+    parser.add_argument("--case-timeout", type=float, default=60,
+                        help="seconds a single case may take, 0 for none")
+    parser.add_argument("--output", help="JSON file for the results, "
+                                         "stdout when not given")
+    parser.add_argument("--baseline", help="JSON results of an earlier run "
+                                           "to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative throughput drop that fails the run")
+    args = parser.parse_args(argv)
+
+    results = run_sweep(args.sizes, args.key_lengths, args.distributions,
+                        args.hash_functions, args.maps, seed=args.seed,
+                        repeat=args.repeat, case_timeout=args.case_timeout,
+                        log=sys.stderr)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "initial_capacity": INITIAL_CAPACITY,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+        report["regressions"] = compare_results(baseline, results,
+                                                args.threshold)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if report.get("regressions"):
+        for regression in report["regressions"]:
+            print("regression:", regression["case"],
+                  "{:.1%}".format(regression["change"]), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,343 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: A bounded cache on top of the chaining HashMap. Its nodes are
+#              also threaded onto a doubly linked eviction order, so a get,
+#              a put and an eviction each take O(1) time, under either a
+#              least recently used or a least frequently used policy, with
+#              optional expiry and a memoize decorator.
+
+
+import functools
+import time
+
+from a6_include import HASH_FUNCTIONS, SLNode, hash_function_1
+from hash_map_sc import HashMap
+
+
+_MISSING = object()
+
+
+class CacheNode(SLNode):
+    """
+    Node of a cache entry. It sits in a chain of the HashMap like any
+    SLNode, and also in the eviction order of the cache through
+    prev_order and next_order.
+    """
+
+    __slots__ = ("frequency", "expires", "prev_order", "next_order")
+
+    def __init__(self, key: str, value: object,
+                 next: "CacheNode" = None) -> None:
+        """Initialize node given a key and value."""
+        super().__init__(key, value, next)
+        self.frequency = 0
+        self.expires = None
+        self.prev_order = None
+        self.next_order = None
+
+
+class Cache:
+    """
+    Cache holding at most maxsize entries, evicting one whenever a new key
+    would go over. The "lru" policy evicts the entry used longest ago, the
+    "lfu" policy the entry used the fewest times, the one used longest
+    ago among those.
+
+    The entries live in a chaining HashMap sized once for maxsize, and
+    are also linked in eviction order, the next victim first:
+    - "lru": from least to most recently used, a hit moves the entry to
+      the end.
+    - "lfu": in blocks of equal frequency, lowest first, each block from
+      least to most recently used. The last entry of every block is
+      kept by frequency, so a hit moves the entry to the end of the next
+      block in one step.
+
+    With a ttl, entries expire that many seconds after they were put, and
+    an expired entry is dropped the next time it is asked for.
+    """
+
+    def __init__(self, maxsize: int = 128, policy: str = "lru",
+                 ttl: float = None, function=hash_function_1,
+                 clock=time.monotonic) -> None:
+        """
+        Initialize an empty cache.
+
+        :param maxsize: The most entries held at a time.
+        :param policy: "lru" or "lfu".
+        :param ttl: Seconds an entry lives, None to keep it until evicted.
+        :param function: A hash function, or its name in HASH_FUNCTIONS.
+        :param clock: Function returning the time in seconds, for ttl.
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        if policy not in ("lru", "lfu"):
+            raise ValueError("policy must be 'lru' or 'lfu'")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive")
+        if isinstance(function, str):
+            if function not in HASH_FUNCTIONS:
+                raise ValueError("unknown hash function " + function)
+            function = HASH_FUNCTIONS[function]
+
+        self._maxsize = maxsize
+        self._policy = policy
+        self._ttl = ttl
+        self._clock = clock
+
+        # a load of at most 1 with maxsize buckets, so it never resizes;
+        # the node of an evicted entry is kept for the entry replacing it
+        self._map = HashMap(maxsize, function, max_load_factor=1.0,
+                            free_list_size=1, node_class=CacheNode)
+
+        # circular eviction order around a sentinel, victim first
+        self._order = CacheNode(None, None)
+        self._order.prev_order = self._order.next_order = self._order
+
+        # lfu: frequency -> last node of the block with that frequency
+        self._block_ends = {}
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def __len__(self) -> int:
+        """Return the amount of entries, expired ones included."""
+        return self._map.get_size()
+
+    def __contains__(self, key: str) -> bool:
+        """Support 'key in cache' through contains_key()."""
+        return self.contains_key(key)
+
+    # ------------------------------------------------------------------ #
+
+    def _link_after(self, node: CacheNode, anchor: CacheNode) -> None:
+        """Link a node into the eviction order right after anchor."""
+        node.prev_order = anchor
+        node.next_order = anchor.next_order
+        anchor.next_order.prev_order = node
+        anchor.next_order = node
+
+    def _leave_block(self, node: CacheNode) -> None:
+        """Hand the end of the node's frequency block to the node before."""
+        if self._block_ends.get(node.frequency) is node:
+            previous = node.prev_order
+            if previous is not self._order and \
+                    previous.frequency == node.frequency:
+                self._block_ends[node.frequency] = previous
+            else:
+                del self._block_ends[node.frequency]
+
+    def _unlink(self, node: CacheNode) -> None:
+        """Take a node out of the eviction order."""
+        if self._policy == "lfu":
+            self._leave_block(node)
+        node.prev_order.next_order = node.next_order
+        node.next_order.prev_order = node.prev_order
+        node.prev_order = node.next_order = None
+
+    def _touch(self, node: CacheNode) -> None:
+        """Move a node along the eviction order after it was used."""
+        if self._policy == "lru":
+            self._unlink(node)
+            self._link_after(node, self._order.prev_order)
+            return
+
+        # the node joins the end of the next frequency block, which comes
+        # right after its own block when it doesn't exist yet
+        frequency = node.frequency
+        target = self._block_ends.get(frequency + 1)
+        if target is None:
+            target = self._block_ends[frequency]
+
+        if target is node:
+            self._leave_block(node)
+        else:
+            self._unlink(node)
+            self._link_after(node, target)
+
+        node.frequency = frequency + 1
+        self._block_ends[node.frequency] = node
+
+    def _drop(self, node: CacheNode) -> None:
+        """Remove an entry from both the eviction order and the map."""
+        self._unlink(node)
+        self._map.remove(node.key)
+
+    def _expired(self, node: CacheNode) -> bool:
+        """Return True when the entry outlived its ttl."""
+        return node.expires is not None and node.expires <= self._clock()
+
+    # ------------------------------------------------------------------ #
+
+    def get(self, key: str, default: object = None) -> object:
+        """
+        Provides the value cached for a key, and counts the key as used.
+
+        :param key: A string as the key of the entry.
+        :param default: What to return when the key isn't cached.
+        :return: The cached value, or default on a miss.
+        """
+        node = self._map.get_node(key)
+
+        if node is not None and self._expired(node):
+            self._drop(node)
+            self._expirations += 1
+            node = None
+
+        if node is None:
+            self._misses += 1
+            return default
+
+        self._hits += 1
+        self._touch(node)
+        return node.value
+
+    def put(self, key: str, value: object, ttl: float = None) -> None:
+        """
+        Caches a value for a key, evicting an entry when the cache is
+        full and the key is new. Putting counts the key as used.
+
+        :param key: A string as the key of the entry.
+        :param value: The value to cache.
+        :param ttl: Seconds this entry lives, the cache's ttl if None.
+        """
+        if ttl is None:
+            ttl = self._ttl
+        expires = None if ttl is None else self._clock() + ttl
+
+        node = self._map.get_node(key)
+
+        # update existing entry
+        if node is not None:
+            node.value = value
+            node.expires = expires
+            self._touch(node)
+            return
+
+        if self._map.get_size() >= self._maxsize:
+            self._evict()
+
+        # a node reused from an evicted entry still has its fields
+        node = self._map.put_node(key, value)
+        node.expires = expires
+
+        # a new entry is the most recent one of the lowest frequency
+        if self._policy == "lru":
+            node.frequency = 0
+            self._link_after(node, self._order.prev_order)
+        else:
+            node.frequency = 1
+            self._link_after(node, self._block_ends.get(1, self._order))
+            self._block_ends[1] = node
+
+    def _evict(self) -> None:
+        """Remove the entry the policy picks, the first in order."""
+        self._drop(self._order.next_order)
+        self._evictions += 1
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Verifies that a key is cached and not expired, without counting
+        it as used.
+
+        :param key: A string as the key of the entry.
+        :return: True when a live entry holds the key.
+        """
+        node = self._map.get_node(key)
+        return node is not None and not self._expired(node)
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the entry of a key, if it is cached.
+
+        :param key: A string as the key of the entry.
+        """
+        node = self._map.get_node(key)
+        if node is not None:
+            self._drop(node)
+
+    def purge_expired(self) -> int:
+        """
+        Removes every expired entry at once.
+
+        :return: The amount of entries removed.
+        """
+        now = self._clock()
+        purged = 0
+
+        node = self._order.next_order
+        while node is not self._order:
+            following = node.next_order
+            if node.expires is not None and node.expires <= now:
+                self._drop(node)
+                purged += 1
+            node = following
+
+        self._expirations += purged
+        return purged
+
+    def clear(self) -> None:
+        """Removes every entry, keeping the counters."""
+        self._map.clear()
+        self._order.prev_order = self._order.next_order = self._order
+        self._block_ends = {}
+
+    def get_size(self) -> int:
+        """Return the amount of entries, expired ones included."""
+        return self._map.get_size()
+
+    def stats(self) -> dict:
+        """
+        Provides the counters of the cache.
+
+        :return: A dict with the size, maxsize, policy, hits, misses,
+        evictions, expirations and the share of lookups that hit.
+        """
+        lookups = self._hits + self._misses
+        return {
+            "size": self._map.get_size(),
+            "maxsize": self._maxsize,
+            "policy": self._policy,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "expirations": self._expirations,
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+        }
+
+
+def memoize(maxsize: int = 128, policy: str = "lru", ttl: float = None,
+            function=hash_function_1):
+    """
+    Decorator that caches the results of a function in a Cache. Calls are
+    keyed by the repr of their arguments, so the arguments need a repr
+    that tells different values apart.
+
+    @memoize(maxsize=1024, policy="lfu", function="xxh64_hash")
+    def expensive(n): ...
+
+    The decorated function has the cache as its cache attribute.
+
+    :param maxsize: The most results held at a time.
+    :param policy: "lru" or "lfu".
+    :param ttl: Seconds a result lives, None to keep it until evicted.
+    :param function: A hash function, or its name in HASH_FUNCTIONS.
+    :return: The decorator.
+    """
+    def decorator(wrapped):
+        cache = Cache(maxsize, policy, ttl, function)
+
+        @functools.wraps(wrapped)
+        def wrapper(*args, **kwargs):
+            key = repr((args, sorted(kwargs.items())))
+            result = cache.get(key, _MISSING)
+            if result is _MISSING:
+                result = wrapped(*args, **kwargs)
+                cache.put(key, result)
+            return result
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
@@ -0,0 +1,383 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: A thread-safe HashMap that stripes its keys over several
+#              independent maps, each guarded by its own lock, so writers
+#              to different stripes never wait on each other. Lookups run
+#              without taking a lock and only fall back to it when a
+#              writer changed their stripe while they were reading.
+
+
+import threading
+
+import hash_map_oa
+import hash_map_sc
+from a6_include import DynamicArray
+
+
+# spreads hashes over the stripes independently of the buckets inside them
+_GOLDEN_64 = 0x9E3779B97F4A7C15
+_MASK_64 = (1 << 64) - 1
+
+# lock-free attempts a lookup makes before it takes the stripe lock
+_OPTIMISTIC_READS = 2
+
+
+class ConcurrentHashMap:
+    """
+    HashMap that can be shared between threads. Keys are routed by hash
+    to one of several stripes; every stripe is a separate chaining or
+    open addressing HashMap with its own lock and resizes on its own, so
+    a resize only holds up writers of the stripe being resized.
+
+    Writers bump the version of their stripe before and after changing
+    it, making it odd while the change is under way. Readers look the key
+    up without a lock and keep the result only when the version was even
+    and unchanged, like a seqlock; otherwise they retry under the lock.
+    """
+
+    def __init__(self, capacity: int, function, stripes: int = 16,
+                 implementation: str = "oa", **options) -> None:
+        """
+        Initialize new ConcurrentHashMap.
+
+        :param capacity: The initial amount of buckets, over all stripes.
+        :param function: The hash function used for the keys.
+        :param stripes: The amount of independently locked stripes.
+        :param implementation: "oa" or "sc", the HashMap of each stripe.
+        :param options: Further options for each stripe's constructor.
+        Quadratic probing stripes default to the "power_of_two"
+        capacity_policy.
+        """
+        if stripes < 1:
+            raise ValueError("stripes must be at least 1")
+        if implementation not in ("oa", "sc"):
+            raise ValueError("implementation must be 'oa' or 'sc'")
+        if options.get("rehash_step") is not None:
+            # reads without a lock must never move buckets around
+            raise ValueError("stripes can't rehash incrementally")
+
+        # quadratic probing at an arbitrary capacity may never end, so
+        # quadratic stripes keep power of two capacities unless told
+        # otherwise
+        if implementation == "oa" and \
+                options.get("probing", "quadratic") == "quadratic":
+            options.setdefault("capacity_policy", "power_of_two")
+
+        module = hash_map_oa if implementation == "oa" else hash_map_sc
+        stripe_capacity = max(1, -(-capacity // stripes))
+
+        self._hash_function = function
+        self._stripes = [module.HashMap(stripe_capacity, function, **options)
+                         for _ in range(stripes)]
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._versions = [0] * stripes
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        out = ''
+        for index in range(len(self._stripes)):
+            out += 'stripe ' + str(index) + ':\n' + str(self._stripes[index])
+        return out
+
+    def _stripe_of(self, key: str) -> int:
+        """Return the index of the stripe the key belongs to."""
+        mixed = (self._hash_function(key) * _GOLDEN_64) & _MASK_64
+        return (mixed >> 32) % len(self._stripes)
+
+    def _write(self, index: int, operation, *args) -> object:
+        """
+        Runs a change on one stripe under its lock, with its version odd
+        for as long as the change is under way.
+
+        :param index: The index of the stripe.
+        :param operation: A function taking the stripe map and args.
+        :return: What the operation returned.
+        """
+        with self._locks[index]:
+            self._versions[index] += 1
+            try:
+                return operation(self._stripes[index], *args)
+            finally:
+                self._versions[index] += 1
+
+    def _read(self, index: int, operation, *args) -> object:
+        """
+        Runs a lookup on one stripe, first without its lock and then,
+        if a writer got in the way, under it.
+
+        :param index: The index of the stripe.
+        :param operation: A function taking the stripe map and args that
+        doesn't change the map.
+        :return: What the operation returned.
+        """
+        stripe = self._stripes[index]
+
+        for _ in range(_OPTIMISTIC_READS):
+            version = self._versions[index]
+            if version & 1:
+                break
+
+            # a half-done change can make the lookup fail, which only
+            # means it has to be retried
+            try:
+                result = operation(stripe, *args)
+            except Exception:
+                continue
+
+            if self._versions[index] == version:
+                return result
+
+        with self._locks[index]:
+            return operation(stripe, *args)
+
+    def _lock_all(self) -> None:
+        """Take every stripe lock, always in the same order."""
+        for index in range(len(self._locks)):
+            self._locks[index].acquire()
+            self._versions[index] += 1
+
+    def _unlock_all(self) -> None:
+        """Release every stripe lock taken by _lock_all()."""
+        for index in range(len(self._locks) - 1, -1, -1):
+            self._versions[index] += 1
+            self._locks[index].release()
+
+    # ------------------------------------------------------------------ #
+
+    def get_size(self) -> int:
+        """
+        Return size of map. Writers can change it while the stripes are
+        added up, so it is exact only when no writer is running.
+        """
+        return sum(stripe.get_size() for stripe in self._stripes)
+
+    def get_capacity(self) -> int:
+        """Return capacity of map, over all stripes."""
+        return sum(stripe.get_capacity() for stripe in self._stripes)
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Places or updates an existing key/value pair in the hash map.
+
+        :param key: A string to serve as the key in the key-value pair.
+        :param value: The desired value to store in the hash map.
+        """
+        self._write(self._stripe_of(key), _put, key, value)
+
+    def increment(self, key: str, amount: int = 1) -> int:
+        """
+        Adds to the number stored for a key as a single step, starting
+        from 0 when the key isn't in the hash map yet.
+
+        :param key: A string to serve as the key in the key-value pair.
+        :param amount: What to add to the stored number.
+        :return: The number stored for the key afterwards.
+        """
+        return self._write(self._stripe_of(key), _increment, key, amount)
+
+    def get(self, key: str) -> object:
+        """
+        Provides the associated value of the provided key. If key doesn't
+        exist in the hash map, then it returns None.
+
+        :param key: A string as the key in the desired key-value pair.
+        :return: value: An object of the key-value pair.
+        :return: None: The key was not found in the hash map.
+        """
+        return self._read(self._stripe_of(key), _get, key)
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Verifies if the provided key is in the hash map as a key-value
+        pair.
+
+        :param key: A string as the key in a key-value pair.
+        :return: True: The provided key matched a key-value pair.
+        :return: False: The provided key was not found.
+        """
+        return self._read(self._stripe_of(key), _contains_key, key)
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the associated key-value pair of the provided key. If key
+        is not in the hash map, then there are no changes to the hash map.
+
+        :param key: A string as the key in the key-value pair.
+        """
+        self._write(self._stripe_of(key), _remove, key)
+
+    def table_load(self) -> float:
+        """
+        Provides the average amount of objects stored in each bucket of
+        the hash map, over all stripes.
+
+        :return: A float to represent the average amount of objects per
+        bucket.
+        """
+        return self.get_size() / self.get_capacity()
+
+    def empty_buckets(self) -> int:
+        """
+        Provides the amount of empty buckets over all stripes, each stripe
+        counted under its own lock.
+
+        :return: A positive integer that represents empty buckets.
+        """
+        amount = 0
+        for index in range(len(self._stripes)):
+            amount += self._write(index, _empty_buckets)
+        return amount
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the hash map so its stripes share the provided capacity.
+        Stripes are resized one at a time, so writers of the other
+        stripes carry on meanwhile.
+
+        :param new_capacity: A positive integer that must be at least 1.
+        """
+        if new_capacity < 1:
+            return
+
+        stripe_capacity = max(1, -(-new_capacity // len(self._stripes)))
+        for index in range(len(self._stripes)):
+            self._write(index, _resize_table, stripe_capacity)
+
+    def clear(self) -> None:
+        """
+        Clears all stored data in the hash map, every stripe at once.
+        """
+        self._lock_all()
+        try:
+            for stripe in self._stripes:
+                stripe.clear()
+        finally:
+            self._unlock_all()
+
+    def get_keys(self) -> DynamicArray:
+        """
+        Provides all the keys in the hash map, as they were at a single
+        point in time.
+
+        :return: A dynamic array with all the keys in the hash map.
+        """
+        da_of_keys = DynamicArray()
+
+        self._lock_all()
+        try:
+            for stripe in self._stripes:
+                keys = stripe.get_keys()
+                for index in range(keys.length()):
+                    da_of_keys.append(keys.get_at_index(index))
+        finally:
+            self._unlock_all()
+
+        return da_of_keys
+
+    def _group(self, keys: list) -> list:
+        """Return the positions of the keys, grouped by stripe."""
+        groups = [[] for _ in self._stripes]
+        for position in range(len(keys)):
+            groups[self._stripe_of(keys[position])].append(position)
+        return groups
+
+    def put_many(self, pairs) -> None:
+        """
+        Places or updates many key/value pairs, taking each stripe lock
+        once for all of the pairs of that stripe.
+
+        :param pairs: An iterable of (key, value) tuples.
+        """
+        pairs = list(pairs)
+        groups = self._group([pair[0] for pair in pairs])
+
+        for index in range(len(groups)):
+            if groups[index]:
+                self._write(index, _put_many,
+                            [pairs[position] for position in groups[index]])
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Provides the values of many keys at once, with None for every key
+        that isn't in the hash map.
+
+        :param keys: An iterable of keys.
+        :return: A dynamic array with the value of each key, in order.
+        """
+        keys = list(keys)
+        values = [None] * len(keys)
+        groups = self._group(keys)
+
+        for index in range(len(groups)):
+            if groups[index]:
+                found = self._read(index, _get_many,
+                                   [keys[position]
+                                    for position in groups[index]])
+                for offset in range(len(groups[index])):
+                    values[groups[index][offset]] = \
+                        found.get_at_index(offset)
+
+        return DynamicArray(values)
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes the key-value pairs of many keys, taking each stripe lock
+        once for all of the keys of that stripe.
+
+        :param keys: An iterable of keys.
+        """
+        keys = list(keys)
+        groups = self._group(keys)
+
+        for index in range(len(groups)):
+            if groups[index]:
+                self._write(index, _remove_many,
+                            [keys[position] for position in groups[index]])
+
+
+# operations run on a single stripe map, by _read() or _write()
+
+def _put(stripe, key: str, value: object) -> None:
+    stripe.put(key, value)
+
+
+def _increment(stripe, key: str, amount: int) -> int:
+    if hasattr(stripe, "increment"):
+        return stripe.increment(key, amount)
+
+    value = stripe.get(key)
+    value = amount if value is None else value + amount
+    stripe.put(key, value)
+    return value
+
+
+def _get(stripe, key: str) -> object:
+    return stripe.get(key)
+
+
+def _contains_key(stripe, key: str) -> bool:
+    return stripe.contains_key(key)
+
+
+def _remove(stripe, key: str) -> None:
+    stripe.remove(key)
+
+
+def _empty_buckets(stripe) -> int:
+    return stripe.empty_buckets()
+
+
+def _resize_table(stripe, new_capacity: int) -> None:
+    stripe.resize_table(new_capacity)
+
+
+def _put_many(stripe, pairs: list) -> None:
+    stripe.put_many(pairs)
+
+
+def _get_many(stripe, keys: list) -> DynamicArray:
+    return stripe.get_many(keys)
+
+
+def _remove_many(stripe, keys: list) -> None:
+    stripe.remove_many(keys)
@@ -0,0 +1,511 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: An open addressing HashMap that lives in a memory-mapped file,
+#              so a table built once can be reopened in O(1) time instead
+#              of being rebuilt with a put() per key.
+#
+#              File layout, all little-endian:
+#              - header: magic, format version, slot size, capacity, size,
+#                tombstones, end of the heap, garbage bytes in the heap,
+#                the fingerprint and the name of the hash function
+#              - capacity fixed-width slots: full hash, key offset, value
+#                offset, key length, value length and bucket state
+#              - heap: the UTF-8 keys and pickled values the slots point at
+
+
+import mmap
+import os
+import pickle
+import struct
+
+from a6_include import DynamicArray, builtin_hash, xxh64_hash
+
+
+_MAGIC = b"HMAP"
+_VERSION = 2
+
+_HEADER = struct.Struct("<4sHHQQQQQQ32s")
+_SLOT = struct.Struct("<QQQIIB7x")
+
+# bucket states, an all-zero slot is open
+_EMPTY = 0
+_LIVE = 1
+_TOMBSTONE = 2
+
+_HASH_MASK = (1 << 64) - 1
+
+# heap bytes a new file starts with
+_MIN_HEAP = 4096
+
+# keys whose hashes make up the fingerprint of a hash function: empty,
+# non-ASCII, and long enough that functions agreeing on short keys differ
+_PROBE_KEYS = ("", "a", "\u00e9\U0001f600", "memory-mapped hash table probe")
+
+
+class MappedHashMap:
+    """
+    HashMap with open addressing whose table and data are a file mapped
+    into memory. Opening an existing file only reads its header, and
+    lookups read slots and compare keys right in the mapping.
+
+    The capacity is always a power of two and probing is triangular
+    (hash + 1, + 3, + 6, ...), which visits every bucket, so a probe
+    always ends at an open bucket. Updates and removals leave their old
+    bytes in the heap as garbage; resizes write a fresh file without it
+    and swap it in with an atomic rename, so a crash mid-resize leaves
+    the previous file intact.
+    """
+
+    def __init__(self, path: str, function, capacity: int = 16,
+                 max_load: float = 0.5) -> None:
+        """
+        Open the table stored at path, or create an empty one there.
+
+        :param path: The file holding the table.
+        :param function: The hash function used for the keys. It has to
+        give the same hashes in every process, so builtin_hash won't do.
+        :param capacity: The initial amount of buckets of a new table,
+        rounded up to a power of two.
+        :param max_load: Load at which put() doubles the table.
+        :raise ValueError: The file isn't a complete table, was built
+        with a hash function that hashes differently, or function can't
+        be identified.
+        """
+        if not 0 < max_load < 1:
+            raise ValueError("max_load must be between 0 and 1")
+
+        self._path = path
+        self._hash_function = function
+        self._fingerprint = _fingerprint(function)
+        self._function_name = getattr(function, "__name__", "") \
+            .encode("utf-8")[:32]
+        self._max_load = max_load
+        self._file = None
+        self._mm = None
+
+        if not os.path.exists(path):
+            self._write_table(path, _round_capacity(capacity), [], 0)
+        self._map()
+
+    def _map(self) -> None:
+        """
+        Maps the file at the path and reads its header, checking it
+        against the length of the file before anything else is read.
+        """
+        self._file = open(self._path, "r+b")
+        length = os.fstat(self._file.fileno()).st_size
+        if length < _HEADER.size:
+            self.close()
+            raise ValueError(self._path + " is not a hash table file")
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+
+        (magic, version, slot_size, self._capacity, self._size,
+         self._tombstones, self._heap_end, self._garbage, fingerprint,
+         function_name) = _HEADER.unpack_from(self._mm, 0)
+
+        if magic != _MAGIC or version != _VERSION or \
+                slot_size != _SLOT.size:
+            self.close()
+            raise ValueError(self._path + " is not a hash table file")
+        if fingerprint != self._fingerprint:
+            self.close()
+            raise ValueError(self._path + " was built with a different "
+                             "hash function, " + function_name.rstrip(b"\0")
+                             .decode("utf-8", "replace"))
+
+        # the slots and heap the header claims have to be in the file
+        self._heap_start = _HEADER.size + self._capacity * _SLOT.size
+        if self._capacity < 1 or self._capacity & (self._capacity - 1) or \
+                self._size + self._tombstones > self._capacity or \
+                not self._heap_start <= self._heap_end <= length or \
+                self._garbage > self._heap_end - self._heap_start:
+            self.close()
+            raise ValueError(self._path + " is truncated or corrupt")
+
+    def _write_header(self) -> None:
+        """Writes the counts kept in memory back into the mapping."""
+        _HEADER.pack_into(self._mm, 0, _MAGIC, _VERSION, _SLOT.size,
+                          self._capacity, self._size, self._tombstones,
+                          self._heap_end, self._garbage, self._fingerprint,
+                          self._function_name)
+
+    def _write_table(self, path: str, capacity: int, records: list,
+                     heap_bytes: int) -> None:
+        """
+        Writes a complete table file, syncs it and puts it in place of
+        the file at path in a single rename.
+
+        :param path: Where the table belongs.
+        :param capacity: The amount of buckets, a power of two.
+        :param records: (hash, key bytes, value bytes) of every pair.
+        :param heap_bytes: The total length of all keys and values.
+        """
+        heap_start = _HEADER.size + capacity * _SLOT.size
+        length = heap_start + max(_MIN_HEAP, heap_bytes * 2)
+        temp_path = path + ".tmp"
+
+        with open(temp_path, "w+b") as file:
+            file.truncate(length)
+            mm = mmap.mmap(file.fileno(), length)
+            try:
+                heap_end = heap_start
+                mask = capacity - 1
+
+                for key_hash, key_bytes, value_bytes in records:
+                    # every key is new, so take the first open bucket
+                    hash_index, step = key_hash & mask, 0
+                    while mm[_HEADER.size + hash_index * _SLOT.size +
+                             _SLOT.size - 8] != _EMPTY:
+                        step += 1
+                        hash_index = (hash_index + step) & mask
+
+                    key_offset = heap_end
+                    mm[key_offset:key_offset + len(key_bytes)] = key_bytes
+                    value_offset = key_offset + len(key_bytes)
+                    mm[value_offset:value_offset + len(value_bytes)] = \
+                        value_bytes
+                    heap_end = value_offset + len(value_bytes)
+
+                    _SLOT.pack_into(mm, _HEADER.size +
+                                    hash_index * _SLOT.size, key_hash,
+                                    key_offset, value_offset,
+                                    len(key_bytes), len(value_bytes), _LIVE)
+
+                _HEADER.pack_into(mm, 0, _MAGIC, _VERSION, _SLOT.size,
+                                  capacity, len(records), 0, heap_end, 0,
+                                  self._fingerprint, self._function_name)
+                mm.flush()
+            finally:
+                mm.close()
+            os.fsync(file.fileno())
+
+        os.replace(temp_path, path)
+
+    def __enter__(self) -> "MappedHashMap":
+        """Return the map for use in a with block."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close the map at the end of a with block."""
+        self.close()
+
+    def flush(self) -> None:
+        """Makes sure every change so far is written to the file."""
+        self._mm.flush()
+
+    def close(self) -> None:
+        """Flushes and unmaps the file. The map can't be used afterwards."""
+        if self._mm is not None:
+            self._mm.flush()
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # ------------------------------------------------------------------ #
+
+    def get_size(self) -> int:
+        """Return size of map."""
+        return self._size
+
+    def get_capacity(self) -> int:
+        """Return capacity of map."""
+        return self._capacity
+
+    def table_load(self) -> float:
+        """
+        Provides the average amount of objects stored in each bucket of
+        the hash map.
+
+        :return: A float to represent the average amount of objects per
+        bucket.
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self, include_tombstones: bool = True) -> int:
+        """
+        Provides the amount of empty buckets in the hash table.
+
+        :param include_tombstones: Count tombstones as empty buckets too.
+        :return: A positive integer that represents empty buckets.
+        """
+        amount = self._capacity - self._size
+        if not include_tombstones:
+            amount -= self._tombstones
+        return amount
+
+    def _slot_offset(self, hash_index: int) -> int:
+        """Return where the slot of a bucket starts in the file."""
+        return _HEADER.size + hash_index * _SLOT.size
+
+    def _find(self, key_bytes: bytes, key_hash: int) -> (int, int):
+        """
+        Probes for the bucket of a key.
+
+        :param key_bytes: The UTF-8 key.
+        :param key_hash: The masked hash of the key.
+        :return: int: The index of the key's bucket, -1 if not found.
+        :return: int: The first tombstone or open bucket along the probe
+        sequence, where the key would go.
+        """
+        mm, mask = self._mm, self._capacity - 1
+        hash_index, step = key_hash & mask, 0
+        free_index = -1
+
+        while True:
+            (slot_hash, key_offset, _, key_length, _,
+             state) = _SLOT.unpack_from(mm, self._slot_offset(hash_index))
+
+            # an open bucket ends the probe sequence
+            if state == _EMPTY:
+                if free_index == -1:
+                    free_index = hash_index
+                return -1, free_index
+
+            if state == _TOMBSTONE:
+                if free_index == -1:
+                    free_index = hash_index
+
+            # compare the key in place, cheap hash and length check first
+            elif slot_hash == key_hash and key_length == len(key_bytes) and \
+                    mm.find(key_bytes, key_offset,
+                            key_offset + key_length) == key_offset:
+                return hash_index, free_index
+
+            step += 1
+            hash_index = (hash_index + step) & mask
+
+    def _append(self, data: bytes) -> int:
+        """
+        Writes bytes at the end of the heap, growing the file when it is
+        full.
+
+        :param data: The bytes to write.
+        :return: Where they were written.
+        """
+        if self._heap_end + len(data) > len(self._mm):
+            new_length = max(len(self._mm) * 2,
+                             self._heap_end + len(data) + _MIN_HEAP)
+            self._mm.close()
+            self._file.truncate(new_length)
+            self._mm = mmap.mmap(self._file.fileno(), 0)
+
+        offset = self._heap_end
+        self._mm[offset:offset + len(data)] = data
+        self._heap_end += len(data)
+        return offset
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Places or updates an existing key/value pair in the hash map.
+
+        :param key: A string to serve as the key in the key-value pair.
+        :param value: The desired value to store in the hash map, which
+        has to be picklable.
+        """
+        # grow before the new pair could push the load too high, and
+        # rewrite in place once tombstones or garbage take too much room
+        if self._size + 1 > self._max_load * self._capacity:
+            self.resize_table(self._capacity * 2)
+        elif self._size + self._tombstones + 1 > \
+                (1 + self._max_load) / 2 * self._capacity or \
+                self._garbage > max(_MIN_HEAP,
+                                    self._heap_end - self._heap_start
+                                    - self._garbage):
+            self.resize_table(self._capacity)
+
+        key_bytes = key.encode("utf-8", "surrogatepass")
+        value_bytes = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        key_hash = self._hash_function(key) & _HASH_MASK
+        hash_index, free_index = self._find(key_bytes, key_hash)
+
+        # update existing key-value pair, over the old value if it fits
+        if hash_index != -1:
+            offset = self._slot_offset(hash_index)
+            (_, key_offset, value_offset, key_length, value_length,
+             _) = _SLOT.unpack_from(self._mm, offset)
+
+            if len(value_bytes) <= value_length:
+                self._mm[value_offset:value_offset + len(value_bytes)] = \
+                    value_bytes
+                self._garbage += value_length - len(value_bytes)
+            else:
+                value_offset = self._append(value_bytes)
+                self._garbage += value_length
+
+            _SLOT.pack_into(self._mm, offset, key_hash, key_offset,
+                            value_offset, key_length, len(value_bytes),
+                            _LIVE)
+            self._write_header()
+            return
+
+        key_offset = self._append(key_bytes + value_bytes)
+        offset = self._slot_offset(free_index)
+        if self._mm[offset + _SLOT.size - 8] == _TOMBSTONE:
+            self._tombstones -= 1
+
+        _SLOT.pack_into(self._mm, offset, key_hash, key_offset,
+                        key_offset + len(key_bytes), len(key_bytes),
+                        len(value_bytes), _LIVE)
+        self._size += 1
+        self._write_header()
+
+    def _value_at(self, hash_index: int) -> object:
+        """Return the value stored in a live bucket."""
+        (_, _, value_offset, _, value_length,
+         _) = _SLOT.unpack_from(self._mm, self._slot_offset(hash_index))
+        return pickle.loads(self._mm[value_offset:value_offset + value_length])
+
+    def get(self, key: str) -> object:
+        """
+        Provides the associated value of the provided key. If key doesn't
+        exist in the hash map, then it returns None.
+
+        :param key: A string as the key in the desired key-value pair.
+        :return: value: An object of the key-value pair.
+        :return: None: The key was not found in the hash map.
+        """
+        hash_index, _ = self._find(key.encode("utf-8", "surrogatepass"),
+                                   self._hash_function(key) & _HASH_MASK)
+        if hash_index == -1:
+            return None
+        return self._value_at(hash_index)
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Verifies if the provided key is in the hash map as a key-value
+        pair.
+
+        :param key: A string as the key in a key-value pair.
+        :return: True: The provided key matched a key-value pair.
+        :return: False: The provided key was not found.
+        """
+        if self._size == 0:
+            return False
+
+        hash_index, _ = self._find(key.encode("utf-8", "surrogatepass"),
+                                   self._hash_function(key) & _HASH_MASK)
+        return hash_index != -1
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the associated key-value pair of the provided key. If key
+        is not in the hash map, then there are no changes to the hash map.
+
+        :param key: A string as the key in the key-value pair.
+        """
+        if self._size == 0:
+            return
+
+        hash_index, _ = self._find(key.encode("utf-8", "surrogatepass"),
+                                   self._hash_function(key) & _HASH_MASK)
+        if hash_index == -1:
+            return
+
+        # transform the bucket to a tombstone, its bytes become garbage
+        offset = self._slot_offset(hash_index)
+        (_, _, _, key_length, value_length,
+         _) = _SLOT.unpack_from(self._mm, offset)
+        self._mm[offset + _SLOT.size - 8] = _TOMBSTONE
+
+        self._garbage += key_length + value_length
+        self._size -= 1
+        self._tombstones += 1
+        self._write_header()
+
+    def _records(self) -> (list, int):
+        """
+        Reads every live pair out of the mapping.
+
+        :return: list: (hash, key bytes, value bytes) of every pair.
+        :return: int: The total length of all keys and values.
+        """
+        records, heap_bytes = [], 0
+        for hash_index in range(self._capacity):
+            (key_hash, key_offset, value_offset, key_length, value_length,
+             state) = _SLOT.unpack_from(self._mm,
+                                        self._slot_offset(hash_index))
+            if state == _LIVE:
+                records.append((
+                    key_hash,
+                    self._mm[key_offset:key_offset + key_length],
+                    self._mm[value_offset:value_offset + value_length]))
+                heap_bytes += key_length + value_length
+        return records, heap_bytes
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Rewrites the table with the provided capacity, rounded up to a
+        power of two that keeps the load under the max load. The new
+        file has no tombstones or garbage and replaces the old one in a
+        single rename.
+
+        :param new_capacity: A positive integer that must be at least 1.
+        """
+        if new_capacity < 1 or new_capacity < self._size:
+            return
+
+        new_capacity = _round_capacity(new_capacity)
+        while self._size >= self._max_load * new_capacity:
+            new_capacity *= 2
+
+        records, heap_bytes = self._records()
+        self.close()
+        self._write_table(self._path, new_capacity, records, heap_bytes)
+        self._map()
+
+    def clear(self) -> None:
+        """
+        Clears all stored data in the hash map, keeping its capacity.
+        """
+        self.close()
+        self._write_table(self._path, self._capacity, [], 0)
+        self._map()
+
+    def get_keys(self) -> DynamicArray:
+        """
+        Provides all the keys in the hash map.
+
+        :return: A dynamic array with all the keys in the hash map.
+        """
+        da_of_keys = DynamicArray()
+        for hash_index in range(self._capacity):
+            (_, key_offset, _, key_length, _,
+             state) = _SLOT.unpack_from(self._mm,
+                                        self._slot_offset(hash_index))
+            if state == _LIVE:
+                da_of_keys.append(
+                    self._mm[key_offset:key_offset + key_length]
+                    .decode("utf-8", "surrogatepass"))
+        return da_of_keys
+
+
+def _fingerprint(function) -> int:
+    """
+    Return a fingerprint of a hash function: the hash of what it gives
+    for the probe keys. A table file keeps the fingerprint of the function
+    it was built with, so it can only be opened with one that hashes the
+    same way, whatever its name.
+
+    :param function: The hash function to identify.
+    :return: A 64-bit fingerprint.
+    :raise ValueError: The hashes of function change between processes,
+    or it doesn't give an int for every probe key.
+    """
+    if function is builtin_hash:
+        raise ValueError("builtin_hash changes between processes, it "
+                         "can't be stored with a table")
+
+    hashes = []
+    for key in _PROBE_KEYS:
+        key_hash = function(key)
+        if not isinstance(key_hash, int) or isinstance(key_hash, bool):
+            raise ValueError("the hash function has to give an int")
+        hashes.append(str(key_hash & _HASH_MASK))
+    return xxh64_hash(" ".join(hashes))
+
+
+def _round_capacity(capacity: int) -> int:
+    """Return the smallest power of two that is at least capacity."""
+    return 1 << max(0, capacity - 1).bit_length()
@@ -6,25 +6,184 @@
 # Description:  An implementation of the HashMap with open addressing and its methods.
 
 
-from a6_include import (DynamicArray, HashEntry,
+import itertools
+import math
+import time
+from array import array
+
+from a6_include import (DynamicArray, HashEntry, MapStats, hash_keys,
+                        read_snapshot, seeded_hash, write_snapshot,
                         hash_function_1, hash_function_2)
 
 
+# returned by lookups when a key is missing, None can be a stored value
+_MISSING = object()
+
+# pairs from_items() hands to put_many() at a time
+_BUILD_CHUNK = 4096
+
+
 class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+    # load that makes put() double the table, and the share of live
+    # entries plus tombstones that makes it clear out the tombstones
+    _DEFAULT_MAX_LOAD = 0.5
+    _DEFAULT_MAX_FILL = 0.75
+
+    def __new__(cls, *args, **kwargs):
+        """
+        Pick the class that implements the requested storage and probing,
+        so that HashMap(..., storage="compact") builds a CompactHashMap and
+        HashMap(..., probing="robin_hood") builds a RobinHoodHashMap.
+        """
+        if cls is HashMap:
+            probing = kwargs.get("probing", "quadratic")
+            if probing == "robin_hood":
+                cls = RobinHoodHashMap
+            elif probing == "group":
+                cls = GroupProbingHashMap
+            elif kwargs.get("storage") == "compact":
+                cls = CompactHashMap
+        return super().__new__(cls)
+
+    def __init__(self, capacity: int, function,
+                 rehash_step: int = None,
+                 max_fill: float = None, *,
+                 storage: str = None,
+                 probing: str = "quadratic",
+                 max_load: float = None,
+                 stats: bool = False,
+                 capacity_policy: str = None,
+                 seed=None) -> None:
         """
         Initialize new HashMap that uses
-        quadratic probing for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        open addressing for collision resolution
+
+        The probing picks how a key looks for its bucket:
+        - "quadratic" (default) tries hash + 1, hash + 4, hash + 9, ...
+          and doubles the table at a load of 0.5.
+        - "robin_hood" probes linearly and moves pairs that are closer to
+          their home bucket out of the way, deletes by shifting pairs back
+          instead of leaving tombstones, and doubles at a load of 0.875.
+        - "group" keeps a control byte per bucket with a 7 bit fingerprint
+          of the hash and scans buckets 16 at a time, like SwissTable,
+          and doubles at a load of 0.875.
+        max_load overrides the load at which put() doubles the table.
+
+        Quadratic probing at an arbitrary capacity isn't sure to reach an
+        open bucket, so a probe can cycle for a long time. The
+        capacity_policy rounds every capacity, from the constructor,
+        resize_table() or a doubling, to one where probes always end:
+        - None (default) uses every capacity as given.
+        - "prime" uses the next prime, and keeps live entries plus
+          tombstones, counting the pair being put, under half of the
+          table, so the first half of each probe sequence, which never
+          repeats a bucket, always holds an open one.
+        - "power_of_two" uses the next power of two and probes
+          triangularly (hash + 1, + 3, + 6, ...), which visits every
+          bucket, with a mask instead of a modulo.
+        Both count the pair being put towards the load and fill, so even
+        the smallest tables keep an open bucket. The policy only applies
+        to quadratic probing.
+
+        By default the table is rehashed all at once when put() doubles it.
+        When rehash_step is given, that doubling is done incrementally
+        instead: the old and new tables live side by side and every put,
+        get, contains_key and remove moves rehash_step old buckets over.
+
+        Keys that hash alike can be crafted on purpose to make long probe
+        sequences. When seed is given it is mixed into the hash of every
+        key (see seeded_hash), so where keys land can't be predicted;
+        "random" draws a seed for this map alone. Only xxh64_hash and
+        fnv1a_hash take a seed.
+
+        Removed pairs leave tombstones behind. Once live entries and
+        tombstones together fill max_fill of the table, put() rebuilds it
+        at the same capacity to clear them out.
+
+        The "entries" storage keeps a HashEntry object in every bucket.
+        The "compact" storage keeps parallel arrays of hashes, bucket
+        states, keys and values instead, which takes much less memory per
+        bucket. Quadratic probing uses "entries" unless told otherwise,
+        the other probings always use "compact".
+
+        When stats is True the map counts its operations, hits and misses,
+        the length of every probe sequence it runs, its resizes and its
+        compactions, which stats() reports. Without it the counting costs
+        next to nothing.
+
+        :param capacity: The initial amount of buckets.
+        :param function: The hash function used for the keys.
+        :param rehash_step: Old buckets moved per operation while resizing.
+        :param max_fill: Share of live entries plus tombstones that
+        triggers a compaction, above max_load and at most 1.
+        :param storage: "entries" or "compact".
+        :param probing: "quadratic", "robin_hood" or "group".
+        :param max_load: Load at which put() doubles the table.
+        :param stats: Whether to keep operation statistics.
+        :param capacity_policy: None, "prime" or "power_of_two".
+        :param seed: None, an int or "random", mixed into the key hashes.
         """
-        self._buckets = DynamicArray()
-        for _ in range(capacity):
-            self._buckets.append(None)
+        if max_load is None:
+            max_load = self._DEFAULT_MAX_LOAD
+        if max_fill is None:
+            max_fill = 0.5 if capacity_policy == "prime" else \
+                max(self._DEFAULT_MAX_FILL, (1 + max_load) / 2)
+
+        if rehash_step is not None and rehash_step < 1:
+            raise ValueError("rehash_step must be at least 1")
+        if not 0 < max_load < 1:
+            raise ValueError("max_load must be between 0 and 1")
+        if capacity_policy not in (None, "prime", "power_of_two"):
+            raise ValueError("capacity_policy must be 'prime' or "
+                             "'power_of_two'")
+        if capacity_policy is not None and probing != "quadratic":
+            raise ValueError("capacity_policy needs quadratic probing")
+
+        # the prime policy may compact and double at the same load
+        if capacity_policy == "prime":
+            if not max_load <= max_fill <= 0.5:
+                raise ValueError("the prime capacity_policy needs max_load "
+                                 "and max_fill of at most 0.5")
+        elif not max_load < max_fill <= 1:
+            raise ValueError("max_fill must be above max_load and at most 1")
+        if probing not in ("quadratic", "robin_hood", "group"):
+            raise ValueError("probing must be 'quadratic', 'robin_hood' "
+                             "or 'group'")
+        if storage not in (None, "entries", "compact"):
+            raise ValueError("storage must be 'entries' or 'compact'")
+        if probing != "quadratic" and storage == "entries":
+            raise ValueError(probing + " probing needs the compact storage")
+        if seed is not None:
+            function = seeded_hash(function, seed)
+
+        # capacities are rounded to ones where probing always ends
+        self._capacity_policy = capacity_policy
+        capacity = self._legal_capacity(capacity)
+
+        self._buckets = self._new_table(capacity)
 
         self._capacity = capacity
         self._hash_function = function
         self._size = 0
 
+        # tombstones in the current table and when to clear them out
+        self._tombstones = 0
+        self._max_load = max_load
+        self._max_fill = max_fill
+
+        # state of an incremental resize, old table is None when idle
+        self._rehash_step = rehash_step
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._rehash_index = 0
+
+        # operation statistics, None unless they were asked for
+        self._stats = MapStats("probe_lengths") if stats else None
+
+        # bumped whenever pairs are added, removed or moved, so iterators
+        # can tell the map changed under them
+        self._modifications = 0
+
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
@@ -49,6 +208,10 @@ class HashMap:
         """
         return self._capacity
 
+    def get_hash_function(self) -> object:
+        """Return the hash function of map."""
+        return self._hash_function
+
     # ------------------------------------------------------------------ #
 
     def put(self, key: str, value: object) -> None:
@@ -58,39 +221,105 @@ class HashMap:
         :param key: A string to serve as the key in the key-value pair.
         :param value: The desired value to store in the hash map.
         """
+        # move some buckets along when a resize is in progress
+        if self._old_buckets is not None:
+            self._rehash_some()
 
-        # check the load factor & resize if >= 0.5
-        if self.table_load() >= 0.5:
-            self.resize_table(self._capacity*2)
+        # capacity policies count the pair being put towards the load
+        incoming = 0 if self._capacity_policy is None else 1
 
-        # generate a 'hash' index
-        hash_index = self._hash_function(key) % self._capacity
+        # check the load factor & resize if >= the max load
+        if (self._size + incoming) / self._capacity >= self._max_load:
+            if self._rehash_step is None:
+                self.resize_table(self._legal_capacity(self._capacity*2))
+            else:
+                self._start_rehash(self._legal_capacity(self._capacity*2))
+
+        # rebuild at the same capacity once tombstones clog the table
+        elif self._size + self._tombstones + incoming >= \
+                self._max_fill * self._capacity:
+            self._compact()
+
+        if self._stats is not None:
+            self._stats.count("put")
+
+        # hash the key only once, every probe reuses it
+        self._put_hashed(key, value, self._hash_function(key))
 
-        # tracker for 'putting' the provided key-value pair
-        placed = False
+    def _put_hashed(self, key: str, value: object, key_hash: int) -> None:
+        """
+        Places or updates a key/value pair whose key was already hashed,
+        without checking the load first.
+
+        :param key: A string to serve as the key in the key-value pair.
+        :param value: The desired value to store in the hash map.
+        :param key_hash: The full hash of the key.
+        """
+        # a key that wasn't moved yet gets updated in the old table
+        if self._old_buckets is not None:
+            hash_entry = self._find_entry(self._old_buckets,
+                                          self._old_capacity, key, key_hash)
+            if hash_entry is not None:
+                hash_entry.value = value
+                return
+
+        mask = self._probe_mask(self._capacity)
+        hash_index = key_hash & mask if mask else \
+            key_hash % self._capacity
+
+        # first tombstone seen, reused when the key isn't further along
+        free_index = None
+        reuses_tombstone = False
         quad = 1  # helps with quadratic probing
 
-        # attempt to place into a bucket
-        while not placed:
+        # attempt to place into a bucket, for as long as the probe can
+        # still reach buckets it hasn't seen
+        while quad <= self._capacity:
             current_bucket = self._buckets.get_at_index(hash_index)
 
-            # verify current bucket can save a key-value pair
-            if current_bucket is None or current_bucket.is_tombstone:
-                self._buckets[hash_index] = HashEntry(key, value)
-                self._size += 1
-                placed = True
-
-            # update existing key-value pair
-            elif current_bucket.key == key:
+            # an open bucket ends the search, the key is new
+            if current_bucket is None:
+                if free_index is None:
+                    free_index = hash_index
+                if self._stats is not None:
+                    self._stats.length(quad)
+                break
+
+            # remember the first tombstone but keep looking for the key
+            if current_bucket.is_tombstone:
+                if free_index is None:
+                    free_index = hash_index
+                    reuses_tombstone = True
+
+            # update existing key-value pair, cheap hash check first
+            elif current_bucket.hash_value == key_hash and \
+                    current_bucket.key == key:
                 current_bucket.value = value
-                placed = True
+                if self._stats is not None:
+                    self._stats.length(quad)
+                return
 
-            # must do collision resolution with OA when different key
+            # probe triangularly on power of two tables, else quadratically
+            if mask:
+                hash_index = (hash_index + quad) & mask
             else:
-                # use quadratic probing to find next available spot
-                hash_index = (self._hash_function(key) + quad**2) % \
-                             self._capacity
-                quad += 1
+                hash_index = (key_hash + quad * quad) % self._capacity
+            quad += 1
+
+        # no open bucket is reachable, make room and place the pair there
+        else:
+            if self._stats is not None:
+                self._stats.length(self._capacity)
+            if free_index is None:
+                self.resize_table(self._capacity * 2)
+                self._put_hashed(key, value, key_hash)
+                return
+
+        self._buckets[free_index] = HashEntry(key, value, key_hash)
+        self._size += 1
+        self._modifications += 1
+        if reuses_tombstone:
+            self._tombstones -= 1
 
     def table_load(self) -> float:
         """
@@ -102,107 +331,594 @@ class HashMap:
         """
         return self._size / self._capacity
 
-    def empty_buckets(self) -> int:
+    def empty_buckets(self, include_tombstones: bool = True) -> int:
         """
         Provides the amount of empty buckets in the hash table.
 
+        :param include_tombstones: Count tombstones as empty buckets too.
         :return: A positive integer that represents empty buckets.
         """
-        # counter of empty buckets
-        amount = 0
-
-        # go through each bucket to count any 'empty' ones
-        for index in range(self._capacity):
-            bucket = self._buckets.get_at_index(index)
+        # the count is only meaningful once every entry is in one table
+        self._finish_rehash()
 
-            # count every time there's no bucket or tombstone
-            if not bucket or bucket.is_tombstone:
-                amount += 1
+        # live entries and tombstones are both counted as they change, so
+        # every other bucket is open
+        amount = self._capacity - self._size
+        if not include_tombstones:
+            amount -= self._tombstones
 
         return amount
 
+    def tombstone_stats(self) -> dict:
+        """
+        Provides how the buckets of the hash table are used, with the
+        tombstones counted apart from the open buckets.
+
+        :return: A dict with the capacity, the live entries, the
+        tombstones, the open buckets and the fill (live entries plus
+        tombstones per bucket).
+        """
+        # the counts are only meaningful once every entry is in one table
+        self._finish_rehash()
+
+        open_buckets = self._capacity - self._size - self._tombstones
+        return {
+            "capacity": self._capacity,
+            "live": self._size,
+            "tombstones": self._tombstones,
+            "open": open_buckets,
+            "fill": (self._size + self._tombstones) / self._capacity,
+        }
+
+    def stats(self) -> dict:
+        """
+        Provides a snapshot of how the hash map is used.
+
+        :return: A dict with the size, capacity, load and tombstones. When
+        the map was built with stats=True it also has the operation
+        counts, the hits and misses of get, contains_key and remove, a
+        histogram of the probe sequence lengths, the amount and time of
+        resizes and the amount of compactions.
+        """
+        snapshot = {
+            "enabled": self._stats is not None,
+            "size": self._size,
+            "capacity": self._capacity,
+            "load": self.table_load(),
+            "tombstones": self._tombstones,
+        }
+        if self._stats is not None:
+            snapshot.update(self._stats.snapshot())
+        return snapshot
+
     def resize_table(self, new_capacity: int) -> None:
         """
         Allows the hash map to be resized to provided capacity. Key-value
-        pairs are re-hashed.
+        pairs are re-hashed. When the pairs would reach the max load of the
+        new capacity, it keeps doubling the capacity like put() does.
+        With a capacity_policy the capacity is rounded to a legal one.
+        An explicit resize is always done right away, even when the map
+        rehashes incrementally.
 
         :param new_capacity: A positive integer that must be at least 1.
         """
-        # case where new capacity is an invalid integer
-        if new_capacity < 1 or new_capacity < self._size:
+        # settle on the final capacity, None for an invalid integer
+        new_capacity = self._resize_capacity(new_capacity)
+        if new_capacity is None:
             return
 
+        # an explicit resize starts from a single table
+        self._finish_rehash()
+        self._modifications += 1
+        started = time.perf_counter()
+
         # 'save' some old hash map parts
         old_buckets = self._buckets
         old_capacity = self._capacity
 
-        # initialize new hash table
-        new_buckets = DynamicArray()
-        for _ in range(new_capacity):
-            new_buckets.append(None)
-        self._size = 0
-
-        # update pointers
+        # update pointers, the rebuilt table has no tombstones
         self._capacity = new_capacity
-        self._buckets = new_buckets
+        self._buckets = self._new_table(new_capacity)
+        self._tombstones = 0
 
-        # place key-value pairs from old table into new one
-        for index in range(old_capacity):
-            current_bucket = old_buckets.get_at_index(index)
+        # move entries from old table into new one using their saved hash
+        self._move_buckets(old_buckets, 0, old_capacity)
+
+        if self._stats is not None:
+            self._stats.resized(time.perf_counter() - started)
+
+    def _resize_capacity(self, new_capacity: int) -> int:
+        """
+        Return the capacity resize_table() settles on for a requested one:
+        rounded by the capacity policy, and doubled at the same points
+        that put() would double it while re-inserting the pairs. None when
+        the request is ignored.
+        """
+        # case where new capacity is an invalid integer
+        if new_capacity < 1 or new_capacity < self._size:
+            return None
+
+        new_capacity = self._legal_capacity(new_capacity)
+        placed = 0
+        while True:
+            next_double = max(placed,
+                              math.ceil(self._max_load * new_capacity))
+            if next_double >= self._size:
+                break
+            new_capacity = self._legal_capacity(new_capacity * 2)
+            placed = next_double + 1
+
+        # and a capacity policy keeps the pairs under the max load
+        if self._capacity_policy is not None:
+            while self._size >= self._max_load * new_capacity:
+                new_capacity = self._legal_capacity(new_capacity * 2)
+
+        return new_capacity
+
+    def _fit_capacity(self, size: int) -> int:
+        """
+        Return the smallest capacity the policy allows that holds size
+        pairs under the max load, so putting them never doubles it.
+        """
+        return self._legal_capacity(int(size / self._max_load) + 1)
+
+    def reserve(self, n_expected: int) -> None:
+        """
+        Grows the table once so that n_expected pairs fit without any
+        further doubling. It never shrinks the table.
+
+        :param n_expected: The amount of pairs the map will hold.
+        """
+        if n_expected < 0:
+            raise ValueError("n_expected must not be negative")
+
+        new_capacity = self._fit_capacity(n_expected)
+        if new_capacity > self._capacity:
+            self.resize_table(new_capacity)
+
+    def shrink_to_fit(self) -> None:
+        """
+        Shrinks the table to the smallest capacity that holds the current
+        pairs, after a reserve() that asked for more than was put.
+        """
+        new_capacity = self._fit_capacity(self._size)
+        if new_capacity < self._capacity:
+            self.resize_table(new_capacity)
 
+    @classmethod
+    def from_items(cls, pairs, function, expected_size: int = None,
+                   **options) -> "HashMap":
+        """
+        Builds a hash map from key/value pairs with a single sizing of the
+        table. Without expected_size the pairs are counted first. When
+        fewer pairs than expected arrive, the table is shrunk to fit.
+
+        :param pairs: An iterable of (key, value) tuples.
+        :param function: The hash function used for the keys.
+        :param expected_size: The amount of pairs, when known.
+        :param options: Further options for the constructor, such as
+        storage or probing.
+        :return: A new HashMap holding the pairs.
+        """
+        if expected_size is None:
+            pairs = list(pairs)
+            expected_size = len(pairs)
+
+        hash_map = cls(1, function, **options)
+        hash_map.reserve(expected_size)
+
+        # insert in chunks so a generator is never held in memory whole
+        iterator = iter(pairs)
+        while True:
+            chunk = list(itertools.islice(iterator, _BUILD_CHUNK))
+            if not chunk:
+                break
+            hash_map.put_many(chunk)
+
+        if hash_map._size < expected_size:
+            hash_map.shrink_to_fit()
+        return hash_map
+
+    def _legal_capacity(self, capacity: int) -> int:
+        """
+        Rounds a capacity up to one the capacity policy allows.
+
+        :param capacity: A positive integer.
+        :return: The next prime or power of two, or capacity itself
+        without a policy.
+        """
+        if self._capacity_policy == "prime":
+            return _next_prime(capacity)
+        if self._capacity_policy == "power_of_two":
+            return 1 << max(0, capacity - 1).bit_length()
+        return capacity
+
+    def _probe_mask(self, capacity: int) -> int:
+        """
+        Return the mask that triangular probing reduces indices with on a
+        table of the provided capacity, 0 when the table probes
+        quadratically.
+        """
+        if self._capacity_policy == "power_of_two":
+            return capacity - 1
+        return 0
+
+    def _new_table(self, capacity: int) -> DynamicArray:
+        """
+        Builds an empty table of the provided capacity.
+
+        :param capacity: The amount of buckets.
+        :return: A dynamic array with an open bucket at every index.
+        """
+        buckets = DynamicArray()
+        for _ in range(capacity):
+            buckets.append(None)
+        return buckets
+
+    def _build_table(self, capacity: int, step: int):
+        """
+        Builds an empty table, yielding after every step buckets so that a
+        caller can do other work in between.
+
+        :param capacity: The amount of buckets.
+        :param step: Buckets built between two yields.
+        :return: The table, as the value of the finished generator.
+        """
+        buckets = DynamicArray()
+        for start in range(0, capacity, step):
+            for _ in range(start, min(start + step, capacity)):
+                buckets.append(None)
+            yield
+        return buckets
+
+    def _keys_between(self, da: DynamicArray, start: int, stop: int) -> None:
+        """
+        Appends the keys found between two indices of the current table.
+
+        :param da: The dynamic array to append to.
+        :param start: The first index to look at.
+        :param stop: The index to stop before.
+        """
+        for bucket_index in range(start, stop):
+            hash_entry = self._buckets.get_at_index(bucket_index)
+            if hash_entry is not None and not hash_entry.is_tombstone:
+                da.append(hash_entry.key)
+
+    def _move_buckets(self, buckets: DynamicArray, start: int,
+                      stop: int) -> None:
+        """
+        Moves the live entries found between two indices of another table
+        into the current table. The entries stay referenced by the other
+        table so its probe sequences aren't broken.
+
+        :param buckets: The table to move entries out of.
+        :param start: The first index to move.
+        :param stop: The index to stop before.
+        """
+        for index in range(start, stop):
+            current_bucket = buckets.get_at_index(index)
+
+            # only buckets with 'valid' keys get placed
+            if current_bucket is not None and \
+                    not current_bucket.is_tombstone:
+                self._place_entry(current_bucket)
+
+    def _place_entry(self, entry: HashEntry) -> None:
+        """
+        Places an existing entry into the table without hashing its key.
+        Only used while rehashing, so the key can't be in the table yet.
+
+        :param entry: A live HashEntry that has its hash_value saved.
+        """
+        key_hash = entry.hash_value
+        mask = self._probe_mask(self._capacity)
+        hash_index = key_hash & mask if mask else \
+            key_hash % self._capacity
+        quad = 1
+
+        # probe until an open bucket or a tombstone is found, for as long
+        # as the probe can still reach buckets it hasn't seen
+        while quad <= self._capacity:
+            current_bucket = self._buckets.get_at_index(hash_index)
             if current_bucket is None:
-                pass
+                break
+            if current_bucket.is_tombstone:
+                self._tombstones -= 1
+                break
+            if mask:
+                hash_index = (hash_index + quad) & mask
+            else:
+                hash_index = (key_hash + quad * quad) % self._capacity
+            quad += 1
 
-            elif current_bucket.is_tombstone:
-                pass
+        # no open bucket is reachable, grow the table and place it there
+        else:
+            self._grow_table()
+            self._place_entry(entry)
+            return
+
+        self._buckets[hash_index] = entry
+
+    def _grow_table(self) -> None:
+        """
+        Doubles the current table and moves its pairs into the new one,
+        for a pair that no probe can place. An incremental resize in
+        progress carries on into the grown table.
+        """
+        buckets = self._buckets
+        capacity = self._capacity
+
+        self._capacity = self._legal_capacity(capacity * 2)
+        self._buckets = self._new_table(self._capacity)
+        self._tombstones = 0
+        self._modifications += 1
+        self._move_buckets(buckets, 0, capacity)
+
+    def _start_rehash(self, new_capacity: int, buckets=None) -> None:
+        """
+        Begins an incremental resize. The current table becomes the old
+        table and an empty table of the new capacity takes its place.
+
+        :param new_capacity: The capacity of the table being moved into.
+        :param buckets: That empty table when it was built beforehand.
+        """
+        # only one resize can be in progress at a time
+        self._finish_rehash()
+        self._modifications += 1
+
+        self._old_buckets = self._buckets
+        self._old_capacity = self._capacity
+        self._rehash_index = 0
+
+        if buckets is None:
+            buckets = self._new_table(new_capacity)
+        self._buckets = buckets
+        self._capacity = new_capacity
+        self._tombstones = 0
+
+        # the moves add their time as they happen
+        if self._stats is not None:
+            self._stats.resized(0.0)
+
+    def _compact(self) -> None:
+        """
+        Rebuilds the table at the same capacity so its tombstones are
+        cleared out, incrementally when a rehash step was configured.
+        """
+        if self._stats is not None:
+            self._stats.compactions += 1
 
+        if self._rehash_step is None:
+            self.resize_table(self._capacity)
+        else:
+            self._start_rehash(self._capacity)
+
+    def _rehash_some(self, amount: int = None) -> None:
+        """
+        Moves the next old buckets of an incremental resize into the new
+        table, and drops the old table once everything has been moved.
+
+        :param amount: How many old buckets to move, rehash_step if None,
+        or 1 when the resize was started without a rehash_step.
+        """
+        if amount is None:
+            amount = self._rehash_step or 1
+        if self._stats is not None:
+            started = time.perf_counter()
+
+        stop = min(self._rehash_index + amount, self._old_capacity)
+        self._move_buckets(self._old_buckets, self._rehash_index, stop)
+        self._rehash_index = stop
+
+        if self._stats is not None:
+            self._stats.resize_seconds += time.perf_counter() - started
+
+        # every old bucket was moved, the old table isn't needed anymore
+        if self._rehash_index == self._old_capacity:
+            self._old_buckets = None
+            self._old_capacity = 0
+            self._rehash_index = 0
+
+    def _finish_rehash(self) -> None:
+        """
+        Moves every remaining old bucket of an incremental resize.
+        """
+        if self._old_buckets is not None:
+            self._rehash_some(self._old_capacity)
+
+    def pending_rehash(self) -> int:
+        """
+        Return how many old buckets an incremental resize still has to
+        move, 0 when no resize is in progress.
+        """
+        if self._old_buckets is None:
+            return 0
+        return self._old_capacity - self._rehash_index
+
+    def rehash_step(self, amount: int = None) -> int:
+        """
+        Moves the next old buckets of an incremental resize in progress,
+        for a caller that wants to do the work at its own pace.
+
+        :param amount: How many old buckets to move, rehash_step of the
+        map if None.
+        :return: How many old buckets are left to move.
+        """
+        if self._old_buckets is not None:
+            self._rehash_some(amount)
+        return self.pending_rehash()
+
+    def _rehash_steps(self, step: int):
+        """Finishes a resize in progress, yielding after every step buckets."""
+        while self.rehash_step(step):
+            yield
+
+    def resize_table_steps(self, new_capacity: int, step: int):
+        """
+        Resizes the map like resize_table(), in steps: a generator that
+        yields after every step buckets built or moved, so that a caller
+        can do other work, and use the map, in between. The pairs move as
+        an incremental resize.
+
+        :param new_capacity: A positive integer that must be at least 1.
+        :param step: Buckets handled between two yields.
+        """
+        yield from self._rehash_steps(step)
+        new_capacity = self._resize_capacity(new_capacity)
+        if new_capacity is None:
+            return
+        buckets = yield from self._build_table(new_capacity, step)
+
+        # a resize may have started meanwhile, the new table is only
+        # swapped in once the map uses a single table
+        yield from self._rehash_steps(step)
+        self._start_rehash(new_capacity, buckets)
+        yield from self._rehash_steps(step)
+
+    def clear_steps(self, step: int):
+        """
+        Clears the map like clear(), in steps: a generator that yields
+        after every step buckets of the empty table built, which is then
+        swapped in at once.
+
+        :param step: Buckets built between two yields.
+        """
+        capacity = self._capacity
+        buckets = yield from self._build_table(capacity, step)
+
+        # a resize meanwhile changed the capacity, build for the new one
+        while capacity != self._capacity:
+            capacity = self._capacity
+            buckets = yield from self._build_table(capacity, step)
+
+        self._reset(buckets)
+
+    def get_keys_steps(self, step: int):
+        """
+        Provides the keys like get_keys(), in steps: a generator that
+        yields after every step buckets read.
+
+        :param step: Buckets read between two yields.
+        :return: A dynamic array with all the keys in the hash map, as the
+        value of the finished generator.
+        :raise RuntimeError: The map was changed before all keys were read.
+        """
+        yield from self._rehash_steps(step)
+        modifications = self._modifications
+        capacity = self._capacity
+        da_of_keys = DynamicArray()
+
+        for start in range(0, capacity, step):
+            if self._modifications != modifications:
+                raise RuntimeError("hash map changed during get_keys")
+            self._keys_between(da_of_keys, start,
+                               min(start + step, capacity))
+            yield
+
+        return da_of_keys
+
+    def _find_entry(self, buckets: DynamicArray, capacity: int,
+                    key: str, key_hash: int) -> HashEntry:
+        """
+        Probes a table for the live entry of the provided key.
+
+        :param buckets: The table to search.
+        :param capacity: The capacity of that table.
+        :param key: A string as the key in the desired key-value pair.
+        :param key_hash: The full hash of the key.
+        :return: HashEntry: The live entry holding the key.
+        :return: None: The key was not found in that table.
+        """
+        mask = self._probe_mask(capacity)
+        hash_index = key_hash & mask if mask else \
+            key_hash % capacity
+        quad = 1  # helps with quadratic probing
+
+        # quadratic probing may never reach an open bucket, but after
+        # capacity probes it only revisits buckets it has seen
+        while quad <= capacity:
+            hash_entry = buckets.get_at_index(hash_index)
+
+            # an open bucket ends the probe sequence
+            if hash_entry is None:
+                if self._stats is not None:
+                    self._stats.length(quad)
+                return None
+
+            # matching the key, cheap hash check first
+            if not hash_entry.is_tombstone and \
+                    hash_entry.hash_value == key_hash and \
+                    hash_entry.key == key:
+                if self._stats is not None:
+                    self._stats.length(quad)
+                return hash_entry
+
+            # probe triangularly on power of two tables, else quadratically
+            if mask:
+                hash_index = (hash_index + quad) & mask
             else:
-                # only buckets with 'valid' keys get replaced
-                current_key = current_bucket.key
-                current_value = current_bucket.value
+                hash_index = (key_hash + quad * quad) % capacity
+            quad += 1
 
-                self.put(current_key, current_value)
+        if self._stats is not None:
+            self._stats.length(capacity)
+        return None
 
-    def get(self, key: str) -> object:
+    def _lookup(self, key: str, key_hash: int) -> HashEntry:
         """
-        Provides the associated value of the provided key. If key doesn't
-        exist in the hash map, then it returns None.
+        Finds the live entry of the provided key in the current table and,
+        while a resize is in progress, in the old table too.
 
         :param key: A string as the key in the desired key-value pair.
-        :return: value: An object of the key-value pair.
+        :param key_hash: The full hash of the key.
+        :return: HashEntry: The live entry holding the key.
         :return: None: The key was not found in the hash map.
         """
-        # initialize value to return
-        value = None
+        hash_entry = self._find_entry(self._buckets, self._capacity,
+                                      key, key_hash)
 
-        # generate the hash index
-        hash_index = self._hash_function(key) % self._capacity
+        # a key that wasn't moved yet is still in the old table
+        if hash_entry is None and self._old_buckets is not None:
+            hash_entry = self._find_entry(self._old_buckets,
+                                          self._old_capacity, key, key_hash)
 
-        # initialize trackers for ending while loop
-        end_search = False
-        found = False
-        quad = 1  # helps with quadratic probing
+        return hash_entry
 
-        # find the desired key
-        while not end_search and not found:
+    def _get_hashed(self, key: str, key_hash: int,
+                    default: object = None) -> object:
+        """
+        Provides the value of a key that was already hashed.
 
-            # see the bucket contents
-            hash_entry = self._buckets.get_at_index(hash_index)
+        :param key: A string as the key in the desired key-value pair.
+        :param key_hash: The full hash of the key.
+        :param default: What to return when the key isn't found.
+        :return: The value of the key, or default when it isn't found.
+        """
+        hash_entry = self._lookup(key, key_hash)
+        if hash_entry is None:
+            return default
 
-            if hash_entry is None:
-                end_search = True
+        return hash_entry.value
 
-            # finding the bucket with desired key
-            elif not hash_entry.is_tombstone and hash_entry.key == key:
-                value = hash_entry.value
-                found = True
-            else:
-                # calculate a new hash using quadratic probing
-                hash_index = (self._hash_function(key) + quad**2)\
-                             % self._capacity
-                quad += 1
+    def get(self, key: str) -> object:
+        """
+        Provides the associated value of the provided key. If key doesn't
+        exist in the hash map, then it returns None.
+
+        :param key: A string as the key in the desired key-value pair.
+        :return: value: An object of the key-value pair.
+        :return: None: The key was not found in the hash map.
+        """
+        # move some buckets along when a resize is in progress
+        if self._old_buckets is not None:
+            self._rehash_some()
+
+        if self._stats is None:
+            return self._get_hashed(key, self._hash_function(key))
 
-        return value
+        value = self._get_hashed(key, self._hash_function(key), _MISSING)
+        self._stats.lookup("get", value is not _MISSING)
+        return None if value is _MISSING else value
 
     def contains_key(self, key: str) -> bool:
         """
@@ -215,33 +931,19 @@ class HashMap:
         """
         # case where empty hash map doesn't contain any key-value pairs
         if self._size == 0:
+            if self._stats is not None:
+                self._stats.lookup("contains_key", False)
             return False
 
-        # get the hash entry at the intended hash index
-        hash_index = self._hash_function(key) % self._capacity
+        # move some buckets along when a resize is in progress
+        if self._old_buckets is not None:
+            self._rehash_some()
 
-        # initialize when while loop may end
-        end_search = False
-        quad = 1
-
-        while not end_search:
-            hash_entry = self._buckets.get_at_index(hash_index)
-
-            if hash_entry is None:
-                end_search = True
-
-            # matching the key
-            elif not hash_entry.is_tombstone and hash_entry.key == key:
-                return True
-
-            # calculate a new hash using quadratic probing
-            else:
-                hash_index = (self._hash_function(key) + quad**2)\
-                             % self._capacity
-                quad += 1
-
-        # case where no matching key-value pair was found
-        return False
+        found = self._get_hashed(key, self._hash_function(key),
+                                 _MISSING) is not _MISSING
+        if self._stats is not None:
+            self._stats.lookup("contains_key", found)
+        return found
 
     def remove(self, key: str) -> None:
         """
@@ -252,33 +954,42 @@ class HashMap:
         """
         # case where empty hash map doesn't contain any key-value pairs
         if self._size == 0:
+            if self._stats is not None:
+                self._stats.lookup("remove", False)
             return
 
-        # get the hash entry at the intended hash index
-        hash_index = self._hash_function(key) % self._capacity
-
-        # initialize when while loop may end
-        end_search = False
-        found = False
-        quad = 1
-
-        while not end_search and not found:
-            hash_entry = self._buckets.get_at_index(hash_index)
+        # move some buckets along when a resize is in progress
+        if self._old_buckets is not None:
+            self._rehash_some()
 
-            if hash_entry is None:
-                end_search = True
+        size = self._size
+        self._remove_hashed(key, self._hash_function(key))
+        if self._stats is not None:
+            self._stats.lookup("remove", self._size < size)
 
-            # transform hash entry to tombstone
-            elif not hash_entry.is_tombstone and hash_entry.key == key:
-                hash_entry.is_tombstone = True
-                self._size -= 1
-                found = True
+    def _remove_hashed(self, key: str, key_hash: int) -> None:
+        """
+        Removes the key-value pair of a key that was already hashed.
 
-            else:
-                # calculate a new hash using quadratic probing
-                hash_index = (self._hash_function(key) + quad**2)\
-                             % self._capacity
-                quad += 1
+        :param key: A string as the key in the key-value pair.
+        :param key_hash: The full hash of the key.
+        """
+        hash_entry = self._find_entry(self._buckets, self._capacity,
+                                      key, key_hash)
+
+        # only tombstones of the current table are counted, the old table
+        # of a resize in progress gets dropped with its tombstones
+        if hash_entry is not None:
+            self._tombstones += 1
+        elif self._old_buckets is not None:
+            hash_entry = self._find_entry(self._old_buckets,
+                                          self._old_capacity, key, key_hash)
+
+        # transform hash entry to tombstone
+        if hash_entry is not None:
+            hash_entry.is_tombstone = True
+            self._size -= 1
+            self._modifications += 1
 
     def clear(self) -> None:
         """
@@ -286,11 +997,23 @@ class HashMap:
         maintains the same hash map capacity and its hash function.
         """
         # initialize the new hash table
-        self._buckets = DynamicArray()
-        for _ in range(self._capacity):
-            self._buckets.append(None)
+        self._reset(self._new_table(self._capacity))
 
+    def _reset(self, buckets) -> None:
+        """
+        Drops every pair, and a resize that was in progress along with its
+        data, keeping an empty table built beforehand.
+
+        :param buckets: An empty table of the current capacity.
+        """
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._rehash_index = 0
+
+        self._buckets = buckets
         self._size = 0
+        self._tombstones = 0
+        self._modifications += 1
 
     def get_keys(self) -> DynamicArray:
         """
@@ -298,6 +1021,9 @@ class HashMap:
 
         :return: A dynamic array with all the keys in the hash map.
         """
+        # every key should be in a single table first
+        self._finish_rehash()
+
         # initialize da to return
         da_of_keys = DynamicArray()
 
@@ -316,6 +1042,957 @@ class HashMap:
 
         return da_of_keys
 
+    def _pairs(self):
+        """
+        Streams every key-value pair, bucket by bucket, without copying
+        them.
+
+        :raise RuntimeError: The map was changed during the iteration.
+        """
+        # every pair should be in a single table first
+        self._finish_rehash()
+        modifications = self._modifications
+
+        for bucket_index in range(self._capacity):
+            hash_entry = self._buckets.get_at_index(bucket_index)
+            if hash_entry is not None and not hash_entry.is_tombstone:
+                yield hash_entry.key, hash_entry.value
+                if self._modifications != modifications:
+                    raise RuntimeError("hash map changed during iteration")
+
+    def keys(self):
+        """
+        Streams all the keys in the hash map. Unlike get_keys() nothing is
+        copied, and changing the map while iterating raises RuntimeError.
+
+        :return: A generator of the keys.
+        """
+        return (key for key, _ in self._pairs())
+
+    def values(self):
+        """
+        Streams all the values in the hash map.
+
+        :return: A generator of the values.
+        """
+        return (value for _, value in self._pairs())
+
+    def items(self):
+        """
+        Streams all the key-value pairs in the hash map.
+
+        :return: A generator of (key, value) tuples.
+        """
+        return self._pairs()
+
+    def __iter__(self):
+        """Iterate over the keys of the hash map."""
+        return self.keys()
+
+    def __len__(self) -> int:
+        """Return the amount of key-value pairs in the hash map."""
+        return self._size
+
+    def __contains__(self, key: str) -> bool:
+        """Support 'key in map' through contains_key()."""
+        return self.contains_key(key)
+
+    def put_many(self, pairs) -> None:
+        """
+        Places or updates many key/value pairs at once. The table is sized
+        a single time for the whole batch and every key is hashed before
+        any bucket is touched.
+
+        :param pairs: An iterable of (key, value) tuples.
+        """
+        pairs = list(pairs)
+        if not pairs:
+            return
+
+        key_hashes = hash_keys(self._hash_function,
+                               [pair[0] for pair in pairs])
+
+        # move buckets along as if each pair had been put on its own
+        if self._old_buckets is not None:
+            self._rehash_some((self._rehash_step or 1) * len(pairs))
+
+        # size the table once, assuming every key in the batch is new
+        expected = self._size + len(pairs)
+        new_capacity = self._capacity
+        while expected / new_capacity >= self._max_load:
+            new_capacity = self._legal_capacity(new_capacity * 2)
+
+        if new_capacity != self._capacity:
+            self.resize_table(new_capacity)
+
+        # clear out the tombstones if the batch would clog the table
+        elif expected + self._tombstones >= \
+                self._max_fill * self._capacity:
+            self.resize_table(self._capacity)
+
+        if self._stats is not None:
+            self._stats.count("put", len(pairs))
+
+        for index in range(len(pairs)):
+            key, value = pairs[index]
+            self._put_hashed(key, value, key_hashes[index])
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Provides the values of many keys at once, with None for every key
+        that isn't in the hash map.
+
+        :param keys: An iterable of keys.
+        :return: A dynamic array with the value of each key, in order.
+        """
+        keys = list(keys)
+        key_hashes = hash_keys(self._hash_function, keys)
+
+        # move buckets along as if each key had been looked up on its own
+        if self._old_buckets is not None and keys:
+            self._rehash_some((self._rehash_step or 1) * len(keys))
+
+        values = DynamicArray()
+        for index in range(len(keys)):
+            value = self._get_hashed(keys[index], key_hashes[index],
+                                     _MISSING)
+            if self._stats is not None:
+                self._stats.lookup("get", value is not _MISSING)
+            values.append(None if value is _MISSING else value)
+
+        return values
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Verifies many keys at once.
+
+        :param keys: An iterable of keys.
+        :return: A dynamic array with True or False for each key, in order.
+        """
+        keys = list(keys)
+        key_hashes = hash_keys(self._hash_function, keys)
+
+        # move buckets along as if each key had been looked up on its own
+        if self._old_buckets is not None and keys:
+            self._rehash_some((self._rehash_step or 1) * len(keys))
+
+        found = DynamicArray()
+        for index in range(len(keys)):
+            is_found = self._get_hashed(keys[index], key_hashes[index],
+                                        _MISSING) is not _MISSING
+            if self._stats is not None:
+                self._stats.lookup("contains_key", is_found)
+            found.append(is_found)
+
+        return found
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes the key-value pairs of many keys at once. Keys that aren't
+        in the hash map are skipped.
+
+        :param keys: An iterable of keys.
+        """
+        keys = list(keys)
+        if self._size == 0 or not keys:
+            return
+
+        key_hashes = hash_keys(self._hash_function, keys)
+
+        # move buckets along as if each key had been removed on its own
+        if self._old_buckets is not None:
+            self._rehash_some((self._rehash_step or 1) * len(keys))
+
+        size = self._size
+        for index in range(len(keys)):
+            self._remove_hashed(keys[index], key_hashes[index])
+        if self._stats is not None:
+            self._stats.batch("remove", len(keys), size - self._size)
+
+    def dump(self, path: str) -> None:
+        """
+        Writes the hash map to a snapshot file that load() reads back.
+        The file holds the capacity, hash function name and size, then
+        every pair as a length-prefixed record, and a checksum.
+
+        :param path: The file to write.
+        """
+        write_snapshot(path, self._capacity, self._hash_function,
+                       self._size, self.items())
+
+    @classmethod
+    def load(cls, path: str, function=None, **options) -> "HashMap":
+        """
+        Builds a hash map from a snapshot file written by dump(). The table
+        is sized for every pair before the first one goes in, and the
+        pairs are placed straight into open buckets, a chunk at a time,
+        without looking for duplicates, so nothing is resized or searched.
+
+        :param path: The file to read.
+        :param function: The hash function, by default the one named in
+        the file, which has to be in HASH_FUNCTIONS.
+        :param options: Further options for the constructor, such as
+        storage or probing.
+        :return: A new HashMap holding the pairs of the file.
+        :raise ValueError: The file is not a snapshot, is corrupt, or
+        names an unknown hash function.
+        """
+        capacity, function, size, chunks = read_snapshot(path, function)
+        hash_map = cls(max(capacity, 1), function, **options)
+
+        # grow the empty table once when the load would go too high
+        new_capacity = hash_map._capacity
+        while size / new_capacity >= hash_map._max_load:
+            new_capacity = hash_map._legal_capacity(new_capacity * 2)
+        if new_capacity != hash_map._capacity:
+            hash_map.resize_table(new_capacity)
+
+        for pairs in chunks:
+            hash_map._place_pairs(pairs, hash_keys(
+                hash_map._hash_function, [pair[0] for pair in pairs]))
+
+        return hash_map
+
+    def _place_pairs(self, pairs: list, key_hashes: list) -> None:
+        """
+        Places pairs whose keys are neither in the table nor repeated,
+        without checking the load.
+
+        :param pairs: A list of (key, value) tuples.
+        :param key_hashes: The full hash of each key.
+        """
+        for index in range(len(pairs)):
+            key, value = pairs[index]
+            self._place_entry(HashEntry(key, value, key_hashes[index]))
+        self._size += len(pairs)
+        self._modifications += 1
+
+
+def _next_prime(number: int) -> int:
+    """Return the smallest prime that is at least number."""
+    if number <= 2:
+        return 2
+    if number % 2 == 0:
+        number += 1
+
+    # try odd numbers in turn, checking odd divisors up to the root
+    while True:
+        divisor = 3
+        while divisor * divisor <= number and number % divisor != 0:
+            divisor += 2
+        if divisor * divisor > number:
+            return number
+        number += 2
+
+
+# bucket states of the compact storage
+_EMPTY = 0
+_LIVE = 1
+_TOMBSTONE = 2
+
+# the compact storage keeps hashes as unsigned 64 bit integers
+_HASH_MASK = (1 << 64) - 1
+
+
+class _CompactTable:
+    """
+    Parallel arrays holding the buckets of a CompactHashMap: the hash
+    and state of every bucket in flat arrays, the keys and values in
+    plain lists.
+    """
+
+    __slots__ = ("hashes", "states", "keys", "values")
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize a table where every bucket is open."""
+        self.hashes = array("Q", bytes(8 * capacity))
+        self.states = bytearray(capacity)
+        self.keys = [None] * capacity
+        self.values = [None] * capacity
+
+    def length(self) -> int:
+        """Return the amount of buckets."""
+        return len(self.states)
+
+    def __getitem__(self, index: int) -> HashEntry:
+        """
+        Return the bucket at a given index as a HashEntry, or None when
+        it is open, so the table prints like the entries storage.
+        """
+        state = self.states[index]
+        if state == _EMPTY:
+            return None
+
+        entry = HashEntry(self.keys[index], self.values[index],
+                          self.hashes[index])
+        entry.is_tombstone = state == _TOMBSTONE
+        return entry
+
+
+class CompactHashMap(HashMap):
+    """
+    HashMap that stores its buckets in parallel arrays instead of one
+    HashEntry object per bucket. Build it with
+    HashMap(capacity, function, storage="compact").
+    """
+
+    def _new_table(self, capacity: int) -> _CompactTable:
+        """
+        Builds an empty table of the provided capacity.
+
+        :param capacity: The amount of buckets.
+        :return: A compact table where every bucket is open.
+        """
+        return _CompactTable(capacity)
+
+    def _build_table(self, capacity: int, step: int):
+        """
+        Builds an empty table. Its arrays are allocated in C, fast enough
+        to build in one go, so it never yields.
+
+        :param capacity: The amount of buckets.
+        :param step: Unused, the table is built at once.
+        :return: The table, as the value of the finished generator.
+        """
+        yield from ()
+        return self._new_table(capacity)
+
+    def _keys_between(self, da: DynamicArray, start: int, stop: int) -> None:
+        """
+        Appends the keys found between two indices of the current table.
+
+        :param da: The dynamic array to append to.
+        :param start: The first index to look at.
+        :param stop: The index to stop before.
+        """
+        states, keys = self._buckets.states, self._buckets.keys
+        for bucket_index in range(start, stop):
+            if states[bucket_index] == _LIVE:
+                da.append(keys[bucket_index])
+
+    def _find_index(self, table: _CompactTable, capacity: int,
+                    key: str, key_hash: int) -> int:
+        """
+        Probes a table for the live bucket of the provided key.
+
+        :param table: The table to search.
+        :param capacity: The capacity of that table.
+        :param key: A string as the key in the desired key-value pair.
+        :param key_hash: The masked hash of the key.
+        :return: The index of the bucket holding the key, -1 if not found.
+        """
+        hashes, states, keys = table.hashes, table.states, table.keys
+        mask = self._probe_mask(capacity)
+        hash_index = key_hash & mask if mask else \
+            key_hash % capacity
+        quad = 1  # helps with quadratic probing
+
+        # quadratic probing may never reach an open bucket, but after
+        # capacity probes it only revisits buckets it has seen
+        while quad <= capacity:
+            state = states[hash_index]
+
+            # an open bucket ends the probe sequence
+            if state == _EMPTY:
+                if self._stats is not None:
+                    self._stats.length(quad)
+                return -1
+
+            # matching the key, cheap hash check first
+            if state == _LIVE and hashes[hash_index] == key_hash and \
+                    keys[hash_index] == key:
+                if self._stats is not None:
+                    self._stats.length(quad)
+                return hash_index
+
+            # probe triangularly on power of two tables, else quadratically
+            if mask:
+                hash_index = (hash_index + quad) & mask
+            else:
+                hash_index = (key_hash + quad * quad) % capacity
+            quad += 1
+
+        if self._stats is not None:
+            self._stats.length(capacity)
+        return -1
+
+    def _put_hashed(self, key: str, value: object, key_hash: int) -> None:
+        """
+        Places or updates a key/value pair whose key was already hashed,
+        without checking the load first.
+
+        :param key: A string to serve as the key in the key-value pair.
+        :param value: The desired value to store in the hash map.
+        :param key_hash: The full hash of the key.
+        """
+        key_hash &= _HASH_MASK
+
+        # a key that wasn't moved yet gets updated in the old table
+        if self._old_buckets is not None:
+            hash_index = self._find_index(self._old_buckets,
+                                          self._old_capacity, key, key_hash)
+            if hash_index != -1:
+                self._old_buckets.values[hash_index] = value
+                return
+
+        table = self._buckets
+        hashes, states, keys = table.hashes, table.states, table.keys
+        mask = self._probe_mask(self._capacity)
+        hash_index = key_hash & mask if mask else \
+            key_hash % self._capacity
+
+        # first tombstone seen, reused when the key isn't further along
+        free_index = -1
+        quad = 1  # helps with quadratic probing
+
+        # attempt to place into a bucket, for as long as the probe can
+        # still reach buckets it hasn't seen
+        while quad <= self._capacity:
+            state = states[hash_index]
+
+            # an open bucket ends the search, the key is new
+            if state == _EMPTY:
+                if free_index == -1:
+                    free_index = hash_index
+                if self._stats is not None:
+                    self._stats.length(quad)
+                break
+
+            # remember the first tombstone but keep looking for the key
+            if state == _TOMBSTONE:
+                if free_index == -1:
+                    free_index = hash_index
+
+            # update existing key-value pair, cheap hash check first
+            elif hashes[hash_index] == key_hash and keys[hash_index] == key:
+                table.values[hash_index] = value
+                if self._stats is not None:
+                    self._stats.length(quad)
+                return
+
+            # probe triangularly on power of two tables, else quadratically
+            if mask:
+                hash_index = (hash_index + quad) & mask
+            else:
+                hash_index = (key_hash + quad * quad) % self._capacity
+            quad += 1
+
+        # no open bucket is reachable, make room and place the pair there
+        else:
+            if self._stats is not None:
+                self._stats.length(self._capacity)
+            if free_index == -1:
+                self.resize_table(self._capacity * 2)
+                self._put_hashed(key, value, key_hash)
+                return
+
+        if states[free_index] == _TOMBSTONE:
+            self._tombstones -= 1
+        self._fill_bucket(free_index, key_hash, key, value)
+        self._size += 1
+        self._modifications += 1
+
+    def _update_existing(self, key: str, value: object,
+                         key_hash: int) -> bool:
+        """
+        Updates the value of a key that is already in the hash map.
+
+        :param key: A string to serve as the key in the key-value pair.
+        :param value: The desired value to store in the hash map.
+        :param key_hash: The masked hash of the key.
+        :return: True when the key was found and updated, False otherwise.
+        """
+        table = self._buckets
+        hash_index = self._find_index(table, self._capacity, key, key_hash)
+
+        # a key that wasn't moved yet gets updated in the old table
+        if hash_index == -1 and self._old_buckets is not None:
+            table = self._old_buckets
+            hash_index = self._find_index(table, self._old_capacity,
+                                          key, key_hash)
+
+        if hash_index == -1:
+            return False
+
+        table.values[hash_index] = value
+        return True
+
+    def _place_pair(self, key_hash: int, key: str, value: object) -> None:
+        """
+        Places a pair whose key isn't in the current table yet.
+
+        :param key_hash: The masked hash of the key.
+        :param key: A string to serve as the key in the key-value pair.
+        :param value: The desired value to store in the hash map.
+        """
+        states = self._buckets.states
+        mask = self._probe_mask(self._capacity)
+        hash_index = key_hash & mask if mask else \
+            key_hash % self._capacity
+        quad = 1
+
+        # probe until an open bucket or a tombstone is found, for as long
+        # as the probe can still reach buckets it hasn't seen
+        while states[hash_index] == _LIVE:
+            if quad > self._capacity:
+                self._grow_table()
+                self._place_pair(key_hash, key, value)
+                return
+            if mask:
+                hash_index = (hash_index + quad) & mask
+            else:
+                hash_index = (key_hash + quad * quad) % self._capacity
+            quad += 1
+        if states[hash_index] == _TOMBSTONE:
+            self._tombstones -= 1
+
+        self._fill_bucket(hash_index, key_hash, key, value)
+
+    def _place_pairs(self, pairs: list, key_hashes: list) -> None:
+        """
+        Places pairs whose keys are neither in the table nor repeated,
+        without checking the load.
+
+        :param pairs: A list of (key, value) tuples.
+        :param key_hashes: The full hash of each key.
+        """
+        for index in range(len(pairs)):
+            key, value = pairs[index]
+            self._place_pair(key_hashes[index] & _HASH_MASK, key, value)
+        self._size += len(pairs)
+        self._modifications += 1
+
+    def _bury(self, table: _CompactTable, hash_index: int) -> None:
+        """
+        Turns a bucket into a tombstone and lets go of its pair, without
+        touching any other bucket.
+
+        :param table: The table holding the bucket.
+        :param hash_index: The index of the bucket.
+        """
+        table.states[hash_index] = _TOMBSTONE
+        table.keys[hash_index] = table.values[hash_index] = None
+
+    def _delete_index(self, hash_index: int) -> None:
+        """
+        Removes the pair at an index of the current table.
+
+        :param hash_index: The index of the bucket.
+        """
+        self._bury(self._buckets, hash_index)
+        self._tombstones += 1
+
+    def _fill_bucket(self, hash_index: int, key_hash: int, key: str,
+                     value: object) -> None:
+        """Writes a live key-value pair into a bucket of the current table."""
+        table = self._buckets
+        table.hashes[hash_index] = key_hash
+        table.states[hash_index] = _LIVE
+        table.keys[hash_index] = key
+        table.values[hash_index] = value
+
+    def _move_buckets(self, table: _CompactTable, start: int,
+                      stop: int) -> None:
+        """
+        Moves the live pairs found between two indices of another table
+        into the current table. Each moved bucket becomes a tombstone in
+        the other table so its probe sequences aren't broken.
+
+        :param table: The table to move pairs out of.
+        :param start: The first index to move.
+        :param stop: The index to stop before.
+        """
+        hashes, states = table.hashes, table.states
+        keys, values = table.keys, table.values
+
+        for index in range(start, stop):
+            if states[index] == _LIVE:
+                self._place_pair(hashes[index], keys[index], values[index])
+                self._bury(table, index)
+
+    def _get_hashed(self, key: str, key_hash: int,
+                    default: object = None) -> object:
+        """
+        Provides the value of a key that was already hashed.
+
+        :param key: A string as the key in the desired key-value pair.
+        :param key_hash: The full hash of the key.
+        :param default: What to return when the key isn't found.
+        :return: The value of the key, or default when it isn't found.
+        """
+        key_hash &= _HASH_MASK
+        hash_index = self._find_index(self._buckets, self._capacity,
+                                      key, key_hash)
+        if hash_index != -1:
+            return self._buckets.values[hash_index]
+
+        # a key that wasn't moved yet is still in the old table
+        if self._old_buckets is not None:
+            hash_index = self._find_index(self._old_buckets,
+                                          self._old_capacity, key, key_hash)
+            if hash_index != -1:
+                return self._old_buckets.values[hash_index]
+
+        return default
+
+    def _remove_hashed(self, key: str, key_hash: int) -> None:
+        """
+        Removes the key-value pair of a key that was already hashed.
+
+        :param key: A string as the key in the key-value pair.
+        :param key_hash: The full hash of the key.
+        """
+        key_hash &= _HASH_MASK
+        hash_index = self._find_index(self._buckets, self._capacity,
+                                      key, key_hash)
+
+        if hash_index != -1:
+            self._delete_index(hash_index)
+            self._size -= 1
+            self._modifications += 1
+
+        # the old table of a resize in progress only gets tombstones, so
+        # its buckets stay where the move expects them
+        elif self._old_buckets is not None:
+            hash_index = self._find_index(self._old_buckets,
+                                          self._old_capacity, key, key_hash)
+            if hash_index != -1:
+                self._bury(self._old_buckets, hash_index)
+                self._size -= 1
+                self._modifications += 1
+
+    def get_keys(self) -> DynamicArray:
+        """
+        Provides all the keys in the hash map.
+
+        :return: A dynamic array with all the keys in the hash map.
+        """
+        # every key should be in a single table first
+        self._finish_rehash()
+
+        da_of_keys = DynamicArray()
+        states, keys = self._buckets.states, self._buckets.keys
+        for bucket_index in range(self._capacity):
+            if states[bucket_index] == _LIVE:
+                da_of_keys.append(keys[bucket_index])
+
+        return da_of_keys
+
+    def _pairs(self):
+        """
+        Streams every key-value pair, bucket by bucket, without copying
+        them.
+
+        :raise RuntimeError: The map was changed during the iteration.
+        """
+        # every pair should be in a single table first
+        self._finish_rehash()
+        modifications = self._modifications
+        table = self._buckets
+
+        for bucket_index in range(self._capacity):
+            if table.states[bucket_index] == _LIVE:
+                yield table.keys[bucket_index], table.values[bucket_index]
+                if self._modifications != modifications:
+                    raise RuntimeError("hash map changed during iteration")
+
+
+class RobinHoodHashMap(CompactHashMap):
+    """
+    HashMap that probes linearly with Robin Hood displacement: a pair
+    that is further from its home bucket takes the bucket of a pair that
+    is closer to its own. Removals shift the following pairs back, so the
+    table never holds tombstones. Build it with
+    HashMap(capacity, function, probing="robin_hood").
+    """
+
+    _DEFAULT_MAX_LOAD = 0.875
+    _DEFAULT_MAX_FILL = 1.0
+
+    def _find_index(self, table: _CompactTable, capacity: int,
+                    key: str, key_hash: int) -> int:
+        """
+        Probes a table for the live bucket of the provided key.
+
+        :param table: The table to search.
+        :param capacity: The capacity of that table.
+        :param key: A string as the key in the desired key-value pair.
+        :param key_hash: The masked hash of the key.
+        :return: The index of the bucket holding the key, -1 if not found.
+        """
+        hashes, states, keys = table.hashes, table.states, table.keys
+        hash_index = key_hash % capacity
+        distance = 0
+
+        while True:
+            state = states[hash_index]
+
+            # an open bucket ends the probe sequence, and so does a pair
+            # closer to its home that the key would have displaced
+            if state == _EMPTY or \
+                    (hash_index - hashes[hash_index]) % capacity < distance:
+                if self._stats is not None:
+                    self._stats.length(distance + 1)
+                return -1
+
+            # matching the key, cheap hash check first
+            if state == _LIVE and hashes[hash_index] == key_hash and \
+                    keys[hash_index] == key:
+                if self._stats is not None:
+                    self._stats.length(distance + 1)
+                return hash_index
+
+            hash_index += 1
+            if hash_index == capacity:
+                hash_index = 0
+            distance += 1
+
+    def _put_hashed(self, key: str, value: object, key_hash: int) -> None:
+        """
+        Places or updates a key/value pair whose key was already hashed,
+        without checking the load first.
+
+        :param key: A string to serve as the key in the key-value pair.
+        :param value: The desired value to store in the hash map.
+        :param key_hash: The full hash of the key.
+        """
+        key_hash &= _HASH_MASK
+        if not self._update_existing(key, value, key_hash):
+            self._place_pair(key_hash, key, value)
+            self._size += 1
+            self._modifications += 1
+
+    def _place_pair(self, key_hash: int, key: str, value: object) -> None:
+        """
+        Places a pair whose key isn't in the current table yet, swapping
+        it with every pair on the way that is closer to its home bucket.
+
+        :param key_hash: The masked hash of the key.
+        :param key: A string to serve as the key in the key-value pair.
+        :param value: The desired value to store in the hash map.
+        """
+        table = self._buckets
+        hashes, states = table.hashes, table.states
+        keys, values = table.keys, table.values
+        capacity = self._capacity
+        hash_index = key_hash % capacity
+        distance = 0
+
+        while states[hash_index] != _EMPTY:
+            home_distance = (hash_index - hashes[hash_index]) % capacity
+
+            # take the bucket and carry the displaced pair further along
+            if home_distance < distance:
+                key_hash, hashes[hash_index] = hashes[hash_index], key_hash
+                key, keys[hash_index] = keys[hash_index], key
+                value, values[hash_index] = values[hash_index], value
+                distance = home_distance
+
+            hash_index += 1
+            if hash_index == capacity:
+                hash_index = 0
+            distance += 1
+
+        self._fill_bucket(hash_index, key_hash, key, value)
+
+    def _delete_index(self, hash_index: int) -> None:
+        """
+        Removes the pair at an index of the current table and shifts the
+        pairs after it back by one until one is already in its home
+        bucket.
+
+        :param hash_index: The index of the bucket.
+        """
+        table = self._buckets
+        hashes, states = table.hashes, table.states
+        keys, values = table.keys, table.values
+        capacity = self._capacity
+
+        next_index = (hash_index + 1) % capacity
+        while states[next_index] == _LIVE and \
+                (next_index - hashes[next_index]) % capacity != 0:
+            hashes[hash_index] = hashes[next_index]
+            keys[hash_index] = keys[next_index]
+            values[hash_index] = values[next_index]
+            hash_index = next_index
+            next_index = (next_index + 1) % capacity
+
+        states[hash_index] = _EMPTY
+        keys[hash_index] = values[hash_index] = None
+
+
+# group probing scans this many control bytes at a time
+_GROUP_SIZE = 16
+
+# control bytes of buckets without a pair, live buckets hold a 7 bit tag
+_CTRL_EMPTY = 0x80
+_CTRL_DELETED = 0xFE
+
+
+class _GroupTable(_CompactTable):
+    """
+    Compact table with a control byte per bucket for group probing.
+    """
+
+    __slots__ = ("ctrl",)
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize a table where every bucket is open."""
+        super().__init__(capacity)
+        self.ctrl = bytearray([_CTRL_EMPTY]) * capacity
+
+
+class GroupProbingHashMap(CompactHashMap):
+    """
+    HashMap that probes a group of buckets at a time, like SwissTable.
+    Every live bucket has a control byte with a 7 bit tag of its hash, so
+    a group is searched with a single bytes scan and only buckets with a
+    matching tag get their key compared. The next group is tried only
+    when the group has no open bucket. Build it with
+    HashMap(capacity, function, probing="group").
+    """
+
+    _DEFAULT_MAX_LOAD = 0.875
+    _DEFAULT_MAX_FILL = 0.9375
+
+    def _new_table(self, capacity: int) -> _GroupTable:
+        """
+        Builds an empty table of the provided capacity.
+
+        :param capacity: The amount of buckets.
+        :return: A group table where every bucket is open.
+        """
+        return _GroupTable(capacity)
+
+    def _find_index(self, table: _GroupTable, capacity: int,
+                    key: str, key_hash: int) -> int:
+        """
+        Probes a table group by group for the live bucket of the key.
+
+        :param table: The table to search.
+        :param capacity: The capacity of that table.
+        :param key: A string as the key in the desired key-value pair.
+        :param key_hash: The masked hash of the key.
+        :return: The index of the bucket holding the key, -1 if not found.
+        """
+        ctrl, hashes, keys = table.ctrl, table.hashes, table.keys
+        tag = key_hash % 127
+        group_count = -(-capacity // _GROUP_SIZE)
+        group = key_hash % group_count
+
+        # probe lengths of this map count groups, not buckets
+        for scanned in range(1, group_count + 1):
+            start = group * _GROUP_SIZE
+            stop = min(start + _GROUP_SIZE, capacity)
+
+            # compare keys only in the buckets with a matching tag
+            hash_index = ctrl.find(tag, start, stop)
+            while hash_index != -1:
+                if hashes[hash_index] == key_hash and \
+                        keys[hash_index] == key:
+                    if self._stats is not None:
+                        self._stats.length(scanned)
+                    return hash_index
+                hash_index = ctrl.find(tag, hash_index + 1, stop)
+
+            # an open bucket means the key was never pushed further along
+            if ctrl.find(_CTRL_EMPTY, start, stop) != -1:
+                break
+
+            group += 1
+            if group == group_count:
+                group = 0
+
+        if self._stats is not None:
+            self._stats.length(scanned)
+        return -1
+
+    def _put_hashed(self, key: str, value: object, key_hash: int) -> None:
+        """
+        Places or updates a key/value pair whose key was already hashed,
+        without checking the load first.
+
+        :param key: A string to serve as the key in the key-value pair.
+        :param value: The desired value to store in the hash map.
+        :param key_hash: The full hash of the key.
+        """
+        key_hash &= _HASH_MASK
+        if not self._update_existing(key, value, key_hash):
+            self._place_pair(key_hash, key, value)
+            self._size += 1
+            self._modifications += 1
+
+    def _place_pair(self, key_hash: int, key: str, value: object) -> None:
+        """
+        Places a pair whose key isn't in the current table yet, in the
+        first group along its probe sequence with a free bucket.
+
+        :param key_hash: The masked hash of the key.
+        :param key: A string to serve as the key in the key-value pair.
+        :param value: The desired value to store in the hash map.
+        """
+        ctrl = self._buckets.ctrl
+        group_count = -(-self._capacity // _GROUP_SIZE)
+        group = key_hash % group_count
+
+        while True:
+            start = group * _GROUP_SIZE
+            stop = min(start + _GROUP_SIZE, self._capacity)
+
+            # reuse a tombstone before taking an open bucket
+            hash_index = ctrl.find(_CTRL_DELETED, start, stop)
+            if hash_index != -1:
+                self._tombstones -= 1
+                break
+            hash_index = ctrl.find(_CTRL_EMPTY, start, stop)
+            if hash_index != -1:
+                break
+
+            group += 1
+            if group == group_count:
+                group = 0
+
+        self._fill_bucket(hash_index, key_hash, key, value)
+
+    def _fill_bucket(self, hash_index: int, key_hash: int, key: str,
+                     value: object) -> None:
+        """Writes a live key-value pair into a bucket of the current table."""
+        super()._fill_bucket(hash_index, key_hash, key, value)
+        self._buckets.ctrl[hash_index] = key_hash % 127
+
+    def _bury(self, table: _GroupTable, hash_index: int) -> None:
+        """
+        Turns a bucket into a tombstone and lets go of its pair, without
+        touching any other bucket.
+
+        :param table: The table holding the bucket.
+        :param hash_index: The index of the bucket.
+        """
+        super()._bury(table, hash_index)
+        table.ctrl[hash_index] = _CTRL_DELETED
+
+    def _delete_index(self, hash_index: int) -> None:
+        """
+        Removes the pair at an index of the current table. A group that
+        still has an open bucket was never full, so no probe went past it
+        and the bucket can be opened again instead of becoming a
+        tombstone.
+
+        :param hash_index: The index of the bucket.
+        """
+        table = self._buckets
+        start = hash_index - hash_index % _GROUP_SIZE
+        stop = min(start + _GROUP_SIZE, self._capacity)
+
+        if table.ctrl.find(_CTRL_EMPTY, start, stop) == -1:
+            self._bury(table, hash_index)
+            self._tombstones += 1
+            return
+
+        table.ctrl[hash_index] = _CTRL_EMPTY
+        table.states[hash_index] = _EMPTY
+        table.keys[hash_index] = table.values[hash_index] = None
+
 
 # ------------------- BASIC TESTING ---------------------------------------- #
 
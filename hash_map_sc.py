@@ -6,17 +6,105 @@
 # Description:  An implementation of the HashMap withs chaining and its methods.
 
 
-from a6_include import (DynamicArray, LinkedList,
-                        hash_function_1, hash_function_2)
+import heapq
+import itertools
+import math
+import time
+
+from a6_include import (DynamicArray, LinkedList, MapStats, SLNode,
+                        TreeChain, hash_keys, read_snapshot, seeded_hash,
+                        write_snapshot, hash_function_1, hash_function_2)
+
+
+# pairs from_items() hands to put_many() at a time
+_BUILD_CHUNK = 4096
 
 
 class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+    def __init__(self, capacity: int, function,
+                 max_load_factor: float = None,
+                 min_load_factor: float = None,
+                 growth_factor: float = 2,
+                 min_capacity: int = None,
+                 rehash_step: int = None,
+                 free_list_size: int = 0,
+                 stats: bool = False,
+                 seed=None,
+                 treeify_threshold: int = None,
+                 node_class: type = SLNode) -> None:
         """
         Initialize new HashMap that uses
         separate chaining for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+
+        The growth policy is opt-in so the default map keeps the fixed
+        capacity the assignment specifies. When max_load_factor is given,
+        put() grows the table by growth_factor once the load goes above it.
+        When min_load_factor is given, remove() shrinks the table by
+        growth_factor once the load drops below it, but never under
+        min_capacity (or 1 when no floor is given).
+
+        Resizes made by the growth policy are done all at once by default.
+        When rehash_step is given they are done incrementally instead: the
+        old and new tables live side by side and every put, get,
+        contains_key and remove moves rehash_step old buckets over.
+
+        When free_list_size is given, remove() keeps up to that many
+        unlinked nodes around and put() reuses them for new pairs instead
+        of allocating.
+
+        When stats is True the map counts its operations, hits and misses,
+        the length of every chain it searches and its resizes, which
+        stats() reports. Without it the counting costs next to nothing.
+
+        Keys that hash alike can be crafted on purpose to make chains, and
+        with them every lookup, O(n). When seed is given it is mixed into
+        the hash of every key (see seeded_hash), so where keys land can't
+        be predicted; "random" draws a seed for this map alone. Only
+        xxh64_hash and fnv1a_hash take a seed. When treeify_threshold is
+        given, a chain of the current table longer than that becomes a
+        TreeChain, an AVL tree that finds keys in O(log n), and turns
+        back into a linked list once it is down to half the threshold.
+        Keys must be orderable for that.
+
+        The pairs are held in nodes of node_class, which get_node() and
+        put_node() hand out. A subclass of SLNode with the same
+        constructor can carry more fields for whoever keeps its nodes.
+
+        :param capacity: The initial amount of buckets.
+        :param function: The hash function used for the keys.
+        :param max_load_factor: Load above which put() grows the table.
+        :param min_load_factor: Load below which remove() shrinks the table.
+        :param growth_factor: Multiplier used when growing or shrinking.
+        :param min_capacity: The smallest capacity remove() shrinks to.
+        :param rehash_step: Old buckets moved per operation while resizing.
+        :param free_list_size: The most removed nodes kept for reuse.
+        :param stats: Whether to keep operation statistics.
+        :param seed: None, an int or "random", mixed into the key hashes.
+        :param treeify_threshold: Chain length above which chains become
+        trees.
+        :param node_class: SLNode or a subclass of it, for the nodes.
         """
+        # validate the growth policy before building anything
+        if growth_factor <= 1:
+            raise ValueError("growth_factor must be greater than 1")
+        if max_load_factor is not None and max_load_factor <= 0:
+            raise ValueError("max_load_factor must be positive")
+        if min_load_factor is not None and min_load_factor < 0:
+            raise ValueError("min_load_factor must not be negative")
+        if max_load_factor is not None and min_load_factor is not None \
+                and min_load_factor * growth_factor > max_load_factor:
+            # a shrink would land right above the max load and thrash
+            raise ValueError("min_load_factor * growth_factor must not "
+                             "exceed max_load_factor")
+        if rehash_step is not None and rehash_step < 1:
+            raise ValueError("rehash_step must be at least 1")
+        if free_list_size < 0:
+            raise ValueError("free_list_size must not be negative")
+        if treeify_threshold is not None and treeify_threshold < 2:
+            raise ValueError("treeify_threshold must be at least 2")
+        if seed is not None:
+            function = seeded_hash(function, seed)
+
         self._buckets = DynamicArray()
         for _ in range(capacity):
             self._buckets.append(LinkedList())
@@ -25,6 +113,36 @@ class HashMap:
         self._hash_function = function
         self._size = 0
 
+        # chains of the current table that hold at least one pair
+        self._occupied = 0
+
+        # bumped whenever pairs are added, removed or moved, so iterators
+        # can tell the map changed under them
+        self._modifications = 0
+
+        self._max_load_factor = max_load_factor
+        self._min_load_factor = min_load_factor
+        self._growth_factor = growth_factor
+        self._min_capacity = min_capacity if min_capacity else 1
+
+        # state of an incremental resize, old table is None when idle
+        self._rehash_step = rehash_step
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._rehash_index = 0
+
+        # removed nodes waiting to be reused, linked through their next
+        self._free_list_size = free_list_size
+        self._free_nodes = None
+        self._free_count = 0
+
+        # chains longer than this become trees, None to never treeify
+        self._treeify_threshold = treeify_threshold
+        self._node_class = node_class
+
+        # operation statistics, None unless they were asked for
+        self._stats = MapStats("chain_lengths") if stats else None
+
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
@@ -49,6 +167,10 @@ class HashMap:
         """
         return self._capacity
 
+    def get_hash_function(self) -> object:
+        """Return the hash function of map."""
+        return self._hash_function
+
     # ------------------------------------------------------------------ #
 
     def put(self, key: str, value: object) -> None:
@@ -58,27 +180,134 @@ class HashMap:
         :param key: A string to serve as the key in the key-value pair.
         :param value: The desired value to store in the hash map.
         """
-        # generate a 'hash' index
-        hash_index = self._hash_function(key) % self._capacity
+        self.put_node(key, value)
 
-        # case of empty bucket, new linked list & add key-value pair
-        if self._buckets.get_at_index(hash_index) is None:
-            ll = LinkedList()
-            ll.insert(key, value)
-            self._buckets.set_at_index(hash_index, ll)
-            self._size += 1
-        else:
-            # case of prior entry in target bucket, seek provided key
-            ll = self._buckets.get_at_index(hash_index)
-
-            if ll.contains(key) is not None:
-                # update associated value in key-value pair
-                node_to_update = ll.contains(key)
-                node_to_update.value = value
-            else:
-                # create a new key-value pair node
-                ll.insert(key, value)
-                self._size += 1
+    def put_node(self, key: str, value: object) -> SLNode:
+        """
+        Places or updates a key/value pair like put(), and provides the
+        node holding it.
+
+        :param key: A string to serve as the key in the key-value pair.
+        :param value: The desired value to store in the hash map.
+        :return: The node holding the pair, see get_node().
+        """
+        # move some buckets along when a resize is in progress
+        if self._old_buckets is not None:
+            self._rehash_some()
+
+        if self._stats is not None:
+            self._stats.count("put")
+
+        node = self._put_hashed(key, value, self._hash_function(key))
+
+        # grow the table when the new pair pushed the load too high
+        if self._max_load_factor is not None and \
+                self._size > self._max_load_factor * self._capacity:
+            self._grow()
+
+        return node
+
+    def _put_hashed(self, key: str, value: object,
+                    key_hash: int) -> SLNode:
+        """
+        Places or updates a key/value pair whose key was already hashed,
+        without checking the load afterwards.
+
+        :param key: A string to serve as the key in the key-value pair.
+        :param value: The desired value to store in the hash map.
+        :param key_hash: The hash of the key.
+        :return: The node holding the pair.
+        """
+        # find the linked list holding the key, or the one it belongs in
+        ll, node = self._locate(key, key_hash)
+
+        if node is not None:
+            # update associated value in key-value pair
+            node.value = value
+            return node
+
+        return self._insert_pair(ll, key, value)
+
+    def _insert_pair(self, ll: LinkedList, key: str,
+                     value: object) -> SLNode:
+        """
+        Links a pair whose key isn't in the hash map into a chain of the
+        current table.
+
+        :param ll: The chain the key belongs in.
+        :param key: A string to serve as the key in the key-value pair.
+        :param value: The desired value to store in the hash map.
+        :return: The node holding the pair.
+        """
+        # create a new key-value pair node, recycled when possible
+        if ll.length() == 0:
+            self._occupied += 1
+        node = self._new_node(key, value)
+        ll.insert_node(node)
+        self._size += 1
+        self._modifications += 1
+
+        # a chain that grew too long becomes a tree
+        if self._treeify_threshold is not None and \
+                ll.length() > self._treeify_threshold and \
+                isinstance(ll, LinkedList):
+            self._treeify(self._buckets,
+                          self._hash_function(key) % self._capacity)
+        return node
+
+    def _treeify(self, buckets: DynamicArray, index: int) -> None:
+        """
+        Turns the linked list in a bucket into a TreeChain of its nodes.
+
+        :param buckets: The table holding the bucket.
+        :param index: The index of the bucket.
+        """
+        ll = buckets.get_at_index(index)
+        buckets.set_at_index(index, TreeChain(iter(ll.pop_front, None)))
+
+    def _untreeify(self, index: int) -> None:
+        """
+        Turns the TreeChain in a bucket of the current table back into a
+        linked list of its nodes.
+
+        :param index: The index of the bucket.
+        """
+        tree = self._buckets.get_at_index(index)
+        ll = LinkedList()
+        for node in iter(tree.pop_front, None):
+            ll.insert_node(node)
+        self._buckets.set_at_index(index, ll)
+
+    def increment(self, key: str, amount: int = 1) -> int:
+        """
+        Adds to the number stored for a key, starting from 0 when the key
+        isn't in the hash map yet. The key is hashed and its chain walked
+        only once, where contains_key, get and put would take three.
+
+        :param key: A string to serve as the key in the key-value pair.
+        :param amount: What to add to the stored number.
+        :return: The number stored for the key afterwards.
+        """
+        # move some buckets along when a resize is in progress
+        if self._old_buckets is not None:
+            self._rehash_some()
+
+        if self._stats is not None:
+            self._stats.count("put")
+
+        ll, node = self._locate(key, self._hash_function(key))
+        if node is not None:
+            node.value += amount
+            return node.value
+
+        self._insert_pair(ll, key, amount)
+
+        # grow the table when the new pair pushed the load too high
+        if self._max_load_factor is not None and \
+                self._size > self._max_load_factor * self._capacity:
+            self._grow()
+
+        return amount
 
     def empty_buckets(self) -> int:
         """
@@ -86,16 +315,11 @@ class HashMap:
 
         :return: A positive integer that represents empty buckets.
         """
-        # counter of empty linked lists
-        amount = 0
+        # the count is only meaningful once every pair is in one table
+        self._finish_rehash()
 
-        # go through each bucket and find size 0 ll
-        for index in range(self._capacity):
-            ll = self._buckets.get_at_index(index)
-            if ll.length() == 0:
-                amount += 1
-
-        return amount
+        # every chain that isn't occupied is empty
+        return self._capacity - self._occupied
 
     def table_load(self) -> float:
         """
@@ -107,22 +331,58 @@ class HashMap:
         """
         return self._size / self._capacity
 
+    def stats(self) -> dict:
+        """
+        Provides a snapshot of how the hash map is used.
+
+        :return: A dict with the size, capacity and load. When the map was
+        built with stats=True it also has the operation counts, the hits
+        and misses of get, contains_key and remove, a histogram of the
+        searched chain lengths and the amount and time of resizes.
+        """
+        snapshot = {
+            "enabled": self._stats is not None,
+            "size": self._size,
+            "capacity": self._capacity,
+            "load": self.table_load(),
+        }
+        if self._stats is not None:
+            snapshot.update(self._stats.snapshot())
+        return snapshot
+
     def clear(self) -> None:
         """
         Allows the clearing of all stored data in the hash map. It
         maintains the same hash map capacity and its hash function.
         """
         # create a new da and initiate each bucket
-        self._buckets = DynamicArray()
+        buckets = DynamicArray()
         for _ in range(self._capacity):
-            self._buckets.append(LinkedList())
+            buckets.append(LinkedList())
+
+        self._reset(buckets)
+
+    def _reset(self, buckets: DynamicArray) -> None:
+        """
+        Drops every pair, and a resize that was in progress along with its
+        data, keeping an empty table built beforehand.
+
+        :param buckets: An empty table of the current capacity.
+        """
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._rehash_index = 0
 
+        self._buckets = buckets
         self._size = 0
+        self._occupied = 0
+        self._modifications += 1
 
     def resize_table(self, new_capacity: int) -> None:
         """
         Allows the hash map to be resized to provided capacity. Key-value
-        pairs are re-hashed.
+        pairs are re-hashed. An explicit resize is always done right away,
+        even when the map rehashes incrementally.
 
         :param new_capacity: A positive integer that must at least 1.
         """
@@ -130,25 +390,418 @@ class HashMap:
         if new_capacity < 1:
             return
 
+        # an explicit resize starts from a single table
+        self._finish_rehash()
+        self._modifications += 1
+        started = time.perf_counter()
+
         # initialize the new hash table
         new_buckets = DynamicArray()
         for _ in range(new_capacity):
             new_buckets.append(LinkedList())
 
-        # place key-value pairs from old table into the new one
+        # relink the nodes from old table into the new one
+        occupied = 0
         for index in range(self._capacity):
             current_bucket = self._buckets.get_at_index(index)
             if current_bucket.length() != 0:
-                # transfer each key-value
-                for node in current_bucket:
-                    # generate hash index and insert it to its linked list
-                    new_index = self._hash_function(node.key) % new_capacity
-                    ll = new_buckets.get_at_index(new_index)
-                    ll.insert(node.key, node.value)
+                occupied += self._move_chain(current_bucket, new_buckets,
+                                             new_capacity)
 
         # update pointer to new hash table & new capacity
         self._buckets = new_buckets
         self._capacity = new_capacity
+        self._occupied = occupied
+
+        if self._stats is not None:
+            self._stats.resized(time.perf_counter() - started)
+
+    def _fit_capacity(self, size: int) -> int:
+        """
+        Return the smallest capacity that holds size pairs at the max load
+        factor, or at one pair per bucket without a growth policy.
+        """
+        max_load = self._max_load_factor
+        if max_load is None:
+            max_load = 1.0
+        return max(math.ceil(size / max_load), self._min_capacity, 1)
+
+    def reserve(self, n_expected: int) -> None:
+        """
+        Grows the table once so that n_expected pairs fit without any
+        further resize. It never shrinks the table.
+
+        :param n_expected: The amount of pairs the map will hold.
+        """
+        if n_expected < 0:
+            raise ValueError("n_expected must not be negative")
+
+        new_capacity = self._fit_capacity(n_expected)
+        if new_capacity > self._capacity:
+            self.resize_table(new_capacity)
+
+    def shrink_to_fit(self) -> None:
+        """
+        Shrinks the table to the smallest capacity that holds the current
+        pairs, after a reserve() that asked for more than was put.
+        """
+        new_capacity = self._fit_capacity(self._size)
+        if new_capacity < self._capacity:
+            self.resize_table(new_capacity)
+
+    @classmethod
+    def from_items(cls, pairs, function, expected_size: int = None,
+                   **options) -> "HashMap":
+        """
+        Builds a hash map from key/value pairs with a single sizing of the
+        table. Without expected_size the pairs are counted first. When
+        fewer pairs than expected arrive, the table is shrunk to fit.
+
+        :param pairs: An iterable of (key, value) tuples.
+        :param function: The hash function used for the keys.
+        :param expected_size: The amount of pairs, when known.
+        :param options: Further options for the constructor.
+        :return: A new HashMap holding the pairs.
+        """
+        if expected_size is None:
+            pairs = list(pairs)
+            expected_size = len(pairs)
+
+        hash_map = cls(1, function, **options)
+        hash_map.reserve(expected_size)
+
+        # insert in chunks so a generator is never held in memory whole
+        iterator = iter(pairs)
+        while True:
+            chunk = list(itertools.islice(iterator, _BUILD_CHUNK))
+            if not chunk:
+                break
+            hash_map.put_many(chunk)
+
+        if hash_map._size < expected_size:
+            hash_map.shrink_to_fit()
+        return hash_map
+
+    def _move_chain(self, ll: LinkedList, buckets: DynamicArray,
+                    capacity: int) -> int:
+        """
+        Relinks every node of a chain into the buckets of another table,
+        keeping the nodes instead of copying them.
+
+        :param ll: The chain to empty.
+        :param buckets: The table to move the nodes into.
+        :param capacity: The capacity of that table.
+        :return: How many chains of that table were empty before.
+        """
+        filled = 0
+        node = ll.pop_front()
+        while node:
+            # generate hash index and link the node into its linked list
+            new_index = self._hash_function(node.key) % capacity
+            new_ll = buckets.get_at_index(new_index)
+            if new_ll.length() == 0:
+                filled += 1
+            new_ll.insert_node(node)
+            if self._treeify_threshold is not None and \
+                    new_ll.length() > self._treeify_threshold and \
+                    isinstance(new_ll, LinkedList):
+                self._treeify(buckets, new_index)
+            node = ll.pop_front()
+
+        return filled
+
+    def _new_node(self, key: str, value: object) -> SLNode:
+        """
+        Provides a node for a new key-value pair, taken from the free list
+        when it has one.
+
+        :param key: A string to serve as the key in the key-value pair.
+        :param value: The desired value to store in the hash map.
+        :return: A node holding the pair, not linked to any list.
+        """
+        node = self._free_nodes
+        if node is None:
+            return self._node_class(key, value)
+
+        self._free_nodes = node.next
+        self._free_count -= 1
+        node.key, node.value, node.next = key, value, None
+        return node
+
+    def _recycle_node(self, node: SLNode) -> None:
+        """
+        Keeps a removed node on the free list for later pairs, unless the
+        free list is full.
+
+        :param node: A node that was unlinked from its chain.
+        """
+        if self._free_count >= self._free_list_size:
+            return
+
+        # let go of the pair so it can be garbage collected
+        node.key = node.value = None
+        node.next = self._free_nodes
+        self._free_nodes = node
+        self._free_count += 1
+
+    def _grow(self) -> None:
+        """
+        Resizes the table by the growth factor so the load goes back under
+        the max load factor.
+        """
+        new_capacity = max(int(self._capacity * self._growth_factor),
+                           self._capacity + 1)
+        self._resize_for_policy(new_capacity)
+
+    def _shrink(self) -> None:
+        """
+        Resizes the table down by the growth factor without going under
+        the floor capacity.
+        """
+        new_capacity = max(int(self._capacity / self._growth_factor),
+                           self._min_capacity)
+        if new_capacity < self._capacity:
+            self._resize_for_policy(new_capacity)
+
+    def _resize_for_policy(self, new_capacity: int) -> None:
+        """
+        Resizes the table on behalf of the growth policy, incrementally
+        when a rehash step was configured.
+
+        :param new_capacity: The capacity to resize to.
+        """
+        if self._rehash_step is None:
+            self.resize_table(new_capacity)
+        else:
+            self._start_rehash(new_capacity)
+
+    def _start_rehash(self, new_capacity: int,
+                      buckets: DynamicArray = None) -> None:
+        """
+        Begins an incremental resize. The current table becomes the old
+        table and an empty table of the new capacity takes its place.
+
+        :param new_capacity: The capacity of the table being moved into.
+        :param buckets: That empty table when it was built beforehand.
+        """
+        # only one resize can be in progress at a time
+        self._finish_rehash()
+        self._modifications += 1
+
+        self._old_buckets = self._buckets
+        self._old_capacity = self._capacity
+        self._rehash_index = 0
+
+        if buckets is None:
+            buckets = DynamicArray()
+            for _ in range(new_capacity):
+                buckets.append(LinkedList())
+        self._buckets = buckets
+        self._capacity = new_capacity
+        self._occupied = 0
+
+        # the moves add their time as they happen
+        if self._stats is not None:
+            self._stats.resized(0.0)
+
+    def _rehash_some(self, amount: int = None) -> None:
+        """
+        Moves the chains of the next old buckets of an incremental resize
+        into the new table, and drops the old table once everything has
+        been moved.
+
+        :param amount: How many old buckets to move, rehash_step if None,
+        or 1 when the resize was started without a rehash_step.
+        """
+        if amount is None:
+            amount = self._rehash_step or 1
+        if self._stats is not None:
+            started = time.perf_counter()
+
+        stop = min(self._rehash_index + amount, self._old_capacity)
+        for index in range(self._rehash_index, stop):
+            current_bucket = self._old_buckets.get_at_index(index)
+            self._occupied += self._move_chain(current_bucket, self._buckets,
+                                               self._capacity)
+
+            # moved buckets are never looked at again
+            self._old_buckets.set_at_index(index, None)
+        self._rehash_index = stop
+
+        if self._stats is not None:
+            self._stats.resize_seconds += time.perf_counter() - started
+
+        # every old bucket was moved, the old table isn't needed anymore
+        if self._rehash_index == self._old_capacity:
+            self._old_buckets = None
+            self._old_capacity = 0
+            self._rehash_index = 0
+
+    def _finish_rehash(self) -> None:
+        """
+        Moves every remaining old bucket of an incremental resize.
+        """
+        if self._old_buckets is not None:
+            self._rehash_some(self._old_capacity)
+
+    def pending_rehash(self) -> int:
+        """
+        Return how many old buckets an incremental resize still has to
+        move, 0 when no resize is in progress.
+        """
+        if self._old_buckets is None:
+            return 0
+        return self._old_capacity - self._rehash_index
+
+    def rehash_step(self, amount: int = None) -> int:
+        """
+        Moves the next old buckets of an incremental resize in progress,
+        for a caller that wants to do the work at its own pace.
+
+        :param amount: How many old buckets to move, rehash_step of the
+        map if None.
+        :return: How many old buckets are left to move.
+        """
+        if self._old_buckets is not None:
+            self._rehash_some(amount)
+        return self.pending_rehash()
+
+    def _rehash_steps(self, step: int):
+        """Finishes a resize in progress, yielding after every step buckets."""
+        while self.rehash_step(step):
+            yield
+
+    def resize_table_steps(self, new_capacity: int, step: int):
+        """
+        Resizes the map like resize_table(), in steps: a generator that
+        yields after every step buckets built or moved, so that a caller
+        can do other work, and use the map, in between. The pairs move as
+        an incremental resize.
+
+        :param new_capacity: A positive integer that must be at least 1.
+        :param step: Buckets handled between two yields.
+        """
+        yield from self._rehash_steps(step)
+        new_capacity = self._resize_capacity(new_capacity)
+        if new_capacity is None:
+            return
+        buckets = yield from self._build_table(new_capacity, step)
+
+        # a resize may have started meanwhile, the new table is only
+        # swapped in once the map uses a single table
+        yield from self._rehash_steps(step)
+        self._start_rehash(new_capacity, buckets)
+        yield from self._rehash_steps(step)
+
+    def clear_steps(self, step: int):
+        """
+        Clears the map like clear(), in steps: a generator that yields
+        after every step buckets of the empty table built, which is then
+        swapped in at once.
+
+        :param step: Buckets built between two yields.
+        """
+        capacity = self._capacity
+        buckets = yield from self._build_table(capacity, step)
+
+        # a resize meanwhile changed the capacity, build for the new one
+        while capacity != self._capacity:
+            capacity = self._capacity
+            buckets = yield from self._build_table(capacity, step)
+
+        self._reset(buckets)
+
+    def get_keys_steps(self, step: int):
+        """
+        Provides the keys like get_keys(), in steps: a generator that
+        yields after every step buckets read.
+
+        :param step: Buckets read between two yields.
+        :return: A dynamic array with all the keys in the hash map, as the
+        value of the finished generator.
+        :raise RuntimeError: The map was changed before all keys were read.
+        """
+        yield from self._rehash_steps(step)
+        modifications = self._modifications
+        capacity = self._capacity
+        da_of_keys = DynamicArray()
+
+        for start in range(0, capacity, step):
+            if self._modifications != modifications:
+                raise RuntimeError("hash map changed during get_keys")
+            self._keys_between(da_of_keys, start,
+                               min(start + step, capacity))
+            yield
+
+        return da_of_keys
+
+    def _resize_capacity(self, new_capacity: int) -> int:
+        """
+        Return the capacity resize_table() settles on for a requested one,
+        or None when it would ignore the request.
+        """
+        if new_capacity < 1:
+            return None
+        return new_capacity
+
+    def _build_table(self, capacity: int, step: int):
+        """
+        Builds an empty table, yielding after every step buckets so that a
+        caller can do other work in between.
+
+        :param capacity: The amount of buckets.
+        :param step: Buckets built between two yields.
+        :return: The table, as the value of the finished generator.
+        """
+        buckets = DynamicArray()
+        for start in range(0, capacity, step):
+            for _ in range(start, min(start + step, capacity)):
+                buckets.append(LinkedList())
+            yield
+        return buckets
+
+    def _keys_between(self, da: DynamicArray, start: int, stop: int) -> None:
+        """
+        Appends the keys found between two indices of the current table.
+
+        :param da: The dynamic array to append to.
+        :param start: The first index to look at.
+        :param stop: The index to stop before.
+        """
+        for bucket_index in range(start, stop):
+            for node in self._buckets.get_at_index(bucket_index):
+                da.append(node.key)
+
+    def _locate(self, key: str, key_hash: int) -> (LinkedList, SLNode):
+        """
+        Finds the node of the provided key. While a resize is in progress
+        a key whose old bucket wasn't moved yet is looked up in the old
+        table.
+
+        :param key: A string as the key in a key-value pair.
+        :param key_hash: The hash of the key.
+        :return: LinkedList: The chain holding the key, or the chain of
+        the current table it belongs in when it wasn't found.
+        :return: SLNode: The node of the key, or None when not found.
+        """
+        # get the linked list at the intended hash index
+        ll = self._buckets.get_at_index(key_hash % self._capacity)
+        node = ll.contains(key)
+        if self._stats is not None:
+            self._stats.length(ll.length())
+
+        # a key that wasn't moved yet is still in the old table
+        if node is None and self._old_buckets is not None:
+            old_index = key_hash % self._old_capacity
+            if old_index >= self._rehash_index:
+                old_ll = self._old_buckets.get_at_index(old_index)
+                old_node = old_ll.contains(key)
+                if self._stats is not None:
+                    self._stats.length(old_ll.length())
+                if old_node is not None:
+                    return old_ll, old_node
+
+        return ll, node
 
     def get(self, key: str) -> object:
         """
@@ -162,17 +815,40 @@ class HashMap:
         # initialize value to return
         value = None
 
-        # get the linked list at the intended hash index
-        hash_index = self._hash_function(key) % self._capacity
-        ll = self._buckets.get_at_index(hash_index)
+        # move some buckets along when a resize is in progress
+        if self._old_buckets is not None:
+            self._rehash_some()
 
-        # find case where linked list contains the key
-        node = ll.contains(key)
+        # find case where the map contains the key
+        _, node = self._locate(key, self._hash_function(key))
         if node:
             value = node.value
 
+        if self._stats is not None:
+            self._stats.lookup("get", node is not None)
+
         return value
 
+    def get_node(self, key: str) -> SLNode:
+        """
+        Provides the node holding the pair of a key, so a caller can read
+        and update its value later without looking the key up again. The
+        node stays the same through resizes, until its key is removed;
+        after that the map may reuse it for another pair.
+
+        :param key: A string as the key in the desired key-value pair.
+        :return: SLNode: The node of the key.
+        :return: None: The key was not found in the hash map.
+        """
+        # move some buckets along when a resize is in progress
+        if self._old_buckets is not None:
+            self._rehash_some()
+
+        _, node = self._locate(key, self._hash_function(key))
+        if self._stats is not None:
+            self._stats.lookup("get", node is not None)
+        return node
+
     def contains_key(self, key: str) -> bool:
         """
         Verifies if the provided key is in the hash map as a key-value
@@ -184,14 +860,18 @@ class HashMap:
         """
         # case where empty hash map doesn't contain any key-value pairs
         if self._size == 0:
+            if self._stats is not None:
+                self._stats.lookup("contains_key", False)
             return False
 
-        # get the linked list at the intended hash index
-        hash_index = self._hash_function(key) % self._capacity
-        ll = self._buckets.get_at_index(hash_index)
+        # move some buckets along when a resize is in progress
+        if self._old_buckets is not None:
+            self._rehash_some()
 
-        # find the key-value pair in the linked list
-        node = ll.contains(key)
+        # find the key-value pair in the map
+        _, node = self._locate(key, self._hash_function(key))
+        if self._stats is not None:
+            self._stats.lookup("contains_key", node is not None)
         if node:
             return True
 
@@ -207,17 +887,48 @@ class HashMap:
         """
         # case where empty hash map doesn't contain any key-value pairs
         if self._size == 0:
+            if self._stats is not None:
+                self._stats.lookup("remove", False)
             return
 
-        # get the linked list at the intended hash index
-        hash_index = self._hash_function(key) % self._capacity
-        ll = self._buckets.get_at_index(hash_index)
+        # move some buckets along when a resize is in progress
+        if self._old_buckets is not None:
+            self._rehash_some()
 
-        # find the key-value pair in the linked list
-        node = ll.contains(key)
+        size = self._size
+        self._remove_hashed(key, self._hash_function(key))
+        if self._stats is not None:
+            self._stats.lookup("remove", self._size < size)
+
+        # shrink the table when the load dropped too low
+        if self._min_load_factor is not None and \
+                self._size < self._min_load_factor * self._capacity:
+            self._shrink()
+
+    def _remove_hashed(self, key: str, key_hash: int) -> None:
+        """
+        Removes the key-value pair of a key that was already hashed,
+        without checking the load afterwards.
+
+        :param key: A string as the key in the key-value pair.
+        :param key_hash: The hash of the key.
+        """
+        # find the key-value pair and the linked list holding it
+        ll, node = self._locate(key, key_hash)
         if node:
-            ll.remove(key)
+            self._recycle_node(ll.remove_node(key))
             self._size -= 1
+            self._modifications += 1
+
+            # only chains of the current table are counted, and turned
+            # back into linked lists once they are short again
+            index = key_hash % self._capacity
+            if ll is self._buckets.get_at_index(index):
+                if ll.length() == 0:
+                    self._occupied -= 1
+                elif isinstance(ll, TreeChain) and \
+                        ll.length() <= self._treeify_threshold // 2:
+                    self._untreeify(index)
 
     def get_keys(self) -> DynamicArray:
         """
@@ -225,6 +936,9 @@ class HashMap:
 
         :return: A dynamic array with all the keys in the hash map.
         """
+        # every key should be in a single table first
+        self._finish_rehash()
+
         # initialize da to return
         da_of_keys = DynamicArray()
 
@@ -239,59 +953,357 @@ class HashMap:
 
         return da_of_keys
 
+    def _nodes(self):
+        """
+        Streams the node of every key-value pair, bucket by bucket,
+        without copying them.
 
-def find_mode(da: DynamicArray) -> (DynamicArray, int):
-    """
-    Provides the mode of the elements in the provided da. The mode is returned
-    as a collection in a different da and a positive integer to represent its
-    freq.
+        :raise RuntimeError: The map was changed during the iteration.
+        """
+        # every pair should be in a single table first
+        self._finish_rehash()
+        modifications = self._modifications
 
-    :param da: The collection of elements to evaluate and find its mode.
-    :return: da: A new collection of the mode(s) found.
-    :return: int: A positive integer to represent the freq of the mode.
+        for bucket_index in range(self._capacity):
+            for node in self._buckets.get_at_index(bucket_index):
+                yield node
+                if self._modifications != modifications:
+                    raise RuntimeError("hash map changed during iteration")
+
+    def keys(self):
+        """
+        Streams all the keys in the hash map. Unlike get_keys() nothing is
+        copied, and changing the map while iterating raises RuntimeError.
+
+        :return: A generator of the keys.
+        """
+        return (node.key for node in self._nodes())
+
+    def values(self):
+        """
+        Streams all the values in the hash map.
+
+        :return: A generator of the values.
+        """
+        return (node.value for node in self._nodes())
+
+    def items(self):
+        """
+        Streams all the key-value pairs in the hash map.
+
+        :return: A generator of (key, value) tuples.
+        """
+        return ((node.key, node.value) for node in self._nodes())
+
+    def __iter__(self):
+        """Iterate over the keys of the hash map."""
+        return self.keys()
+
+    def __len__(self) -> int:
+        """Return the amount of key-value pairs in the hash map."""
+        return self._size
+
+    def __contains__(self, key: str) -> bool:
+        """Support 'key in map' through contains_key()."""
+        return self.contains_key(key)
+
+    def put_many(self, pairs) -> None:
+        """
+        Places or updates many key/value pairs at once. With a growth
+        policy the table is sized a single time for the whole batch, and
+        every key is hashed before any bucket is touched.
+
+        :param pairs: An iterable of (key, value) tuples.
+        """
+        pairs = list(pairs)
+        if not pairs:
+            return
+
+        key_hashes = hash_keys(self._hash_function,
+                               [pair[0] for pair in pairs])
+
+        # move buckets along as if each pair had been put on its own
+        if self._old_buckets is not None:
+            self._rehash_some((self._rehash_step or 1) * len(pairs))
+
+        # size the table once, assuming every key in the batch is new
+        if self._max_load_factor is not None:
+            expected = self._size + len(pairs)
+            new_capacity = self._capacity
+            while expected > self._max_load_factor * new_capacity:
+                new_capacity = max(int(new_capacity * self._growth_factor),
+                                   new_capacity + 1)
+            if new_capacity != self._capacity:
+                self.resize_table(new_capacity)
+
+        if self._stats is not None:
+            self._stats.count("put", len(pairs))
+
+        for index in range(len(pairs)):
+            key, value = pairs[index]
+            self._put_hashed(key, value, key_hashes[index])
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Provides the values of many keys at once, with None for every key
+        that isn't in the hash map.
+
+        :param keys: An iterable of keys.
+        :return: A dynamic array with the value of each key, in order.
+        """
+        keys = list(keys)
+        key_hashes = hash_keys(self._hash_function, keys)
+
+        # move buckets along as if each key had been looked up on its own
+        if self._old_buckets is not None and keys:
+            self._rehash_some((self._rehash_step or 1) * len(keys))
+
+        values = DynamicArray()
+        for index in range(len(keys)):
+            _, node = self._locate(keys[index], key_hashes[index])
+            values.append(None if node is None else node.value)
+            if self._stats is not None:
+                self._stats.lookup("get", node is not None)
+
+        return values
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Verifies many keys at once.
+
+        :param keys: An iterable of keys.
+        :return: A dynamic array with True or False for each key, in order.
+        """
+        keys = list(keys)
+        key_hashes = hash_keys(self._hash_function, keys)
+
+        # move buckets along as if each key had been looked up on its own
+        if self._old_buckets is not None and keys:
+            self._rehash_some((self._rehash_step or 1) * len(keys))
+
+        found = DynamicArray()
+        for index in range(len(keys)):
+            _, node = self._locate(keys[index], key_hashes[index])
+            found.append(node is not None)
+            if self._stats is not None:
+                self._stats.lookup("contains_key", node is not None)
+
+        return found
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes the key-value pairs of many keys at once. Keys that aren't
+        in the hash map are skipped. With a growth policy the table is
+        shrunk a single time after the whole batch.
+
+        :param keys: An iterable of keys.
+        """
+        keys = list(keys)
+        if self._size == 0 or not keys:
+            return
+
+        key_hashes = hash_keys(self._hash_function, keys)
+
+        # move buckets along as if each key had been removed on its own
+        if self._old_buckets is not None:
+            self._rehash_some((self._rehash_step or 1) * len(keys))
+
+        size = self._size
+        for index in range(len(keys)):
+            self._remove_hashed(keys[index], key_hashes[index])
+        if self._stats is not None:
+            self._stats.batch("remove", len(keys), size - self._size)
+
+        # shrink the table once for the whole batch
+        if self._min_load_factor is not None:
+            new_capacity = self._capacity
+            while self._size < self._min_load_factor * new_capacity:
+                smaller = max(int(new_capacity / self._growth_factor),
+                              self._min_capacity)
+                if smaller >= new_capacity:
+                    break
+                new_capacity = smaller
+            if new_capacity != self._capacity:
+                self.resize_table(new_capacity)
+
+    def dump(self, path: str) -> None:
+        """
+        Writes the hash map to a snapshot file that load() reads back.
+        The file holds the capacity, hash function name and size, then
+        every pair as a length-prefixed record, and a checksum.
+
+        :param path: The file to write.
+        """
+        write_snapshot(path, self._capacity, self._hash_function,
+                       self._size, self.items())
+
+    @classmethod
+    def load(cls, path: str, function=None, **options) -> "HashMap":
+        """
+        Builds a hash map from a snapshot file written by dump(). The table
+        is sized for every pair before the first one goes in, and the
+        pairs are linked straight into their chains, a chunk at a time,
+        without looking for duplicates, so nothing is resized or searched.
+
+        :param path: The file to read.
+        :param function: The hash function, by default the one named in
+        the file, which has to be in HASH_FUNCTIONS.
+        :param options: Further options for the constructor.
+        :return: A new HashMap holding the pairs of the file.
+        :raise ValueError: The file is not a snapshot, is corrupt, or
+        names an unknown hash function.
+        """
+        capacity, function, size, chunks = read_snapshot(path, function)
+        hash_map = cls(max(capacity, 1), function, **options)
+
+        # grow the empty table once when the load would go too high
+        if hash_map._max_load_factor is not None:
+            new_capacity = hash_map._capacity
+            while size > hash_map._max_load_factor * new_capacity:
+                new_capacity = max(int(new_capacity *
+                                       hash_map._growth_factor),
+                                   new_capacity + 1)
+            if new_capacity != hash_map._capacity:
+                hash_map.resize_table(new_capacity)
+
+        for pairs in chunks:
+            key_hashes = hash_keys(hash_map._hash_function,
+                                   [pair[0] for pair in pairs])
+            for index in range(len(pairs)):
+                key, value = pairs[index]
+                hash_map._insert_pair(hash_map._buckets.get_at_index(
+                    key_hashes[index] % hash_map._capacity), key, value)
+
+        return hash_map
+
+
+class FrequencyCounter:
     """
-    # if you'd like to use a hash map,
-    # use this instance of your Separate Chaining HashMap
-    map = HashMap(da.length() // 3, hash_function_1)
+    Counts how often each element of a stream shows up, keeping the
+    highest frequency and the elements that have it current as elements
+    come in, so the mode is known at any point without another pass.
+    """
+
+    def __init__(self, elements=None, capacity: int = 11,
+                 function=hash_function_1) -> None:
+        """
+        Initialize a counter backed by a Separate Chaining HashMap that
+        grows with the amount of distinct elements.
+
+        :param elements: An optional iterable of elements to count.
+        :param capacity: The initial amount of buckets, at least 1.
+        :param function: The hash function used for the elements.
+        """
+        self._map = HashMap(max(capacity, 1), function, max_load_factor=1.0)
+        self._modes = DynamicArray()
+        self._highest = 0
+        self._total = 0
+
+        if elements is not None:
+            self.update(elements)
+
+    def __len__(self) -> int:
+        """Return the amount of distinct elements counted."""
+        return len(self._map)
+
+    def add(self, element: str, amount: int = 1) -> int:
+        """
+        Counts an element.
+
+        :param element: The element to count.
+        :param amount: How many times to count it, at least 1.
+        :return: The frequency of the element afterwards.
+        """
+        # the modes are only kept right while frequencies go up
+        if amount < 1:
+            raise ValueError("amount must be at least 1")
+
+        freq = self._map.increment(element, amount)
+        self._total += amount
+
+        # when higher frequency is found, reset the modes w/ only this element
+        if freq > self._highest:
+            self._modes = DynamicArray()
+            self._modes.append(element)
+            self._highest = freq
+
+        # when it reaches the same frequency, append this element
+        elif freq == self._highest:
+            self._modes.append(element)
 
-    # go through each bucket, O(n)
-    for index in range(da.length()):
-        current_element = da.get_at_index(index)
+        return freq
 
-        # increase frequency when it's a repeat value
-        if map.contains_key(current_element):
-            freq = map.get(current_element)
-            freq += 1
-            map.put(current_element, freq)
+    def update(self, elements) -> None:
+        """
+        Counts every element of an iterable, which can be a generator. A
+        DynamicArray is read by index since it can't be iterated.
+
+        :param elements: The elements to count.
+        """
+        if isinstance(elements, DynamicArray):
+            for index in range(elements.length()):
+                self.add(elements.get_at_index(index))
         else:
-            # start tracking a new value
-            map.put(current_element, 1)
+            for element in elements:
+                self.add(element)
 
-    # initiate da to return
-    da_of_mode = DynamicArray()
-    highest_frequency = 0
+    def count(self, element: str) -> int:
+        """Return the frequency of an element, 0 if it was never counted."""
+        freq = self._map.get(element)
+        return 0 if freq is None else freq
 
-    # identify the element(s) with the highest frequency, O(n)
-    unique_elements = map.get_keys()
-    for unique_index in range(unique_elements.length()):
+    def total(self) -> int:
+        """Return the amount of elements counted, repeats included."""
+        return self._total
 
-        # access key and frequency
-        current_key = unique_elements.get_at_index(unique_index)
-        current_freq = map.get(current_key)
+    def mode(self) -> (DynamicArray, int):
+        """
+        Provides the mode(s) counted so far, in the order they reached the
+        highest frequency.
 
-        # when higher frequency is found, reset da_of_mode w/ only this element
-        if current_freq > highest_frequency:
-            da_of_mode = DynamicArray()
-            da_of_mode.append(current_key)
-            highest_frequency = current_freq
+        :return: da: A new collection of the mode(s).
+        :return: int: The frequency of the mode, 0 when nothing was counted.
+        """
+        da_of_mode = DynamicArray()
+        for index in range(self._modes.length()):
+            da_of_mode.append(self._modes.get_at_index(index))
+        return da_of_mode, self._highest
 
-        # when its the same frequency, append this element
-        elif current_freq == highest_frequency:
-            da_of_mode.append(current_key)
+    def top_k(self, k: int) -> DynamicArray:
+        """
+        Provides the k most frequent elements. Elements with the same
+        frequency keep the order the map holds them in.
 
-        # disregard element with less frequency and move onto next one!
+        :param k: How many elements to provide.
+        :return: A dynamic array of (element, frequency) tuples, most
+        frequent first.
+        """
+        da_of_top = DynamicArray()
+        if k < 1:
+            return da_of_top
 
-    return da_of_mode, highest_frequency
+        for pair in heapq.nlargest(k, self._map.items(),
+                                   key=lambda pair: pair[1]):
+            da_of_top.append(pair)
+        return da_of_top
+
+
+def find_mode(da) -> (DynamicArray, int):
+    """
+    Provides the mode of the elements in the provided da. The mode is returned
+    as a collection in a different da and a positive integer to represent its
+    freq. Each element is hashed once, and any iterable works in place of a
+    da, including a generator.
+
+    :param da: The collection of elements to evaluate and find its mode.
+    :return: da: A new collection of the mode(s) found, in the order they
+    reached the highest frequency.
+    :return: int: A positive integer to represent the freq of the mode, 0
+    for an empty collection.
+    """
+    # size the map like before, but never at 0 buckets
+    capacity = da.length() // 3 if isinstance(da, DynamicArray) else 11
+    return FrequencyCounter(da, capacity).mode()
 
 
 # ------------------- BASIC TESTING ---------------------------------------- #
@@ -499,3 +1511,14 @@ if __name__ == "__main__":
         map = HashMap(da.length() // 3, hash_function_2)
         mode, frequency = find_mode(da)
         print(f"Input: {da}\nMode: {mode}, Frequency: {frequency}\n")
+
+    print("\ngrowth policy example 1")
+    print("------------------------")
+    m = HashMap(4, hash_function_2, max_load_factor=1.0,
+                min_load_factor=0.25, min_capacity=4)
+    for i in range(100):
+        m.put(str(i), i)
+    print(m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+    for i in range(100):
+        m.remove(str(i))
+    print(m.get_size(), m.get_capacity(), round(m.table_load(), 2))
@@ -0,0 +1,412 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: A HashMap split into shards that each live in their own
+#              worker process, so bulk builds and find_mode runs use more
+#              than one core. Keys are routed to shards by the map's hash
+#              function, and every batch is sent to all of its shards
+#              before any answer is read, so the shards work on it side by
+#              side.
+
+
+import multiprocessing
+import os
+from multiprocessing.reduction import ForkingPickler
+
+import hash_map_oa
+import hash_map_sc
+from a6_include import DynamicArray
+
+
+# spreads hashes over the shards independently of the buckets inside them
+_GOLDEN_64 = 0x9E3779B97F4A7C15
+_MASK_64 = (1 << 64) - 1
+
+# map methods the parent may call on a shard
+_SHARD_METHODS = ("put", "get", "contains_key", "remove", "clear",
+                  "get_size", "get_capacity", "empty_buckets",
+                  "resize_table", "get_keys", "put_many", "get_many",
+                  "contains_many", "remove_many")
+
+
+def _serve(conn, implementation: str, capacity: int, function,
+           options: dict) -> None:
+    """
+    Runs in a worker process: owns one shard and answers the requests
+    of the parent until it is told to stop.
+
+    :param conn: The worker's end of the pipe to the parent.
+    :param implementation: "oa" or "sc".
+    :param capacity: The initial capacity of the shard.
+    :param function: The hash function of the shard.
+    :param options: Further options for the shard's constructor.
+    """
+    module = hash_map_oa if implementation == "oa" else hash_map_sc
+    shard = module.HashMap(capacity, function, **options)
+
+    while True:
+        method, args = conn.recv()
+        if method == "close":
+            break
+
+        try:
+            if method == "find_mode":
+                result = hash_map_sc.FrequencyCounter(
+                    args[0], max(1, len(args[0]) // 3), function).mode()
+            elif method in _SHARD_METHODS:
+                result = getattr(shard, method)(*args)
+            else:
+                raise AttributeError("shards have no method " + method)
+        except Exception as error:
+            conn.send((False, error))
+        else:
+            conn.send((True, result))
+
+    conn.close()
+
+
+class ShardedHashMap:
+    """
+    HashMap whose keys are spread over several worker processes. Every
+    call is a request to the shards it concerns; the bulk methods send
+    one request per shard for a whole batch, which is where the
+    speedup comes from. Close the map (or use it in a with block) to stop
+    the workers.
+    """
+
+    def __init__(self, capacity: int, function, shards: int = None,
+                 implementation: str = "oa", **options) -> None:
+        """
+        Initialize new ShardedHashMap and start its workers.
+
+        :param capacity: The initial amount of buckets, over all shards.
+        :param function: The hash function, which has to be importable
+        by the workers (a module level function).
+        :param shards: The amount of worker processes, one per core by
+        default.
+        :param implementation: "oa" or "sc", the HashMap of each shard.
+        :param options: Further options for each shard's constructor.
+        """
+        if shards is None:
+            shards = os.cpu_count() or 1
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        if implementation not in ("oa", "sc"):
+            raise ValueError("implementation must be 'oa' or 'sc'")
+
+        shard_capacity = max(1, -(-capacity // shards))
+
+        self._hash_function = function
+        self._connections = []
+        self._workers = []
+        for _ in range(shards):
+            parent_end, worker_end = multiprocessing.Pipe()
+            worker = multiprocessing.Process(
+                target=_serve, daemon=True,
+                args=(worker_end, implementation, shard_capacity, function,
+                      options))
+            worker.start()
+            worker_end.close()
+            self._connections.append(parent_end)
+            self._workers.append(worker)
+
+    def __enter__(self) -> "ShardedHashMap":
+        """Return the map for use in a with block."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Stop the workers at the end of a with block."""
+        self.close()
+
+    def close(self) -> None:
+        """Stop every worker. The map can't be used afterwards."""
+        for conn in self._connections:
+            try:
+                conn.send(("close", ()))
+                conn.close()
+            except OSError:
+                pass
+        for worker in self._workers:
+            worker.join()
+        self._connections = []
+        self._workers = []
+
+    def _shard_of(self, key: str) -> int:
+        """
+        Return the index of the shard the key belongs to. Routing uses the
+        map's hash function, so a key goes to the same shard in every run
+        and process. The hash is mixed and its high bits picked, since the
+        shards place their keys with its low bits.
+        """
+        mixed = (self._hash_function(key) * _GOLDEN_64) & _MASK_64
+        return (mixed >> 32) % len(self._connections)
+
+    def _worker_died(self, index: int, error: Exception) -> RuntimeError:
+        """Return the error to raise for a shard whose worker is gone."""
+        dead = RuntimeError("shard " + str(index) + " stopped answering, "
+                            "its worker process " +
+                            str(self._workers[index].pid) + " died")
+        dead.__cause__ = error
+        return dead
+
+    def _call(self, requests: dict) -> dict:
+        """
+        Sends one request to each shard it names, then collects the
+        answers, so the shards handle their requests at the same time.
+
+        :param requests: Shard index -> (method, args) tuple.
+        :return: Shard index -> what the method returned.
+        :raise RuntimeError: The worker of a shard died.
+        """
+        if not self._connections:
+            raise RuntimeError("the sharded hash map was closed")
+
+        # pickle every request before sending any, so a request that
+        # can't be pickled fails while no shard owes an answer yet
+        payloads = {index: ForkingPickler.dumps(request)
+                    for index, request in requests.items()}
+
+        sent, error = [], None
+        for index, payload in payloads.items():
+            try:
+                self._connections[index].send_bytes(payload)
+            except OSError as send_error:
+                error = self._worker_died(index, send_error)
+                break
+            sent.append(index)
+
+        results = {}
+        for index in sent:
+            try:
+                is_ok, result = self._connections[index].recv()
+            except (EOFError, OSError) as recv_error:
+                if error is None:
+                    error = self._worker_died(index, recv_error)
+                continue
+            if is_ok:
+                results[index] = result
+            elif error is None:
+                error = result
+
+        # every shard that was sent a request had its answer read, so
+        # the pipes stay in step even when raising
+        if error is not None:
+            raise error
+        return results
+
+    def _call_one(self, key: str, method: str, *args) -> object:
+        """Call a method on the shard of a key and return its result."""
+        index = self._shard_of(key)
+        return self._call({index: (method, args)})[index]
+
+    def _call_every(self, method: str, *args) -> list:
+        """Call a method on every shard and return the results in order."""
+        results = self._call({index: (method, args)
+                              for index in range(len(self._connections))})
+        return [results[index] for index in range(len(results))]
+
+    def _group(self, keys: list) -> list:
+        """Return the positions of the keys, grouped by shard."""
+        groups = [[] for _ in self._connections]
+        for position in range(len(keys)):
+            groups[self._shard_of(keys[position])].append(position)
+        return groups
+
+    # ------------------------------------------------------------------ #
+
+    def get_size(self) -> int:
+        """Return size of map, over all shards."""
+        return sum(self._call_every("get_size"))
+
+    def get_capacity(self) -> int:
+        """Return capacity of map, over all shards."""
+        return sum(self._call_every("get_capacity"))
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Places or updates an existing key/value pair in the hash map.
+
+        :param key: A string to serve as the key in the key-value pair.
+        :param value: The desired value to store in the hash map.
+        """
+        self._call_one(key, "put", key, value)
+
+    def get(self, key: str) -> object:
+        """
+        Provides the associated value of the provided key. If key doesn't
+        exist in the hash map, then it returns None.
+
+        :param key: A string as the key in the desired key-value pair.
+        :return: value: An object of the key-value pair.
+        :return: None: The key was not found in the hash map.
+        """
+        return self._call_one(key, "get", key)
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Verifies if the provided key is in the hash map as a key-value
+        pair.
+
+        :param key: A string as the key in a key-value pair.
+        :return: True: The provided key matched a key-value pair.
+        :return: False: The provided key was not found.
+        """
+        return self._call_one(key, "contains_key", key)
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the associated key-value pair of the provided key. If key
+        is not in the hash map, then there are no changes to the hash map.
+
+        :param key: A string as the key in the key-value pair.
+        """
+        self._call_one(key, "remove", key)
+
+    def table_load(self) -> float:
+        """
+        Provides the average amount of objects stored in each bucket of
+        the hash map, over all shards.
+
+        :return: A float to represent the average amount of objects per
+        bucket.
+        """
+        return self.get_size() / self.get_capacity()
+
+    def empty_buckets(self) -> int:
+        """
+        Provides the amount of empty buckets over all shards.
+
+        :return: A positive integer that represents empty buckets.
+        """
+        return sum(self._call_every("empty_buckets"))
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the hash map so its shards share the provided capacity.
+
+        :param new_capacity: A positive integer that must be at least 1.
+        """
+        if new_capacity < 1:
+            return
+
+        shard_capacity = max(1, -(-new_capacity // len(self._connections)))
+        self._call_every("resize_table", shard_capacity)
+
+    def clear(self) -> None:
+        """Clears all stored data in every shard."""
+        self._call_every("clear")
+
+    def get_keys(self) -> DynamicArray:
+        """
+        Provides all the keys in the hash map, shard after shard.
+
+        :return: A dynamic array with all the keys in the hash map.
+        """
+        da_of_keys = DynamicArray()
+        for keys in self._call_every("get_keys"):
+            for index in range(keys.length()):
+                da_of_keys.append(keys.get_at_index(index))
+        return da_of_keys
+
+    def put_many(self, pairs) -> None:
+        """
+        Places or updates many key/value pairs, with a single request to
+        each shard.
+
+        :param pairs: An iterable of (key, value) tuples.
+        """
+        pairs = list(pairs)
+        groups = self._group([pair[0] for pair in pairs])
+        self._call({index: ("put_many",
+                            ([pairs[position] for position in group],))
+                    for index, group in enumerate(groups) if group})
+
+    def _lookup_many(self, method: str, keys) -> DynamicArray:
+        """
+        Runs a bulk lookup with a single request to each shard and puts
+        the answers back in the order of the keys.
+        """
+        keys = list(keys)
+        groups = self._group(keys)
+        results = self._call({index: (method,
+                                      ([keys[position]
+                                        for position in group],))
+                              for index, group in enumerate(groups)
+                              if group})
+
+        answers = [None] * len(keys)
+        for index, found in results.items():
+            for offset in range(found.length()):
+                answers[groups[index][offset]] = found.get_at_index(offset)
+        return DynamicArray(answers)
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Provides the values of many keys at once, with None for every key
+        that isn't in the hash map.
+
+        :param keys: An iterable of keys.
+        :return: A dynamic array with the value of each key, in order.
+        """
+        return self._lookup_many("get_many", keys)
+
+    def contains_many(self, keys) -> DynamicArray:
+        """
+        Verifies many keys at once.
+
+        :param keys: An iterable of keys.
+        :return: A dynamic array with True or False for each key, in order.
+        """
+        return self._lookup_many("contains_many", keys)
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes the key-value pairs of many keys, with a single request to
+        each shard.
+
+        :param keys: An iterable of keys.
+        """
+        keys = list(keys)
+        groups = self._group(keys)
+        self._call({index: ("remove_many",
+                            ([keys[position] for position in group],))
+                    for index, group in enumerate(groups) if group})
+
+    def find_mode(self, da) -> (DynamicArray, int):
+        """
+        Provides the mode of a collection, counted by all the shards at
+        once. Every element is routed to a single shard, so each shard
+        holds the full count of its elements and the overall mode is the
+        best of the shard modes.
+
+        :param da: A DynamicArray or any iterable of elements.
+        :return: da: A new collection of the mode(s) found.
+        :return: int: A positive integer to represent the freq of the
+        mode, 0 for an empty collection.
+        """
+        if isinstance(da, DynamicArray):
+            elements = [da.get_at_index(index)
+                        for index in range(da.length())]
+        else:
+            elements = list(da)
+
+        groups = [[] for _ in self._connections]
+        for element in elements:
+            groups[self._shard_of(element)].append(element)
+
+        results = self._call({index: ("find_mode", (group,))
+                              for index, group in enumerate(groups)
+                              if group})
+
+        # merge the shard modes, keeping those with the highest frequency
+        da_of_mode = DynamicArray()
+        highest_frequency = 0
+        for index in sorted(results):
+            modes, frequency = results[index]
+            if frequency > highest_frequency:
+                da_of_mode = DynamicArray()
+                highest_frequency = frequency
+            if frequency == highest_frequency:
+                for mode_index in range(modes.length()):
+                    da_of_mode.append(modes.get_at_index(mode_index))
+
+        return da_of_mode, highest_frequency
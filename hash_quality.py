@@ -0,0 +1,177 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Reports how evenly a hash function spreads a set of keys
+#              over a table: the chi-square statistic of the bucket counts,
+#              the longest chain a chaining map would build, and the
+#              longest probe sequence the quadratic open addressing map
+#              would need.
+#
+#              python hash_quality.py --keys sequential --count 150
+#              python hash_quality.py --file keys.txt --capacity 1024
+
+
+import argparse
+import random
+import string
+import sys
+
+from a6_include import HASH_FUNCTIONS
+
+
+def bucket_distribution(function, keys: list, capacity: int) -> dict:
+    """
+    Measures how the keys spread over a table of the given capacity.
+
+    :param function: The hash function, taking a key and returning an int.
+    :param keys: The keys to place, duplicates are counted once.
+    :param capacity: The amount of buckets.
+    :return: A dict with the chi-square statistic of the bucket counts and
+    its ratio to the degrees of freedom (near 1 for a uniform hash, much
+    larger for a skewed one), the longest and mean chain of a chaining map,
+    and the longest and mean probe sequence of a quadratic probing map.
+    The probe figures are None when the keys don't fit in the table.
+    """
+    if capacity < 1:
+        raise ValueError("capacity must be at least 1")
+
+    keys = list(dict.fromkeys(keys))
+    key_hashes = [function(key) for key in keys]
+
+    # chaining: every key lands in its home bucket
+    counts = [0] * capacity
+    for key_hash in key_hashes:
+        counts[key_hash % capacity] += 1
+
+    expected = len(keys) / capacity
+    chi_square = 0.0
+    if expected > 0:
+        chi_square = sum((count - expected) ** 2 for count in counts) \
+            / expected
+    freedom = capacity - 1
+    used = capacity - counts.count(0)
+
+    result = {
+        "keys": len(keys),
+        "capacity": capacity,
+        "load": expected,
+        "chi_square": chi_square,
+        "degrees_of_freedom": freedom,
+        "chi_square_ratio": chi_square / freedom if freedom else None,
+        "used_buckets": used,
+        "max_chain": max(counts),
+        "mean_chain": len(keys) / used if used else 0.0,
+        "max_probe": None,
+        "mean_probe": None,
+        "unplaced": None,
+    }
+
+    if len(keys) <= capacity:
+        result.update(_quadratic_probes(key_hashes, capacity))
+    return result
+
+
+def _quadratic_probes(key_hashes: list, capacity: int) -> dict:
+    """
+    Places the hashes the way the open addressing map does and counts the
+    buckets each one looks at. A hash that finds no open bucket within
+    capacity probes is counted as unplaced.
+    """
+    taken = bytearray(capacity)
+    longest, total, placed, unplaced = 0, 0, 0, 0
+
+    for key_hash in key_hashes:
+        initial = key_hash % capacity
+        for probe in range(capacity):
+            index = (initial + probe * probe) % capacity
+            if not taken[index]:
+                taken[index] = 1
+                longest = max(longest, probe + 1)
+                total += probe + 1
+                placed += 1
+                break
+        else:
+            unplaced += 1
+
+    return {
+        "max_probe": longest,
+        "mean_probe": total / placed if placed else 0.0,
+        "unplaced": unplaced,
+    }
+
+
+def make_key_set(kind: str, count: int, length: int = 8,
+                 seed: int = 0) -> list:
+    """
+    Builds one of the sample key sets.
+
+    :param kind: "sequential" for 'str1', 'str2', ..., "anagrams" for
+    shuffles of one string or "random" for random lowercase keys.
+    :param count: The amount of keys.
+    :param length: The length of anagram and random keys.
+    :param seed: Seed of the shuffles and random keys.
+    :return: A list of distinct keys.
+    """
+    if kind == "sequential":
+        return ['str' + str(i) for i in range(1, count + 1)]
+
+    rng = random.Random(seed)
+    keys = set()
+    if kind == "anagrams":
+        letters = [string.ascii_lowercase[i % 26] for i in range(length)]
+        for _ in range(count * 50):
+            rng.shuffle(letters)
+            keys.add(''.join(letters))
+            if len(keys) == count:
+                break
+    elif kind == "random":
+        while len(keys) < count:
+            keys.add(''.join(rng.choice(string.ascii_lowercase)
+                             for _ in range(length)))
+    else:
+        raise ValueError("unknown key set: " + kind)
+
+    return sorted(keys)
+
+
+def main(argv: list = None) -> int:
+    """Report the quality of every hash function for one key set."""
+    parser = argparse.ArgumentParser(
+        description="Report how evenly hash functions spread a key set.")
+    parser.add_argument("--keys", default="sequential",
+                        choices=("sequential", "anagrams", "random"))
+    parser.add_argument("--file", help="read one key per line instead")
+    parser.add_argument("--count", type=int, default=150)
+    parser.add_argument("--length", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--capacity", type=int,
+                        help="buckets, twice the amount of keys by default")
+    parser.add_argument("--functions", nargs="+",
+                        choices=sorted(HASH_FUNCTIONS),
+                        default=list(HASH_FUNCTIONS))
+    args = parser.parse_args(argv)
+
+    if args.file:
+        with open(args.file) as file:
+            keys = [line.rstrip('\n') for line in file]
+    else:
+        keys = make_key_set(args.keys, args.count, args.length, args.seed)
+    capacity = args.capacity or max(1, 2 * len(keys))
+
+    columns = ("chi_square_ratio", "used_buckets", "max_chain", "max_probe",
+               "mean_probe", "unplaced")
+    print("{:<16}".format("function")
+          + "".join("{:>18}".format(column) for column in columns))
+    for name in args.functions:
+        result = bucket_distribution(HASH_FUNCTIONS[name], keys, capacity)
+        cells = []
+        for column in columns:
+            value = result[column]
+            cells.append("{:>18.3f}".format(value)
+                         if isinstance(value, float) else
+                         "{:>18}".format(str(value)))
+        print("{:<16}".format(name) + "".join(cells))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
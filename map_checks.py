@@ -0,0 +1,163 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Checks shared by the tests of both HashMaps.
+
+
+import os
+import random
+import tempfile
+import threading
+import unittest
+
+from a6_include import hash_function_1, hash_function_2
+
+
+def finishes(work, seconds: float = 5) -> bool:
+    """Run work in a daemon thread and tell whether it returned in time."""
+    worker = threading.Thread(target=work, daemon=True)
+    worker.start()
+    worker.join(seconds)
+    return not worker.is_alive()
+
+
+def number_hash(key: str) -> int:
+    """Hash a key like "k12" to its number, so every bucket is known."""
+    return int(key[1:])
+
+
+def run_against_dict(test: unittest.TestCase, hash_map,
+                     operations: int = 3000, seed: int = 0) -> None:
+    """
+    Runs random operations on a map and on a dict side by side, checking
+    that the map always answers like the dict. Maps with an increment()
+    get it mixed in too.
+    """
+    rng = random.Random(seed)
+    expected = {}
+    increments = hasattr(hash_map, "increment")
+
+    for step in range(operations):
+        key = "k" + str(rng.randrange(400))
+        choice = rng.random()
+
+        if choice < 0.4:
+            hash_map.put(key, step)
+            expected[key] = step
+        elif choice < 0.45:
+            if increments:
+                test.assertEqual(hash_map.increment(key, 2),
+                                 expected.get(key, 0) + 2)
+                expected[key] = expected.get(key, 0) + 2
+        elif choice < 0.65:
+            hash_map.remove(key)
+            expected.pop(key, None)
+        elif choice < 0.8:
+            test.assertEqual(hash_map.get(key), expected.get(key))
+        elif choice < 0.9:
+            test.assertEqual(hash_map.contains_key(key), key in expected)
+        elif choice < 0.95:
+            pairs = [("b" + str(rng.randrange(100)), step)
+                     for _ in range(10)]
+            hash_map.put_many(pairs)
+            expected.update(pairs)
+            keys = [pair[0] for pair in pairs] + [key]
+            found = hash_map.get_many(keys)
+            test.assertEqual([found[i] for i in range(found.length())],
+                             [expected.get(k) for k in keys])
+        elif choice < 0.995:
+            hash_map.resize_table(rng.randrange(1, 2 * len(expected) + 8))
+        else:
+            hash_map.clear()
+            expected.clear()
+
+        test.assertEqual(hash_map.get_size(), len(expected))
+
+    keys = hash_map.get_keys()
+    test.assertEqual(sorted(keys[i] for i in range(keys.length())),
+                     sorted(expected))
+    test.assertEqual(dict(hash_map.items()), expected)
+
+
+def check_variants(test: unittest.TestCase, map_class, capacity: int,
+                   variants: list,
+                   functions=(hash_function_1, hash_function_2)) -> None:
+    """
+    Runs run_against_dict() on a map built with each of the options in
+    variants, under each of the hash functions, both sample ones unless
+    others are given.
+    """
+    for options in variants:
+        for function in functions:
+            with test.subTest(options=options, function=function.__name__):
+                run_against_dict(test, map_class(capacity, function,
+                                                 **options))
+
+
+def check_snapshots(test: unittest.TestCase, map_class,
+                    variants: list) -> None:
+    """
+    Dumps a map built with each of the options in variants and checks
+    that load() gives back the same pairs, under the same options.
+    """
+    pairs = [("k" + str(i), i) for i in range(300)]
+    pairs += [("\u00e9\U0001f600", None), ("", [1, "two"])]
+
+    for options in variants:
+        with test.subTest(options=options):
+            hash_map = map_class.from_items(pairs, hash_function_2,
+                                            **options)
+            hash_map.remove("k7")
+            expected = dict(hash_map.items())
+
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "map.snap")
+                hash_map.dump(path)
+                loaded = map_class.load(path, **options)
+
+            test.assertEqual(dict(loaded.items()), expected)
+            test.assertEqual(loaded.get_size(), len(expected))
+            test.assertIsNone(loaded.get("k7"))
+            loaded.put("k7", 7)
+            test.assertEqual(loaded.get("k7"), 7)
+
+
+# changes made in the middle of an iteration, and whether they stop it
+_CHANGES = [
+    ("put", lambda hash_map: hash_map.put("new", 1), True),
+    ("remove", lambda hash_map: hash_map.remove("k3"), True),
+    ("put_many", lambda hash_map: hash_map.put_many([("new", 1)]), True),
+    ("remove_many", lambda hash_map: hash_map.remove_many(["k3"]), True),
+    ("resize_table", lambda hash_map: hash_map.resize_table(100), True),
+    ("clear", lambda hash_map: hash_map.clear(), True),
+    ("update", lambda hash_map: hash_map.put("k1", "updated"), False),
+    ("remove missing", lambda hash_map: hash_map.remove("missing"), False),
+    ("get", lambda hash_map: hash_map.get("k2"), False),
+]
+
+
+def check_iteration_guard(test: unittest.TestCase, build) -> None:
+    """
+    Changes a map in the middle of each of its iterations and checks that
+    the next step raises RuntimeError, while updating a value, or a call
+    that changes nothing, lets the iteration finish.
+
+    :param build: Returns a new map holding the pairs k0..k19.
+    """
+    iterations = [("keys", lambda hash_map: hash_map.keys()),
+                  ("values", lambda hash_map: hash_map.values()),
+                  ("items", lambda hash_map: hash_map.items()),
+                  ("iter", iter)]
+
+    for iteration, start in iterations:
+        for change, apply, stops in _CHANGES:
+            with test.subTest(iteration=iteration, change=change):
+                hash_map = build()
+                iterator = start(hash_map)
+                next(iterator)
+                apply(hash_map)
+
+                if stops:
+                    with test.assertRaises(RuntimeError):
+                        list(iterator)
+                else:
+                    test.assertEqual(len(list(iterator)), 19)
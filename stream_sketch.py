@@ -0,0 +1,405 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Approximate frequencies and modes of streams too big to count
+#              exactly. A Count-Min Sketch estimates the frequency of any
+#              element in fixed memory, and a Space-Saving tracker keeps
+#              the candidates for the most frequent ones. StreamSketch puts
+#              the two together behind the mode/top-k API of find_mode.
+
+
+import math
+
+from a6_include import DynamicArray, fnv1a_hash, xxh64_hash
+from hash_map_sc import HashMap
+
+
+class CountMinSketch:
+    """
+    Count-Min Sketch: depth rows of width counters. Every element adds to
+    one counter per row, and its estimate is the smallest of those
+    counters. Estimates never fall under the true frequency, and with
+    probability 1 - delta they exceed it by at most epsilon * total.
+    """
+
+    def __init__(self, width: int, depth: int,
+                 functions: tuple = (fnv1a_hash, xxh64_hash)) -> None:
+        """
+        Initialize a sketch of zeroed counters.
+
+        :param width: Counters per row, epsilon is e / width.
+        :param depth: Amount of rows, delta is exp(-depth).
+        :param functions: Two hash functions; the rows use their
+        combinations h1 + row * h2, so depth needs no extra functions.
+        """
+        if width < 1 or depth < 1:
+            raise ValueError("width and depth must be at least 1")
+        if len(functions) != 2:
+            raise ValueError("functions must hold two hash functions")
+
+        self._width = width
+        self._depth = depth
+        self._functions = functions
+        self._rows = [[0] * width for _ in range(depth)]
+        self._total = 0
+
+    @classmethod
+    def from_error(cls, epsilon: float, delta: float,
+                   functions: tuple = (fnv1a_hash, xxh64_hash)) \
+            -> "CountMinSketch":
+        """
+        Builds the smallest sketch with the provided guarantees.
+
+        :param epsilon: Largest overestimate, as a share of the total.
+        :param delta: Chance that an estimate goes over that bound.
+        :param functions: Two hash functions.
+        :return: A new CountMinSketch.
+        """
+        if not 0 < epsilon < 1 or not 0 < delta < 1:
+            raise ValueError("epsilon and delta must be between 0 and 1")
+
+        return cls(math.ceil(math.e / epsilon),
+                   math.ceil(math.log(1 / delta)), functions)
+
+    def _indexes(self, element: str) -> list:
+        """Return the counter of the element in every row."""
+        first = self._functions[0](element)
+        # an odd step never cycles back early when width is a power of 2
+        second = self._functions[1](element) | 1
+        return [(first + row * second) % self._width
+                for row in range(self._depth)]
+
+    def add(self, element: str, amount: int = 1) -> None:
+        """
+        Counts an element.
+
+        :param element: The element to count.
+        :param amount: How many times to count it.
+        """
+        indexes = self._indexes(element)
+        for row in range(self._depth):
+            self._rows[row][indexes[row]] += amount
+        self._total += amount
+
+    def estimate(self, element: str) -> int:
+        """
+        Provides the estimated frequency of an element.
+
+        :param element: The element to look up.
+        :return: At least the true frequency of the element.
+        """
+        indexes = self._indexes(element)
+        return min(self._rows[row][indexes[row]]
+                   for row in range(self._depth))
+
+    def total(self) -> int:
+        """Return the amount of elements counted, repeats included."""
+        return self._total
+
+    def error_bounds(self) -> dict:
+        """
+        Provides the guarantees of the estimates.
+
+        :return: A dict with epsilon, delta and max_overestimate: with
+        probability 1 - delta no estimate is more than max_overestimate
+        above the true frequency.
+        """
+        epsilon = math.e / self._width
+        return {
+            "epsilon": epsilon,
+            "delta": math.exp(-self._depth),
+            "max_overestimate": math.ceil(epsilon * self._total),
+        }
+
+
+class _Counter:
+    """
+    Counter of an element monitored by SpaceSaving. It knows its own
+    slot in the heap, so moving it around the heap never touches the map
+    that finds it.
+    """
+
+    __slots__ = ("element", "count", "error", "position")
+
+    def __init__(self, element: str, count: int, position: int) -> None:
+        """Initialize a counter with no error at a slot of the heap."""
+        self.element = element
+        self.count = count
+        self.error = 0
+        self.position = position
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy hitters: monitors at most capacity elements. A new
+    element takes over the counter of the least frequent monitored one
+    and inherits its count as error, so every element with a frequency
+    above total / capacity is always monitored, and a count overestimates
+    the frequency by at most its error.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """
+        Initialize an empty tracker.
+
+        :param capacity: The most elements monitored at a time.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        self._capacity = capacity
+        self._total = 0
+
+        # min-heap of counters on their counts, and the map finding the
+        # counter of an element, written only when an element comes or
+        # goes
+        self._heap = []
+        self._counters = HashMap(capacity, fnv1a_hash)
+
+    def add(self, element: str, amount: int = 1) -> None:
+        """
+        Counts an element.
+
+        :param element: The element to count.
+        :param amount: How many times to count it.
+        """
+        self._total += amount
+        counter = self._counters.get(element)
+
+        if counter is not None:
+            counter.count += amount
+            self._sift_down(counter.position)
+
+        # a free counter is left, monitor the element from zero
+        elif len(self._heap) < self._capacity:
+            counter = _Counter(element, amount, len(self._heap))
+            self._heap.append(counter)
+            self._counters.put(element, counter)
+            self._sift_up(counter.position)
+
+        # take over the counter of the least frequent element
+        else:
+            counter = self._heap[0]
+            self._counters.remove(counter.element)
+            counter.element = element
+            counter.error = counter.count
+            counter.count += amount
+            self._counters.put(element, counter)
+            self._sift_down(0)
+
+    def _swap(self, i: int, j: int) -> None:
+        """Swap two heap slots and tell their counters where they went."""
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        heap[i].position = i
+        heap[j].position = j
+
+    def _sift_up(self, position: int) -> None:
+        """Move a slot up until its parent has no higher count."""
+        heap = self._heap
+        while position > 0:
+            parent = (position - 1) // 2
+            if heap[parent].count <= heap[position].count:
+                return
+            self._swap(parent, position)
+            position = parent
+
+    def _sift_down(self, position: int) -> None:
+        """Move a slot down until no child has a lower count."""
+        heap = self._heap
+        size = len(heap)
+        while True:
+            smallest = position
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < size and \
+                        heap[child].count < heap[smallest].count:
+                    smallest = child
+            if smallest == position:
+                return
+            self._swap(position, smallest)
+            position = smallest
+
+    def count(self, element: str) -> (int, int):
+        """
+        Provides the monitored count of an element.
+
+        :param element: The element to look up.
+        :return: int: Its count, 0 when it isn't monitored.
+        :return: int: How much of that count may be overestimated.
+        """
+        counter = self._counters.get(element)
+        if counter is None:
+            return 0, 0
+        return counter.count, counter.error
+
+    def total(self) -> int:
+        """Return the amount of elements counted, repeats included."""
+        return self._total
+
+    def capacity(self) -> int:
+        """Return the most elements monitored at a time."""
+        return self._capacity
+
+    def candidates(self) -> list:
+        """
+        Return the monitored elements as (element, count, error) tuples,
+        highest count first.
+        """
+        return sorted(((counter.element, counter.count, counter.error)
+                       for counter in self._heap),
+                      key=lambda candidate: -candidate[1])
+
+    def max_error(self) -> int:
+        """Return the largest overestimate any monitored count can have."""
+        if len(self._heap) < self._capacity:
+            return 0
+        return self._heap[0].count
+
+
+class StreamSketch:
+    """
+    Fixed-memory frequency counter for unbounded streams. Space-Saving
+    picks the candidates for the most frequent elements, and each
+    candidate's frequency is estimated by the lower of its Space-Saving
+    count and its Count-Min estimate. Both overestimate, so the lower one
+    is the tighter.
+    """
+
+    def __init__(self, elements=None, capacity: int = 100,
+                 width: int = 2048, depth: int = 5,
+                 functions: tuple = (fnv1a_hash, xxh64_hash)) -> None:
+        """
+        Initialize an empty sketch.
+
+        :param elements: An optional iterable of elements to count.
+        :param capacity: Elements Space-Saving monitors.
+        :param width: Counters per Count-Min row.
+        :param depth: Amount of Count-Min rows.
+        :param functions: Two hash functions for the Count-Min rows.
+        """
+        self._sketch = CountMinSketch(width, depth, functions)
+        self._heavy_hitters = SpaceSaving(capacity)
+
+        if elements is not None:
+            self.update(elements)
+
+    def add(self, element: str, amount: int = 1) -> None:
+        """
+        Counts an element.
+
+        :param element: The element to count.
+        :param amount: How many times to count it.
+        """
+        self._sketch.add(element, amount)
+        self._heavy_hitters.add(element, amount)
+
+    def update(self, elements) -> None:
+        """
+        Counts every element of an iterable, which can be a generator. A
+        DynamicArray is read by index since it can't be iterated.
+
+        :param elements: The elements to count.
+        """
+        if isinstance(elements, DynamicArray):
+            for index in range(elements.length()):
+                self.add(elements.get_at_index(index))
+        else:
+            for element in elements:
+                self.add(element)
+
+    def total(self) -> int:
+        """Return the amount of elements counted, repeats included."""
+        return self._sketch.total()
+
+    def estimate(self, element: str) -> int:
+        """
+        Provides the estimated frequency of any element.
+
+        :param element: The element to look up.
+        :return: At least the true frequency of the element.
+        """
+        estimate = self._sketch.estimate(element)
+        count, _ = self._heavy_hitters.count(element)
+        if count:
+            estimate = min(estimate, count)
+        return estimate
+
+    def bounds(self, element: str) -> (int, int):
+        """
+        Provides the range the true frequency of an element lies in.
+
+        :param element: The element to look up.
+        :return: int: The lowest it can be, from its Space-Saving count.
+        :return: int: The highest it can be, its estimate.
+        """
+        count, error = self._heavy_hitters.count(element)
+        return count - error, self.estimate(element)
+
+    def top_k(self, k: int) -> DynamicArray:
+        """
+        Provides the k elements with the highest estimated frequency.
+
+        :param k: How many elements to provide.
+        :return: A dynamic array of (element, estimate) tuples, highest
+        estimate first.
+        """
+        ranked = sorted(((element, min(count, self._sketch.estimate(element)))
+                         for element, count, _
+                         in self._heavy_hitters.candidates()),
+                        key=lambda pair: -pair[1])
+
+        da_of_top = DynamicArray()
+        for pair in ranked[:max(k, 0)]:
+            da_of_top.append(pair)
+        return da_of_top
+
+    def mode(self) -> (DynamicArray, int):
+        """
+        Provides the element(s) with the highest estimated frequency.
+
+        :return: da: A new collection of the estimated mode(s).
+        :return: int: Their estimated frequency, 0 when nothing was counted.
+        """
+        da_of_mode = DynamicArray()
+        highest = 0
+
+        top = self.top_k(self._heavy_hitters.capacity())
+        for index in range(top.length()):
+            element, estimate = top.get_at_index(index)
+            if estimate < highest:
+                break
+            da_of_mode.append(element)
+            highest = estimate
+
+        return da_of_mode, highest
+
+    def error_bounds(self) -> dict:
+        """
+        Provides the guarantees of the estimates.
+
+        :return: A dict with the Count-Min epsilon, delta and
+        max_overestimate, the largest Space-Saving overestimate
+        (max_count_error), and the frequency above which an element is
+        sure to be among the candidates (guaranteed_frequency).
+        """
+        bounds = self._sketch.error_bounds()
+        bounds["max_count_error"] = self._heavy_hitters.max_error()
+        bounds["guaranteed_frequency"] = \
+            self.total() // self._heavy_hitters.capacity()
+        return bounds
+
+
+def find_mode_approx(da, capacity: int = 100, width: int = 2048,
+                     depth: int = 5) -> (DynamicArray, int):
+    """
+    Provides the estimated mode of a collection in fixed memory, like
+    find_mode does exactly. Any element more frequent than
+    len / capacity is sure to be considered.
+
+    :param da: A DynamicArray or any iterable of elements.
+    :param capacity: Elements Space-Saving monitors.
+    :param width: Counters per Count-Min row.
+    :param depth: Amount of Count-Min rows.
+    :return: da: A new collection of the estimated mode(s).
+    :return: int: Their estimated frequency.
+    """
+    return StreamSketch(da, capacity, width, depth).mode()
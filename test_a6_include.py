@@ -0,0 +1,179 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Tests for the hash functions of a6_include.
+
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import a6_include
+from a6_include import (fnv1a_hash, hash_function_1, hash_function_1_batch,
+                        hash_function_2, hash_function_2_batch, hash_keys,
+                        read_snapshot, seeded_hash, write_snapshot,
+                        xxh64_hash)
+
+
+# empty, ASCII, non-ASCII, astral and lone surrogate keys
+BATCH_KEYS = ["", "a", "key1", "", "\u00e9t\u00e9", "\u6f22\u5b57",
+              "\U0001f600x", "\ud800", "z" * 1000]
+
+
+class TestBatchHashes(unittest.TestCase):
+
+    def check_batches(self, keys: list) -> None:
+        for function, batch_function in (
+                (hash_function_1, hash_function_1_batch),
+                (hash_function_2, hash_function_2_batch)):
+            expected = [function(key) for key in keys]
+            with self.subTest(function=function.__name__):
+                self.assertEqual(list(batch_function(keys)), expected)
+                self.assertEqual(list(batch_function([])), [])
+                self.assertEqual(hash_keys(function, keys), expected)
+
+    def test_batches_match_scalar_functions(self):
+        self.check_batches(BATCH_KEYS)
+
+    def test_batches_without_numpy(self):
+        with mock.patch.object(a6_include, "np", None):
+            self.check_batches(BATCH_KEYS)
+
+    def test_key_too_long_for_int64(self):
+        # hash_function_2_batch hashes these keys with the scalar function
+        keys = ["ab", "long" * (a6_include._MAX_BATCH_KEY_LENGTH // 4 + 1)]
+        self.assertEqual(list(hash_function_2_batch(keys)),
+                         [hash_function_2(key) for key in keys])
+
+
+class TestSnapshotFormat(unittest.TestCase):
+
+    PAIRS = [("k" + str(i), i) for i in range(5000)]
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "map.snap")
+        write_snapshot(self.path, 11, hash_function_2, len(self.PAIRS),
+                       self.PAIRS)
+        with open(self.path, "rb") as file:
+            self.data = file.read()
+
+    def read_all(self, data: bytes, function=None) -> list:
+        """Write data over the snapshot and read every pair back."""
+        with open(self.path, "wb") as file:
+            file.write(data)
+        capacity, function, size, chunks = read_snapshot(self.path,
+                                                         function)
+        return [pair for pairs in chunks for pair in pairs]
+
+    def test_round_trip(self):
+        capacity, function, size, chunks = read_snapshot(self.path)
+        self.assertEqual((capacity, function, size), (11, hash_function_2,
+                                                      len(self.PAIRS)))
+        self.assertEqual([pair for pairs in chunks for pair in pairs],
+                         self.PAIRS)
+
+    def test_rejects_damaged_files(self):
+        middle = len(self.data) // 2
+        damaged = {
+            "empty": b"",
+            "not a snapshot": b"PK" + self.data[2:],
+            "corrupt header": self.data[:10] + b"\xff" + self.data[11:],
+            "flipped record byte": self.data[:middle] +
+            bytes([self.data[middle] ^ 1]) + self.data[middle + 1:],
+            "truncated": self.data[:middle],
+            "no checksum": self.data[:-4],
+            "trailing bytes": self.data + b"\0",
+        }
+        for name, data in damaged.items():
+            with self.subTest(name):
+                with self.assertRaises(ValueError):
+                    self.read_all(data)
+
+    def test_unknown_function_must_be_passed(self):
+        def custom(key: str) -> int:
+            return len(key)
+
+        write_snapshot(self.path, 3, custom, 1, [("a", 1)])
+        with open(self.path, "rb") as file:
+            data = file.read()
+        with self.assertRaises(ValueError):
+            self.read_all(data)
+        self.assertEqual(self.read_all(data, custom), [("a", 1)])
+
+    def test_size_must_match_the_pairs(self):
+        with self.assertRaises(ValueError):
+            write_snapshot(self.path, 3, hash_function_1, 2, [("a", 1)])
+
+
+class TestXXH64(unittest.TestCase):
+
+    def test_reference_vectors(self):
+        # digests published for the reference xxHash64 implementation
+        vectors = [
+            ("", 0, 0xEF46DB3751D8E999),
+            ("a", 0, 0xD24EC4F1A98C6E5B),
+            ("abc", 0, 0x44BC2CF5AD770999),
+            ("xxhash", 0, 0x32DD38952C4BC720),
+            ("xxhash", 20141025, 0xB559B98D844E0635),
+            ("Nobody inspects the spammish repetition", 0,
+             0xFBCEA83C8A378BF1),
+        ]
+        for key, seed, digest in vectors:
+            self.assertEqual(xxh64_hash(key, seed), digest, (key, seed))
+
+
+
+class TestFNV1a(unittest.TestCase):
+
+    def test_reference_vectors(self):
+        # digests published with the FNV-1a specification
+        self.assertEqual(fnv1a_hash(""), 0xCBF29CE484222325)
+        self.assertEqual(fnv1a_hash("a"), 0xAF63DC4C8601EC8C)
+        self.assertEqual(fnv1a_hash("foobar"), 0x85944171F73967E8)
+
+    def test_seed_changes_the_hash(self):
+        self.assertEqual(fnv1a_hash("foobar", 0), fnv1a_hash("foobar"))
+        self.assertNotEqual(fnv1a_hash("foobar", 1), fnv1a_hash("foobar"))
+
+
+class TestSeededHash(unittest.TestCase):
+
+    def test_seed_goes_to_the_function(self):
+        for function in (fnv1a_hash, xxh64_hash):
+            seeded = seeded_hash(function, 20141025)
+            self.assertEqual(seeded("xxhash"), function("xxhash", 20141025))
+            self.assertIs(seeded.__wrapped__, function)
+
+    def test_same_placement_in_every_process(self):
+        # string hashes differ between these processes, the seeded ones
+        # must not
+        script = ("from a6_include import seeded_hash, fnv1a_hash;"
+                  "print(seeded_hash(fnv1a_hash, 7)('key'))")
+        outputs = set()
+        for hash_seed in ("1", "2"):
+            outputs.add(subprocess.check_output(
+                [sys.executable, "-c", script],
+                cwd=os.path.dirname(os.path.abspath(a6_include.__file__)),
+                env=dict(os.environ, PYTHONHASHSEED=hash_seed)))
+        self.assertEqual(outputs, {str(fnv1a_hash("key", 7)).encode() +
+                                   os.linesep.encode()})
+
+    def test_rejects_functions_without_a_seed(self):
+        for function in (hash_function_1, hash_function_2, len):
+            with self.assertRaises(ValueError):
+                seeded_hash(function, 1)
+
+    def test_rejects_bad_seeds(self):
+        for seed in ("7", 1.5, True, None):
+            with self.assertRaises(ValueError):
+                seeded_hash(xxh64_hash, seed)
+        self.assertNotEqual(seeded_hash(xxh64_hash, "random")("k"),
+                            seeded_hash(xxh64_hash, "random")("k"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,191 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Tests for the asyncio facade, driving its coroutines with
+#              asyncio.run().
+
+
+import asyncio
+import unittest
+
+from a6_include import DynamicArray, hash_function_2
+import hash_map_oa
+import hash_map_sc
+from hash_map_async import AsyncHashMap
+
+
+# a map of each kind, built by (module, options)
+MAPS = [
+    (hash_map_sc, {}),
+    (hash_map_sc, {"rehash_step": 4}),
+    (hash_map_oa, {}),
+    (hash_map_oa, {"storage": "compact", "rehash_step": 4}),
+    (hash_map_oa, {"probing": "robin_hood"}),
+]
+
+
+def build(module, options: dict, size: int = 300):
+    """
+    Return a map of the module holding the pairs k0..k(size - 1), with no
+    resize left in progress.
+    """
+    hash_map = module.HashMap(17, hash_function_2, **options)
+    for i in range(size):
+        hash_map.put("k" + str(i), i)
+    while hash_map.rehash_step():
+        pass
+    return hash_map
+
+
+def listed(da: DynamicArray) -> list:
+    """Return the elements of a dynamic array as a list."""
+    return [da[i] for i in range(da.length())]
+
+
+class TestRehashSteps(unittest.TestCase):
+
+    def test_steps_move_a_resize_at_the_callers_pace(self):
+        for module, options in MAPS:
+            with self.subTest(map=module.__name__, options=options):
+                hash_map = build(module, options)
+                self.assertEqual(hash_map.pending_rehash(), 0)
+                self.assertEqual(hash_map.rehash_step(), 0)
+
+                steps = hash_map.resize_table_steps(1200, 4)
+                while hash_map.pending_rehash() == 0:
+                    next(steps)
+                pending = hash_map.pending_rehash()
+                self.assertGreater(pending, 1)
+                self.assertEqual(hash_map.rehash_step(1), pending - 1)
+
+                for _ in steps:
+                    self.assertEqual(hash_map.get("k42"), 42)
+                self.assertEqual(hash_map.pending_rehash(), 0)
+                self.assertGreaterEqual(hash_map.get_capacity(), 1200)
+                self.assertEqual(dict(hash_map.items()),
+                                 {"k" + str(i): i for i in range(300)})
+
+
+class TestAsyncHashMap(unittest.TestCase):
+
+    def test_resize_lets_other_coroutines_use_the_map(self):
+        for module, options in MAPS:
+            with self.subTest(map=module.__name__, options=options):
+                facade = AsyncHashMap(build(module, options), chunk=8)
+                seen = []
+
+                async def resize():
+                    await facade.resize_table(1000)
+
+                async def meanwhile():
+                    for i in range(20):
+                        facade.put("new" + str(i), i)
+                        seen.append(facade.get("k" + str(i)))
+                        await asyncio.sleep(0)
+
+                async def main():
+                    await asyncio.gather(resize(), meanwhile())
+
+                asyncio.run(main())
+                self.assertEqual(seen, list(range(20)))
+                self.assertGreaterEqual(facade.get_capacity(), 1000)
+                self.assertEqual(facade.get_size(), 320)
+                self.assertEqual(facade.get_map().pending_rehash(), 0)
+
+    def test_get_keys_and_clear(self):
+        for module, options in MAPS:
+            with self.subTest(map=module.__name__, options=options):
+                facade = AsyncHashMap(build(module, options), chunk=8)
+
+                keys = asyncio.run(facade.get_keys())
+                self.assertEqual(sorted(listed(keys)),
+                                 sorted("k" + str(i) for i in range(300)))
+
+                capacity = facade.get_capacity()
+                asyncio.run(facade.clear())
+                self.assertEqual(facade.get_size(), 0)
+                self.assertEqual(facade.get_capacity(), capacity)
+                self.assertIsNone(facade.get("k1"))
+
+    def test_get_keys_raises_when_the_map_changes(self):
+        for module, options in MAPS:
+            with self.subTest(map=module.__name__, options=options):
+                facade = AsyncHashMap(build(module, options), chunk=8)
+
+                async def writer():
+                    await asyncio.sleep(0)
+                    facade.put("late", 1)
+
+                async def main():
+                    await asyncio.gather(facade.get_keys(), writer())
+
+                with self.assertRaises(RuntimeError):
+                    asyncio.run(main())
+
+    def test_find_mode_matches_find_mode(self):
+        elements = ["a", "b", "b", "c", "c", "d"] * 50
+        expected = hash_map_sc.find_mode(DynamicArray(elements))
+        facade = AsyncHashMap(build(hash_map_oa, {}, 0), chunk=7)
+
+        for source in (DynamicArray(elements), iter(elements)):
+            mode, frequency = asyncio.run(facade.find_mode(source))
+            self.assertEqual(sorted(listed(mode)),
+                             sorted(listed(expected[0])))
+            self.assertEqual(frequency, expected[1])
+
+    def test_rejects_bad_chunk(self):
+        with self.assertRaises(ValueError):
+            AsyncHashMap(build(hash_map_sc, {}, 0), chunk=0)
+
+
+class TestBatchedLookups(unittest.TestCase):
+
+    def test_concurrent_lookups_share_one_get_many(self):
+        for module, options in MAPS:
+            with self.subTest(map=module.__name__, options=options):
+                hash_map = build(module, options, 10)
+                batches = []
+                get_many = hash_map.get_many
+
+                def counting_get_many(keys):
+                    batches.append(list(keys))
+                    return get_many(keys)
+
+                hash_map.get_many = counting_get_many
+                facade = AsyncHashMap(hash_map)
+
+                async def main():
+                    return await asyncio.gather(
+                        facade.aget_many(["k1", "k2", "missing"]),
+                        facade.aget_many(["k2", "k3"]),
+                        facade.aget("k1"))
+
+                first, second, third = asyncio.run(main())
+                self.assertEqual(listed(first), [1, 2, None])
+                self.assertEqual(listed(second), [2, 3])
+                self.assertEqual(third, 1)
+                self.assertEqual(batches, [["k1", "k2", "missing", "k3"]])
+
+                # a lookup after the batch was answered starts a new one
+                self.assertEqual(asyncio.run(facade.aget("k4")), 4)
+                self.assertEqual(len(batches), 2)
+
+    def test_a_failed_batch_fails_every_lookup(self):
+        hash_map = build(hash_map_sc, {}, 10)
+
+        def broken_get_many(keys):
+            raise KeyError("broken")
+
+        hash_map.get_many = broken_get_many
+        facade = AsyncHashMap(hash_map)
+
+        async def main():
+            return await asyncio.gather(facade.aget("k1"),
+                                        facade.aget_many(["k2"]),
+                                        return_exceptions=True)
+
+        for result in asyncio.run(main()):
+            self.assertIsInstance(result, KeyError)
+
+
+if __name__ == "__main__":
+    unittest.main()
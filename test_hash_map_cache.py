@@ -0,0 +1,185 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Tests for the bounded cache.
+
+
+import unittest
+
+from hash_map_cache import Cache, memoize
+
+
+class Clock:
+    """Clock for ttl tests that only moves when told to."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def cached_keys(cache: Cache) -> list:
+    """Return the keys of the live entries, in sorted order."""
+    return sorted(key for key in "abcdefgh" if key in cache)
+
+
+class TestLRU(unittest.TestCase):
+
+    def test_evicts_least_recently_used(self):
+        cache = Cache(3, "lru")
+        for key in "abc":
+            cache.put(key, key.upper())
+        self.assertEqual(cache.get("a"), "A")
+
+        cache.put("d", "D")
+        self.assertEqual(cached_keys(cache), ["a", "c", "d"])
+
+        # an update counts as a use too
+        cache.put("c", "C2")
+        cache.put("e", "E")
+        self.assertEqual(cached_keys(cache), ["c", "d", "e"])
+        self.assertEqual(cache.get("c"), "C2")
+
+    def test_contains_key_is_not_a_use(self):
+        cache = Cache(2, "lru")
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertTrue(cache.contains_key("a"))
+        cache.put("c", 3)
+        self.assertEqual(cached_keys(cache), ["b", "c"])
+
+    def test_never_holds_more_than_maxsize(self):
+        cache = Cache(5, "lru")
+        for i in range(100):
+            cache.put(str(i), i)
+            self.assertLessEqual(len(cache), 5)
+        self.assertEqual([cache.get(str(i)) for i in range(95, 100)],
+                         list(range(95, 100)))
+        self.assertEqual(cache.stats()["evictions"], 95)
+
+
+class TestLFU(unittest.TestCase):
+
+    def test_evicts_least_frequently_used(self):
+        cache = Cache(3, "lfu")
+        for key in "abc":
+            cache.put(key, key)
+        cache.get("a")
+        cache.get("a")
+        cache.get("b")
+
+        # c was used once, the fewest times
+        cache.put("d", "d")
+        self.assertEqual(cached_keys(cache), ["a", "b", "d"])
+
+        # b and d were both used twice after this, d longer ago
+        cache.get("d")
+        cache.get("b")
+        cache.put("e", "e")
+        self.assertEqual(cached_keys(cache), ["a", "b", "e"])
+
+    def test_ties_go_to_the_least_recent(self):
+        cache = Cache(3, "lfu")
+        for key in "abc":
+            cache.put(key, key)
+        for key in "cab":
+            cache.get(key)
+        cache.put("d", "d")
+        self.assertEqual(cached_keys(cache), ["a", "b", "d"])
+
+    def test_removed_entries_leave_the_order(self):
+        cache = Cache(3, "lfu")
+        for key in "abc":
+            cache.put(key, key)
+        cache.get("b")
+        cache.remove("b")
+        cache.remove("missing")
+        cache.put("d", "d")
+        cache.put("e", "e")
+        self.assertEqual(cached_keys(cache), ["c", "d", "e"])
+
+
+class TestExpiry(unittest.TestCase):
+
+    def test_entries_expire_after_their_ttl(self):
+        clock = Clock()
+        cache = Cache(4, ttl=10, clock=clock)
+        cache.put("a", 1)
+        cache.put("b", 2, ttl=30)
+
+        clock.now = 15
+        self.assertFalse(cache.contains_key("a"))
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), 2)
+
+        clock.now = 40
+        cache.put("c", 3)
+        self.assertEqual(cache.purge_expired(), 1)
+        self.assertEqual(cached_keys(cache), ["c"])
+        self.assertEqual(cache.stats()["expirations"], 2)
+
+
+class TestCache(unittest.TestCase):
+
+    def test_stats_and_clear(self):
+        cache = Cache(2)
+        cache.put("a", 1)
+        cache.get("a")
+        cache.get("b", "default")
+        self.assertEqual(cache.get("b", "default"), "default")
+
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["size"]),
+                         (1, 2, 1))
+        self.assertAlmostEqual(stats["hit_rate"], 1 / 3)
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        cache.put("c", 3)
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_rejects_bad_settings(self):
+        for options in ({"maxsize": 0}, {"policy": "fifo"}, {"ttl": 0},
+                        {"function": "no_such_hash"}):
+            with self.assertRaises(ValueError):
+                Cache(**options)
+
+
+class TestMemoize(unittest.TestCase):
+
+    def test_caches_results_by_arguments(self):
+        calls = []
+
+        @memoize(maxsize=2)
+        def add(a, b=0):
+            calls.append((a, b))
+            return a + b
+
+        self.assertEqual(add(1, b=2), 3)
+        self.assertEqual(add(1, b=2), 3)
+        self.assertEqual(add(1, 2), 3)
+        self.assertEqual(calls, [(1, 2), (1, 2)])
+        self.assertEqual(add.__name__, "add")
+
+        # a third result evicts the least recently used one, add(1, b=2)
+        add(5)
+        add(1, 2)
+        self.assertEqual(len(calls), 3)
+        add(1, b=2)
+        self.assertEqual(len(calls), 4)
+        self.assertEqual(add.cache.stats()["evictions"], 2)
+
+    def test_caches_none_results(self):
+        calls = []
+
+        @memoize(policy="lfu", function="xxh64_hash")
+        def nothing(value):
+            calls.append(value)
+
+        nothing("x")
+        nothing("x")
+        self.assertEqual(calls, ["x"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Tests for the thread-safe HashMap.
+
+
+import random
+import sys
+import threading
+import unittest
+
+from a6_include import hash_function_2
+from hash_map_concurrent import ConcurrentHashMap
+
+
+def writes(thread: int) -> list:
+    """Return the (key, value) writes of a thread, None to remove."""
+    rng = random.Random(thread)
+    operations = []
+    for value in range(2000):
+        key = "t" + str(thread) + "-" + str(rng.randrange(150))
+        operations.append((key, value if rng.random() < 0.7 else None))
+    return operations
+
+
+class TestConcurrentHashMap(unittest.TestCase):
+
+    def setUp(self):
+        # switch threads often so their operations interleave
+        self._interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-5)
+
+    def tearDown(self):
+        sys.setswitchinterval(self._interval)
+
+    def stress(self, implementation: str, **options) -> None:
+        """Write from several threads while others read, then compare."""
+        hash_map = ConcurrentHashMap(40, hash_function_2, stripes=4,
+                                     implementation=implementation,
+                                     **options)
+        stable = {"stable" + str(i): i for i in range(50)}
+        hash_map.put_many(stable.items())
+        errors = []
+
+        def writer(thread):
+            for key, value in writes(thread):
+                if value is None:
+                    hash_map.remove(key)
+                else:
+                    hash_map.put(key, value)
+
+        def reader():
+            for key, value in stable.items():
+                if hash_map.get(key) != value:
+                    errors.append(key)
+
+        threads = [threading.Thread(target=writer, args=(thread,),
+                                    daemon=True) for thread in range(4)]
+        threads += [threading.Thread(target=reader, daemon=True)
+                    for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(60)
+            self.assertFalse(thread.is_alive(), "a thread hung")
+
+        # every thread writes its own keys, so replaying them in order
+        # gives what the map should hold
+        expected = dict(stable)
+        for thread in range(4):
+            for key, value in writes(thread):
+                if value is None:
+                    expected.pop(key, None)
+                else:
+                    expected[key] = value
+
+        self.assertEqual(errors, [])
+        self.assertEqual(hash_map.get_size(), len(expected))
+        values = hash_map.get_many(list(expected))
+        self.assertEqual([values[i] for i in range(values.length())],
+                         list(expected.values()))
+
+    def test_default_stripes(self):
+        hash_map = ConcurrentHashMap(40, hash_function_2)
+        self.assertEqual(hash_map._stripes[0]._capacity_policy,
+                         "power_of_two")
+        self.stress("oa")
+
+    def test_other_stripes(self):
+        self.stress("sc", max_load_factor=1.0)
+        self.stress("oa", probing="robin_hood")
+        self.stress("oa", storage="compact")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Tests for the memory-mapped HashMap, each in a tmp_path
+#              directory of its own.
+
+
+import os
+
+import pytest
+
+from a6_include import (builtin_hash, fnv1a_hash, hash_function_1,
+                        hash_function_2, seeded_hash)
+from hash_map_mmap import MappedHashMap
+
+
+PAIRS = [("k" + str(i), {"value": i}) for i in range(200)]
+PAIRS += [("é\U0001f600", None), ("", [1, "two"])]
+
+
+def build(path, function=hash_function_2, capacity: int = 16) -> dict:
+    """Fill a new table at path and return the pairs it should hold."""
+    expected = dict(PAIRS)
+    with MappedHashMap(str(path), function, capacity) as hash_map:
+        for key, value in PAIRS:
+            hash_map.put(key, value)
+        for i in range(0, 200, 7):
+            hash_map.remove("k" + str(i))
+            del expected["k" + str(i)]
+        hash_map.put("k1", "updated with a longer value than before")
+        expected["k1"] = "updated with a longer value than before"
+    return expected
+
+
+def contents(hash_map: MappedHashMap) -> dict:
+    """Return every pair of the map as a dict."""
+    keys = hash_map.get_keys()
+    return {keys[i]: hash_map.get(keys[i]) for i in range(keys.length())}
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "map.hmap"
+    expected = build(path)
+
+    with MappedHashMap(str(path), hash_function_2) as hash_map:
+        assert contents(hash_map) == expected
+        assert hash_map.get_size() == len(expected)
+        assert hash_map.get("k7") is None
+        assert not hash_map.contains_key("k7")
+        assert hash_map.contains_key("")
+
+
+def test_reopen_keeps_changes(tmp_path):
+    path = tmp_path / "map.hmap"
+    expected = build(path)
+
+    with MappedHashMap(str(path), hash_function_2) as hash_map:
+        hash_map.put("added", 1)
+        hash_map.remove("k2")
+    expected["added"] = 1
+    del expected["k2"]
+
+    with MappedHashMap(str(path), hash_function_2) as hash_map:
+        assert contents(hash_map) == expected
+
+
+def test_resize_and_clear(tmp_path):
+    path = tmp_path / "map.hmap"
+    expected = build(path)
+
+    with MappedHashMap(str(path), hash_function_2) as hash_map:
+        capacity = hash_map.get_capacity()
+        hash_map.resize_table(capacity * 4)
+        assert hash_map.get_capacity() == capacity * 4
+        assert contents(hash_map) == expected
+        assert hash_map.empty_buckets(include_tombstones=False) == \
+            hash_map.get_capacity() - len(expected)
+
+        # too small a capacity is rounded up to keep the max load
+        hash_map.resize_table(len(expected))
+        assert hash_map.table_load() < 0.5
+        assert contents(hash_map) == expected
+
+    assert not os.path.exists(str(path) + ".tmp")
+    with MappedHashMap(str(path), hash_function_2) as hash_map:
+        assert contents(hash_map) == expected
+        hash_map.clear()
+        assert hash_map.get_size() == 0
+        assert hash_map.get("k1") is None
+
+
+def test_rejects_another_hash_function(tmp_path):
+    path = tmp_path / "map.hmap"
+    build(path)
+
+    # the same name doesn't help a function that hashes differently
+    def hash_function_2_lookalike(key):
+        return hash_function_1(key)
+    hash_function_2_lookalike.__name__ = "hash_function_2"
+
+    for function in (hash_function_1, hash_function_2_lookalike,
+                     seeded_hash(fnv1a_hash, 1)):
+        with pytest.raises(ValueError):
+            MappedHashMap(str(path), function)
+
+    # while a function that hashes the same way opens it
+    def same_hashes(key):
+        return hash_function_2(key)
+
+    with MappedHashMap(str(path), same_hashes) as hash_map:
+        assert hash_map.get("k3") == {"value": 3}
+
+
+def test_rejects_unidentifiable_functions(tmp_path):
+    for function in (builtin_hash, lambda key: str(key), lambda key: True):
+        with pytest.raises(ValueError):
+            MappedHashMap(str(tmp_path / "map.hmap"), function)
+    assert not (tmp_path / "map.hmap").exists()
+
+
+@pytest.mark.parametrize("length", [0, 10, 75, 200, 1000])
+def test_truncated_file(tmp_path, length):
+    path = tmp_path / "map.hmap"
+    build(path)
+    with open(str(path), "r+b") as file:
+        file.truncate(length)
+
+    with pytest.raises(ValueError):
+        MappedHashMap(str(path), hash_function_2)
+
+
+def test_corrupt_header(tmp_path):
+    path = tmp_path / "map.hmap"
+    build(path)
+    original = path.read_bytes()
+
+    # magic, capacity (not a power of two) and end of the heap
+    for offset, damage in ((0, b"XMAP"), (8, b"\x03"), (32, b"\xff" * 8)):
+        data = bytearray(original)
+        data[offset:offset + len(damage)] = damage
+        path.write_bytes(bytes(data))
+        with pytest.raises(ValueError):
+            MappedHashMap(str(path), hash_function_2)
+
+    path.write_bytes(b"not a hash table, but long enough to hold a header" * 4)
+    with pytest.raises(ValueError):
+        MappedHashMap(str(path), hash_function_2)
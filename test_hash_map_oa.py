@@ -0,0 +1,362 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Tests for the open addressing HashMap.
+
+
+import random
+import unittest
+
+from a6_include import (fnv1a_hash, hash_function_1, hash_function_2,
+                        xxh64_hash)
+from hash_map_oa import GroupProbingHashMap, HashMap, RobinHoodHashMap
+from map_checks import (check_iteration_guard, check_snapshots,
+                        check_variants, finishes, number_hash)
+
+
+class TestStorage(unittest.TestCase):
+
+    def test_matches_dict(self):
+        check_variants(self, HashMap, 5, [{}, {"storage": "compact"}])
+
+
+class TestIncrementalRehash(unittest.TestCase):
+
+    def test_matches_dict(self):
+        check_variants(self, HashMap, 5, [
+            {"rehash_step": 1},
+            {"rehash_step": 2},
+            {"storage": "compact", "rehash_step": 3},
+        ])
+
+
+class TestProbingEngines(unittest.TestCase):
+
+    def test_matches_dict(self):
+        check_variants(self, HashMap, 5, [
+            {"probing": "robin_hood"},
+            {"probing": "robin_hood", "rehash_step": 2},
+            {"probing": "group"},
+            {"probing": "group", "rehash_step": 2},
+        ])
+
+    def test_probing_picks_the_class(self):
+        self.assertIsInstance(HashMap(5, hash_function_1,
+                                      probing="robin_hood"),
+                              RobinHoodHashMap)
+        self.assertIsInstance(HashMap(5, hash_function_1, probing="group"),
+                              GroupProbingHashMap)
+        with self.assertRaises(ValueError):
+            HashMap(5, hash_function_1, probing="cuckoo")
+
+    def test_robin_hood_leaves_no_tombstones(self):
+        hash_map = HashMap(8, hash_function_1, probing="robin_hood")
+        for key in ("ab", "ba", "c", "d"):
+            hash_map.put(key, key)
+        hash_map.remove("ab")
+        hash_map.remove("c")
+        self.assertEqual(hash_map.tombstone_stats()["tombstones"], 0)
+        self.assertEqual(sorted(hash_map.keys()), ["ba", "d"])
+
+
+class TestCapacityPolicies(unittest.TestCase):
+
+    def test_matches_dict(self):
+        check_variants(self, HashMap, 5, [
+            {"capacity_policy": "prime"},
+            {"capacity_policy": "power_of_two"},
+            {"capacity_policy": "power_of_two", "rehash_step": 2},
+            {"capacity_policy": "power_of_two", "storage": "compact",
+             "rehash_step": 1},
+        ])
+
+    def test_capacities_are_rounded(self):
+        hash_map = HashMap(10, hash_function_1, capacity_policy="prime")
+        self.assertEqual(hash_map.get_capacity(), 11)
+        hash_map.resize_table(20)
+        self.assertEqual(hash_map.get_capacity(), 23)
+
+        hash_map = HashMap(10, hash_function_1,
+                           capacity_policy="power_of_two")
+        self.assertEqual(hash_map.get_capacity(), 16)
+        hash_map.resize_table(20)
+        self.assertEqual(hash_map.get_capacity(), 32)
+
+    def test_every_bucket_is_reachable(self):
+        # every key hashes to 0, so its probe has to reach every bucket
+        for policy in ("prime", "power_of_two"):
+            hash_map = HashMap(4, lambda key: 0, capacity_policy=policy)
+            for i in range(40):
+                hash_map.put(str(i), i)
+            self.assertEqual(dict(hash_map.items()),
+                             {str(i): i for i in range(40)}, policy)
+
+    def test_rejects_bad_policies(self):
+        with self.assertRaises(ValueError):
+            HashMap(5, hash_function_1, capacity_policy="odd")
+        with self.assertRaises(ValueError):
+            HashMap(5, hash_function_1, capacity_policy="prime",
+                    max_load=0.75)
+        with self.assertRaises(ValueError):
+            HashMap(5, hash_function_1, capacity_policy="prime",
+                    probing="group")
+
+
+class TestPresizing(unittest.TestCase):
+
+    VARIANTS = [{}, {"storage": "compact"},
+                {"probing": "robin_hood"}, {"probing": "group"},
+                {"capacity_policy": "prime"}, {"rehash_step": 2}]
+
+    def test_from_items(self):
+        pairs = [("k" + str(i), i) for i in range(300)]
+        for options in self.VARIANTS:
+            with self.subTest(options=options):
+                hash_map = HashMap.from_items(iter(pairs), hash_function_2,
+                                              expected_size=300, **options)
+                self.assertEqual(dict(hash_map.items()), dict(pairs))
+
+                # fewer pairs than expected shrink the table to fit
+                small = HashMap.from_items(pairs[:10], hash_function_2,
+                                           expected_size=300, **options)
+                self.assertEqual(dict(small.items()), dict(pairs[:10]))
+                self.assertLess(small.get_capacity(),
+                                hash_map.get_capacity())
+
+    def test_reserve_avoids_resizes(self):
+        for options in self.VARIANTS:
+            with self.subTest(options=options):
+                hash_map = HashMap(1, hash_function_2, stats=True,
+                                   **options)
+                hash_map.reserve(500)
+                capacity = hash_map.get_capacity()
+                for i in range(500):
+                    hash_map.put("k" + str(i), i)
+                self.assertEqual(hash_map.get_capacity(), capacity)
+                self.assertEqual(hash_map.stats()["resizes"], 1)
+
+                for i in range(450):
+                    hash_map.remove("k" + str(i))
+                hash_map.shrink_to_fit()
+                self.assertLess(hash_map.get_capacity(), capacity)
+                self.assertEqual(hash_map.get_size(), 50)
+
+    def test_reserve_rejects_negative_sizes(self):
+        with self.assertRaises(ValueError):
+            HashMap(1, hash_function_2).reserve(-1)
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def test_round_trip(self):
+        check_snapshots(self, HashMap, [
+            {}, {"storage": "compact"}, {"probing": "robin_hood"},
+            {"probing": "group"}, {"capacity_policy": "power_of_two"},
+            {"rehash_step": 1}, {"storage": "compact", "rehash_step": 1},
+        ])
+
+
+class TestSeeding(unittest.TestCase):
+
+    def test_matches_dict(self):
+        check_variants(self, HashMap, 5, [
+            {"seed": 7}, {"seed": "random", "storage": "compact"},
+            {"seed": 7, "probing": "robin_hood"},
+            {"seed": 7, "capacity_policy": "power_of_two",
+             "rehash_step": 1},
+        ], functions=(fnv1a_hash, xxh64_hash))
+
+    def test_same_seed_same_placement(self):
+        maps = [HashMap(5, fnv1a_hash, seed=seed)
+                for seed in (5, 5, 6)]
+        for hash_map in maps:
+            for i in range(40):
+                hash_map.put("k" + str(i), i)
+        self.assertEqual(list(maps[0].keys()), list(maps[1].keys()))
+        self.assertNotEqual(list(maps[0].keys()), list(maps[2].keys()))
+
+    def test_functions_without_a_seed_are_rejected(self):
+        with self.assertRaises(ValueError):
+            HashMap(5, hash_function_1, seed=5)
+
+
+class TestProbeBounds(unittest.TestCase):
+
+    def test_put_during_incremental_rehash_finishes(self):
+        # the old table of capacity 7 is full along the probe of 'M'
+        for storage in ("entries", "compact"):
+            hash_map = HashMap(7, hash_function_1, rehash_step=1,
+                               storage=storage)
+
+            def put_all():
+                for key in "FGHJM":
+                    hash_map.put(key, key.lower())
+
+            self.assertTrue(finishes(put_all), storage)
+            self.assertEqual(hash_map.get_capacity(), 14)
+            for key in "FGHJM":
+                self.assertEqual(hash_map.get(key), key.lower())
+
+    def test_move_with_no_reachable_open_bucket_grows(self):
+        # puts fill every bucket the probe of the new table can reach
+        # before the incremental rehash moves an old entry into it
+        for storage in ("entries", "compact"):
+            hash_map = HashMap(1, hash_function_1, rehash_step=1,
+                               storage=storage)
+
+            def run():
+                hash_map.put("5", 0)
+                hash_map.put("19", 2)
+                hash_map.get("32")
+                hash_map.get("34")
+                hash_map.put("32", 8)
+                hash_map.get("2")
+                hash_map.contains_key("2")
+
+            self.assertTrue(finishes(run), storage)
+            self.assertEqual(dict(hash_map.items()),
+                             {"5": 0, "19": 2, "32": 8})
+
+    def test_lookup_with_no_reachable_open_bucket_finishes(self):
+        # buckets 0, 1, 2 and 4 are all quadratic probing reaches from 0
+        for storage in ("entries", "compact"):
+            hash_map = HashMap(7, lambda key: int(key[1:]), storage=storage,
+                               max_load=0.9)
+            for key in ("k0", "k1", "k2", "k4"):
+                hash_map.put(key, key)
+
+            self.assertTrue(finishes(lambda: hash_map.get("k7")), storage)
+            self.assertIsNone(hash_map.get("k7"))
+
+    def test_put_with_no_reachable_open_bucket_grows(self):
+        for storage in ("entries", "compact"):
+            hash_map = HashMap(7, lambda key: int(key[1:]), storage=storage,
+                               max_load=0.9)
+            for key in ("k0", "k1", "k2", "k4"):
+                hash_map.put(key, key)
+
+            self.assertTrue(finishes(lambda: hash_map.put("k7", "k7")),
+                            storage)
+            for key in ("k0", "k1", "k2", "k4", "k7"):
+                self.assertEqual(hash_map.get(key), key)
+            self.assertEqual(hash_map.get_size(), 5)
+
+
+class TestStats(unittest.TestCase):
+
+    def workload(self, **options) -> dict:
+        """Run a small workload of known probes and return the stats."""
+        # k0, k8 and k16 all start probing at bucket 0 of 8
+        hash_map = HashMap(8, number_hash, stats=True, **options)
+        for i in (0, 8, 16, 1):
+            hash_map.put("k" + str(i), i)
+        hash_map.get("k16")
+        hash_map.get("k24")
+        hash_map.contains_key("k1")
+        hash_map.remove("k8")
+        hash_map.get("k16")
+        return hash_map.stats()
+
+    def test_counts_a_known_workload(self):
+        for storage in ("entries", "compact"):
+            with self.subTest(storage=storage):
+                stats = self.workload(storage=storage)
+                self.assertEqual(stats["operations"],
+                                 {"put": 4, "get": 3, "contains_key": 1,
+                                  "remove": 1})
+                self.assertEqual((stats["hits"], stats["misses"]), (4, 1))
+
+                # buckets 0, 1 and 4 are all the probe of k24 can reach,
+                # so its miss takes a probe per bucket of the table
+                self.assertEqual(stats["probe_lengths"]["histogram"],
+                                 {1: 1, 2: 4, 3: 3, 8: 1})
+                self.assertEqual(stats["probe_lengths"]["max"], 8)
+                self.assertEqual((stats["tombstones"], stats["resizes"],
+                                  stats["compactions"]), (1, 0, 0))
+
+    def test_counts_robin_hood_probes(self):
+        # linear probes, and removing k8 shifts k16 and k1 back a bucket
+        stats = self.workload(probing="robin_hood")
+        self.assertEqual(stats["probe_lengths"]["histogram"],
+                         {1: 1, 2: 3, 3: 4, 4: 1})
+        self.assertEqual((stats["hits"], stats["misses"]), (4, 1))
+
+    def test_counts_resizes_and_compactions(self):
+        hash_map = HashMap(8, number_hash, stats=True)
+        for i in range(7):
+            hash_map.put("k" + str(i), i)
+            hash_map.remove("k" + str(i))
+
+        # the seventh put found 6 tombstones, 0.75 of the table
+        stats = hash_map.stats()
+        self.assertEqual((stats["compactions"], stats["resizes"]), (1, 1))
+        self.assertEqual((stats["tombstones"], stats["capacity"]), (1, 8))
+
+        # the fifth put doubles the table, holding half of it already
+        for i in range(8):
+            hash_map.put("k" + str(i), i)
+        self.assertEqual(hash_map.get_capacity(), 16)
+        hash_map.resize_table(64)
+        stats = hash_map.stats()
+        self.assertEqual((stats["compactions"], stats["resizes"]), (1, 3))
+        self.assertEqual(stats["capacity"], 64)
+
+
+class TestEmptyBuckets(unittest.TestCase):
+
+    def test_counts_match_a_scan_of_the_table(self):
+        variants = [{}, {"rehash_step": 2}, {"storage": "compact"},
+                    {"probing": "robin_hood"}, {"probing": "group"},
+                    {"capacity_policy": "power_of_two"}]
+        rng = random.Random(0)
+
+        for options in variants:
+            with self.subTest(options=options):
+                hash_map = HashMap(7, hash_function_2, **options)
+                for step in range(1500):
+                    key = "k" + str(rng.randrange(120))
+                    choice = rng.random()
+                    if choice < 0.5:
+                        hash_map.put(key, step)
+                    elif choice < 0.95:
+                        hash_map.remove(key)
+                    else:
+                        hash_map.resize_table(rng.randrange(1, 300))
+
+                    if step % 25 == 0:
+                        empty = hash_map.empty_buckets()
+                        open_buckets = hash_map.empty_buckets(
+                            include_tombstones=False)
+
+                        # count live entries and tombstones bucket by bucket
+                        buckets = [hash_map._buckets[i] for i
+                                   in range(hash_map.get_capacity())]
+                        live = sum(entry is not None and
+                                   not entry.is_tombstone
+                                   for entry in buckets)
+                        tombstones = sum(entry is not None and
+                                         entry.is_tombstone
+                                         for entry in buckets)
+
+                        self.assertEqual(live, hash_map.get_size())
+                        self.assertEqual(empty, len(buckets) - live)
+                        self.assertEqual(open_buckets,
+                                         len(buckets) - live - tombstones)
+                        self.assertEqual(
+                            hash_map.tombstone_stats()["tombstones"],
+                            tombstones)
+
+
+class TestIteration(unittest.TestCase):
+
+    def test_changes_during_iteration_raise(self):
+        for options in ({}, {"rehash_step": 2}, {"storage": "compact"},
+                        {"probing": "robin_hood"}, {"probing": "group"}):
+            with self.subTest(options=options):
+                check_iteration_guard(
+                    self, lambda: HashMap.from_items(
+                        [("k" + str(i), i) for i in range(20)],
+                        hash_function_2, **options))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,319 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Tests for the separate chaining HashMap.
+
+
+import random
+import unittest
+
+from a6_include import (HashEntry, SLNode, TreeChain, fnv1a_hash,
+                        hash_function_1, hash_function_2, xxh64_hash)
+from hash_map_sc import FrequencyCounter, HashMap
+from map_checks import (check_iteration_guard, check_snapshots,
+                        check_variants, number_hash)
+
+
+class TestAgainstDict(unittest.TestCase):
+
+    def test_matches_dict(self):
+        check_variants(self, HashMap, 3, [{}])
+
+
+class TestGrowthPolicy(unittest.TestCase):
+
+    def test_matches_dict(self):
+        check_variants(self, HashMap, 3, [
+            {"max_load_factor": 1.0, "min_load_factor": 0.25},
+            {"max_load_factor": 2, "growth_factor": 3, "min_capacity": 5},
+        ])
+
+    def test_grows_and_shrinks_with_the_load(self):
+        hash_map = HashMap(4, hash_function_1, max_load_factor=1.0,
+                           min_load_factor=0.25, min_capacity=4)
+        for i in range(100):
+            hash_map.put(str(i), i)
+            self.assertLessEqual(hash_map.table_load(), 1.0)
+        self.assertEqual(hash_map.get_capacity(), 128)
+
+        for i in range(100):
+            hash_map.remove(str(i))
+        self.assertEqual(hash_map.get_capacity(), 4)
+
+    def test_fixed_capacity_without_a_policy(self):
+        hash_map = HashMap(4, hash_function_1)
+        for i in range(100):
+            hash_map.put(str(i), i)
+        self.assertEqual(hash_map.get_capacity(), 4)
+
+    def test_rejects_a_thrashing_policy(self):
+        with self.assertRaises(ValueError):
+            HashMap(4, hash_function_1, max_load_factor=1.0,
+                    min_load_factor=0.75)
+        with self.assertRaises(ValueError):
+            HashMap(4, hash_function_1, growth_factor=1)
+
+
+class TestIncrementalRehash(unittest.TestCase):
+
+    def test_matches_dict(self):
+        check_variants(self, HashMap, 3, [
+            {"max_load_factor": 1.0, "min_load_factor": 0.25,
+             "rehash_step": 1},
+            {"max_load_factor": 1.0, "min_load_factor": 0.25,
+             "rehash_step": 2},
+        ])
+
+
+class TestNodeReuse(unittest.TestCase):
+
+    def test_matches_dict(self):
+        check_variants(self, HashMap, 3, [
+            {"free_list_size": 16},
+            {"max_load_factor": 2, "free_list_size": 1},
+            {"max_load_factor": 1.0, "min_load_factor": 0.25,
+             "rehash_step": 1, "free_list_size": 4},
+        ])
+
+    def test_removed_node_is_reused(self):
+        hash_map = HashMap(1, hash_function_1, free_list_size=1)
+        hash_map.put("a", 1)
+        node = hash_map._buckets[0].contains("a")
+        hash_map.remove("a")
+        hash_map.put("b", 2)
+        self.assertIs(hash_map._buckets[0].contains("b"), node)
+        self.assertEqual((node.key, node.value), ("b", 2))
+
+    def test_nodes_have_no_dict(self):
+        self.assertFalse(hasattr(SLNode("a", 1), "__dict__"))
+        self.assertFalse(hasattr(HashEntry("a", 1), "__dict__"))
+
+
+class TestPresizing(unittest.TestCase):
+
+    VARIANTS = [{}, {"max_load_factor": 1.0, "min_load_factor": 0.25},
+                {"max_load_factor": 2, "rehash_step": 2}]
+
+    def test_from_items(self):
+        pairs = [("k" + str(i), i) for i in range(300)]
+        for options in self.VARIANTS:
+            with self.subTest(options=options):
+                hash_map = HashMap.from_items(iter(pairs), hash_function_2,
+                                              expected_size=300, **options)
+                self.assertEqual(dict(hash_map.items()), dict(pairs))
+
+                # fewer pairs than expected shrink the table to fit
+                small = HashMap.from_items(pairs[:10], hash_function_2,
+                                           expected_size=300, **options)
+                self.assertEqual(dict(small.items()), dict(pairs[:10]))
+                self.assertLess(small.get_capacity(),
+                                hash_map.get_capacity())
+
+    def test_reserve_avoids_resizes(self):
+        for options in self.VARIANTS:
+            with self.subTest(options=options):
+                hash_map = HashMap(1, hash_function_2, stats=True,
+                                   **options)
+                hash_map.reserve(500)
+                capacity = hash_map.get_capacity()
+                for i in range(500):
+                    hash_map.put("k" + str(i), i)
+                self.assertEqual(hash_map.get_capacity(), capacity)
+                self.assertEqual(hash_map.stats()["resizes"], 1)
+
+                for i in range(450):
+                    hash_map.remove("k" + str(i))
+                hash_map.shrink_to_fit()
+                self.assertLess(hash_map.get_capacity(), capacity)
+                self.assertEqual(hash_map.get_size(), 50)
+
+    def test_reserve_rejects_negative_sizes(self):
+        with self.assertRaises(ValueError):
+            HashMap(1, hash_function_2).reserve(-1)
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def test_round_trip(self):
+        check_snapshots(self, HashMap, [
+            {}, {"max_load_factor": 1.0, "min_load_factor": 0.25},
+            {"max_load_factor": 1.0, "rehash_step": 1},
+            {"free_list_size": 4},
+        ])
+
+
+class TestSeeding(unittest.TestCase):
+
+    def test_matches_dict(self):
+        check_variants(self, HashMap, 3, [
+            {"seed": 7, "max_load_factor": 1.0},
+            {"seed": "random", "treeify_threshold": 3},
+        ], functions=(fnv1a_hash, xxh64_hash))
+
+    def test_same_seed_same_placement(self):
+        maps = [HashMap(3, fnv1a_hash, seed=seed, max_load_factor=1.0)
+                for seed in (5, 5, 6)]
+        for hash_map in maps:
+            for i in range(40):
+                hash_map.put("k" + str(i), i)
+        self.assertEqual(list(maps[0].keys()), list(maps[1].keys()))
+        self.assertNotEqual(list(maps[0].keys()), list(maps[2].keys()))
+
+    def test_functions_without_a_seed_are_rejected(self):
+        with self.assertRaises(ValueError):
+            HashMap(3, hash_function_1, seed=5)
+
+
+class TestNodes(unittest.TestCase):
+
+    def test_nodes_survive_resizes_and_trees(self):
+        class TaggedNode(SLNode):
+            __slots__ = ("tag",)
+
+        hash_map = HashMap(2, hash_function_1, max_load_factor=1.0,
+                           treeify_threshold=2, node_class=TaggedNode)
+        node = hash_map.put_node("abc", 1)
+        node.tag = "kept"
+        self.assertIsInstance(node, TaggedNode)
+        self.assertIs(hash_map.put_node("abc", 2), node)
+
+        # the anagrams of "abc" share its chain, which becomes a tree,
+        # and the other keys make the table grow
+        for key in ["acb", "bac", "bca", "cab", "cba", "x", "y", "z"]:
+            hash_map.put(key, key)
+        index = hash_function_1("abc") % hash_map.get_capacity()
+        self.assertIsInstance(hash_map._buckets[index], TreeChain)
+        self.assertIs(hash_map.get_node("abc"), node)
+        self.assertEqual((node.value, node.tag), (2, "kept"))
+        self.assertIsNone(hash_map.get_node("missing"))
+
+
+class TestTreeify(unittest.TestCase):
+
+    def test_long_chains_become_trees_and_back(self):
+        # every anagram hashes alike under hash_function_1
+        keys = ["abcd", "abdc", "acbd", "acdb", "adbc", "adcb", "bacd"]
+        hash_map = HashMap(4, hash_function_1, treeify_threshold=4)
+        for key in keys:
+            hash_map.put(key, key)
+
+        index = hash_function_1(keys[0]) % 4
+        self.assertIsInstance(hash_map._buckets[index], TreeChain)
+        for key in keys:
+            self.assertEqual(hash_map.get(key), key)
+
+        for key in keys[2:]:
+            hash_map.remove(key)
+        self.assertNotIsInstance(hash_map._buckets[index], TreeChain)
+        self.assertEqual(sorted(hash_map.keys()), sorted(keys[:2]))
+
+
+class TestFrequencyCounter(unittest.TestCase):
+
+    def test_amount_must_be_positive(self):
+        counter = FrequencyCounter(["x", "y"])
+        for amount in (0, -1):
+            with self.assertRaises(ValueError):
+                counter.add("x", amount)
+
+        modes, frequency = counter.mode()
+        self.assertEqual(sorted(modes[i] for i in range(modes.length())),
+                         ["x", "y"])
+        self.assertEqual(frequency, 1)
+        self.assertEqual(counter.total(), 2)
+
+    def test_add_amount(self):
+        counter = FrequencyCounter()
+        counter.add("x", 3)
+        counter.update(["y", "y"])
+        self.assertEqual(counter.count("x"), 3)
+        modes, frequency = counter.mode()
+        self.assertEqual((modes.length(), modes[0], frequency), (1, "x", 3))
+
+
+class TestStats(unittest.TestCase):
+
+    def test_counts_a_known_workload(self):
+        # k<n> goes to bucket n % 5, and nothing grows the table
+        hash_map = HashMap(5, number_hash, stats=True)
+        for i in range(4):
+            hash_map.put("k" + str(i), i)
+        hash_map.get("k0")
+        hash_map.get("k5")
+        hash_map.get("k1")
+        hash_map.contains_key("k9")
+        hash_map.remove("k2")
+        hash_map.remove("k2")
+        hash_map.get_many(["k3", "k8"])
+
+        stats = hash_map.stats()
+        self.assertEqual(stats["operations"], {"put": 4, "get": 5,
+                                               "contains_key": 1,
+                                               "remove": 2})
+        self.assertEqual((stats["hits"], stats["misses"]), (4, 4))
+
+        # the puts saw empty chains, the lookups chains of 0 or 1 pair
+        self.assertEqual(stats["chain_lengths"],
+                         {"histogram": {0: 6, 1: 6}, "mean": 0.5, "max": 1})
+        self.assertEqual((stats["resizes"], stats["compactions"]), (0, 0))
+        self.assertEqual((stats["size"], stats["capacity"]), (3, 5))
+
+    def test_counts_resizes(self):
+        for rehash_step in (None, 1):
+            hash_map = HashMap(4, number_hash, stats=True,
+                               max_load_factor=1.0, rehash_step=rehash_step)
+            for i in range(9):
+                hash_map.put("k" + str(i), i)
+            self.assertEqual(hash_map.get_capacity(), 16)
+            self.assertEqual(hash_map.stats()["resizes"], 2)
+
+            hash_map.resize_table(50)
+            stats = hash_map.stats()
+            self.assertEqual(stats["resizes"], 3)
+            self.assertGreaterEqual(stats["resize_seconds"], 0)
+
+    def test_disabled(self):
+        hash_map = HashMap(5, number_hash)
+        hash_map.put("k1", 1)
+        self.assertEqual(hash_map.stats(), {"enabled": False, "size": 1,
+                                            "capacity": 5, "load": 0.2})
+
+
+class TestEmptyBuckets(unittest.TestCase):
+
+    def test_count_matches_a_scan_of_the_table(self):
+        rng = random.Random(0)
+        for options in ({}, {"rehash_step": 2, "max_load_factor": 1.0,
+                             "min_load_factor": 0.25}):
+            with self.subTest(options=options):
+                hash_map = HashMap(7, hash_function_2, **options)
+                for step in range(1500):
+                    key = "k" + str(rng.randrange(120))
+                    choice = rng.random()
+                    if choice < 0.5:
+                        hash_map.put(key, step)
+                    elif choice < 0.95:
+                        hash_map.remove(key)
+                    else:
+                        hash_map.resize_table(rng.randrange(1, 300))
+
+                    if step % 25 == 0:
+                        empty = hash_map.empty_buckets()
+                        chains = [hash_map._buckets[i] for i
+                                  in range(hash_map.get_capacity())]
+                        self.assertEqual(empty, sum(chain.length() == 0
+                                                    for chain in chains))
+
+
+class TestIteration(unittest.TestCase):
+
+    def test_changes_during_iteration_raise(self):
+        for options in ({}, {"rehash_step": 2, "max_load_factor": 1.0}):
+            with self.subTest(options=options):
+                check_iteration_guard(
+                    self, lambda: HashMap.from_items(
+                        [("k" + str(i), i) for i in range(20)],
+                        hash_function_2, **options))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Tests for the sharded HashMap.
+
+
+import os
+import subprocess
+import sys
+import threading
+import unittest
+
+from a6_include import hash_function_2
+from hash_map_sharded import ShardedHashMap
+from map_checks import number_hash
+
+
+# prints where the sharded map routes a few keys
+ROUTES_SCRIPT = """
+from a6_include import hash_function_2
+from hash_map_sharded import ShardedHashMap
+with ShardedHashMap(31, hash_function_2, shards=3) as hash_map:
+    print([hash_map._shard_of("k" + str(i)) for i in range(40)])
+"""
+
+
+class TestShardedHashMap(unittest.TestCase):
+
+    def test_matches_dict(self):
+        for implementation in ("oa", "sc"):
+            with ShardedHashMap(31, hash_function_2, shards=3,
+                                implementation=implementation) as hash_map:
+                expected = {"k" + str(i): i for i in range(300)}
+                hash_map.put_many(expected.items())
+                hash_map.remove_many(["k1", "k2", "missing"])
+                del expected["k1"], expected["k2"]
+                hash_map.put("k3", "three")
+                expected["k3"] = "three"
+
+                self.assertEqual(hash_map.get_size(), len(expected))
+                keys = hash_map.get_keys()
+                self.assertEqual(
+                    sorted(keys[i] for i in range(keys.length())),
+                    sorted(expected))
+                values = hash_map.get_many(list(expected) + ["missing"])
+                self.assertEqual([values[i] for i in range(values.length())],
+                                 list(expected.values()) + [None])
+
+    def test_unpicklable_batch_leaves_pipes_in_step(self):
+        with ShardedHashMap(31, hash_function_2, shards=2) as hash_map:
+            # two keys that live on different shards
+            keys = ["k" + str(i) for i in range(20)]
+            first = keys[0]
+            second = next(key for key in keys if hash_map._shard_of(key)
+                          != hash_map._shard_of(first))
+
+            with self.assertRaises(TypeError):
+                hash_map.put_many([(first, "A"), (second, threading.Lock())])
+
+            hash_map.put(first, "A")
+            self.assertEqual(hash_map.get(first), "A")
+            self.assertIsNone(hash_map.get(second))
+            self.assertEqual(hash_map.get_size(), 1)
+
+
+    def test_dead_worker_names_its_shard(self):
+        with ShardedHashMap(31, hash_function_2, shards=2) as hash_map:
+            keys = ["k" + str(i) for i in range(20)]
+            alive = next(key for key in keys if hash_map._shard_of(key) == 0)
+            dead = next(key for key in keys if hash_map._shard_of(key) == 1)
+            hash_map.put(alive, "A")
+
+            hash_map._workers[1].terminate()
+            hash_map._workers[1].join()
+
+            for call in (lambda: hash_map.get(dead), hash_map.get_size,
+                         lambda: hash_map.put_many([(alive, "B"),
+                                                    (dead, "C")])):
+                with self.assertRaisesRegex(RuntimeError, "shard 1"):
+                    call()
+
+            # the pipe of the live shard is still in step
+            self.assertEqual(hash_map.get(alive), "B")
+
+
+class TestRouting(unittest.TestCase):
+
+    def test_routes_are_the_same_in_every_process(self):
+        outputs = set()
+        for hash_seed in ("1", "2"):
+            outputs.add(subprocess.check_output(
+                [sys.executable, "-c", ROUTES_SCRIPT],
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                env=dict(os.environ, PYTHONHASHSEED=hash_seed)))
+        self.assertEqual(len(outputs), 1)
+
+    def test_routes_ignore_the_low_bits(self):
+        # every hash is a multiple of 4, yet all 4 shards get keys
+        keys = ["k" + str(4 * i) for i in range(100)]
+        with ShardedHashMap(64, number_hash, shards=4) as hash_map:
+            hash_map.put_many((key, key) for key in keys)
+            self.assertEqual(hash_map.get_size(), 100)
+            self.assertEqual({hash_map._shard_of(key) for key in keys},
+                             {0, 1, 2, 3})
+            self.assertEqual(hash_map.get("k8"), "k8")
+
+
+if __name__ == "__main__":
+    unittest.main()
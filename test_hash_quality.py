@@ -0,0 +1,108 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Tests for the hash quality report.
+
+
+import contextlib
+import io
+import unittest
+
+from a6_include import hash_function_1, xxh64_hash
+from hash_quality import bucket_distribution, main, make_key_set
+
+
+def constant_hash(key: str) -> int:
+    """The worst hash there is, every key lands in bucket 0."""
+    return 0
+
+
+def position_hash(key: str) -> int:
+    """A perfect hash for 'str1', 'str2', ...: key n goes to bucket n."""
+    return int(key[3:])
+
+
+class TestBucketDistribution(unittest.TestCase):
+
+    def test_constant_hash(self):
+        keys = make_key_set("sequential", 10)
+        result = bucket_distribution(constant_hash, keys, 16)
+
+        # ((10 - 0.625) ** 2 + 15 * 0.625 ** 2) / 0.625
+        self.assertAlmostEqual(result["chi_square"], 150.0)
+        self.assertAlmostEqual(result["chi_square_ratio"], 10.0)
+        self.assertEqual(result["used_buckets"], 1)
+        self.assertEqual((result["max_chain"], result["mean_chain"]),
+                         (10, 10.0))
+
+        # from bucket 0 quadratic probing only reaches 0, 1, 4 and 9
+        self.assertEqual((result["max_probe"], result["mean_probe"],
+                          result["unplaced"]), (4, 2.5, 6))
+
+    def test_perfect_hash(self):
+        keys = make_key_set("sequential", 16)
+        result = bucket_distribution(position_hash, keys, 16)
+        self.assertEqual(result["chi_square"], 0.0)
+        self.assertEqual(result["used_buckets"], 16)
+        self.assertEqual((result["max_chain"], result["max_probe"],
+                          result["mean_probe"], result["unplaced"]),
+                         (1, 1, 1.0, 0))
+
+    def test_skew_shows_in_the_ratio(self):
+        # every anagram sums to the same hash_function_1 value
+        keys = make_key_set("anagrams", 100)
+        skewed = bucket_distribution(hash_function_1, keys, 200)
+        self.assertEqual(skewed["used_buckets"], 1)
+
+        uniform = bucket_distribution(xxh64_hash,
+                                      make_key_set("random", 2000), 509)
+        self.assertLess(uniform["chi_square_ratio"], 1.5)
+        self.assertGreater(skewed["chi_square_ratio"],
+                           50 * uniform["chi_square_ratio"])
+
+    def test_duplicates_and_full_tables(self):
+        result = bucket_distribution(constant_hash, ["a", "b", "a"], 1)
+        self.assertEqual((result["keys"], result["max_chain"]), (2, 2))
+        self.assertIsNone(result["chi_square_ratio"])
+        self.assertIsNone(result["max_probe"])
+
+        empty = bucket_distribution(constant_hash, [], 4)
+        self.assertEqual((empty["chi_square"], empty["mean_chain"],
+                          empty["unplaced"]), (0.0, 0.0, 0))
+
+        with self.assertRaises(ValueError):
+            bucket_distribution(constant_hash, ["a"], 0)
+
+
+class TestKeySets(unittest.TestCase):
+
+    def test_key_sets(self):
+        self.assertEqual(make_key_set("sequential", 3),
+                         ["str1", "str2", "str3"])
+        for kind in ("anagrams", "random"):
+            keys = make_key_set(kind, 50, length=6, seed=1)
+            self.assertEqual(len(set(keys)), 50)
+            self.assertTrue(all(len(key) == 6 for key in keys))
+            self.assertEqual(keys, make_key_set(kind, 50, length=6, seed=1))
+        with self.assertRaises(ValueError):
+            make_key_set("unknown", 5)
+
+    def test_report(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            status = main(["--keys", "anagrams", "--count", "40",
+                           "--functions", "hash_function_1",
+                           "hash_function_2"])
+
+        lines = output.getvalue().splitlines()
+        self.assertEqual(status, 0)
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[0].startswith("function"))
+
+        # all 40 anagrams share one bucket under hash_function_1
+        row = lines[1].split()
+        self.assertEqual((row[0], row[2], row[3]),
+                         ("hash_function_1", "1", "40"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+# Course:      CS261 - Data Structures
+# Assignment:  6
+# Description: Tests for the stream sketches.
+
+
+import collections
+import random
+import unittest
+
+from a6_include import DynamicArray
+from hash_map_sc import find_mode
+from stream_sketch import (CountMinSketch, SpaceSaving, StreamSketch,
+                           find_mode_approx)
+
+
+def skewed_stream(length: int = 20000, seed: int = 0) -> list:
+    """Return a Zipf-like stream of elements, '0' the most frequent."""
+    rng = random.Random(seed)
+    return [str(int(rng.paretovariate(1.1)) - 1) for _ in range(length)]
+
+
+def uniform_stream(length: int = 20000, seed: int = 0) -> list:
+    """Return a stream of 500 elements that are about equally frequent."""
+    rng = random.Random(seed)
+    return [str(rng.randrange(500)) for _ in range(length)]
+
+
+class TestCountMinSketch(unittest.TestCase):
+
+    def test_only_overestimates(self):
+        for stream in (skewed_stream(), uniform_stream()):
+            sketch = CountMinSketch(64, 4)
+            for element in stream:
+                sketch.add(element)
+            frequencies = collections.Counter(stream)
+
+            bound = sketch.error_bounds()["max_overestimate"]
+            over_bound = 0
+            for element, frequency in frequencies.items():
+                estimate = sketch.estimate(element)
+                self.assertGreaterEqual(estimate, frequency)
+                over_bound += estimate - frequency > bound
+
+            # at most delta of the estimates may go over the bound
+            self.assertLessEqual(over_bound / len(frequencies),
+                                 sketch.error_bounds()["delta"])
+            self.assertEqual(sketch.total(), len(stream))
+
+    def test_from_error(self):
+        sketch = CountMinSketch.from_error(0.01, 0.01)
+        bounds = sketch.error_bounds()
+        self.assertLessEqual(bounds["epsilon"], 0.01)
+        self.assertLessEqual(bounds["delta"], 0.01)
+        with self.assertRaises(ValueError):
+            CountMinSketch.from_error(0, 0.5)
+        with self.assertRaises(ValueError):
+            CountMinSketch(0, 1)
+
+
+class TestSpaceSaving(unittest.TestCase):
+
+    def test_frequent_elements_stay_monitored(self):
+        for stream in (skewed_stream(), uniform_stream()):
+            tracker = SpaceSaving(50)
+            for element in stream:
+                tracker.add(element)
+            frequencies = collections.Counter(stream)
+            monitored = {element: (count, error) for element, count, error
+                         in tracker.candidates()}
+            self.assertEqual(len(monitored), 50)
+
+            for element, frequency in frequencies.items():
+                if frequency > tracker.total() / tracker.capacity():
+                    self.assertIn(element, monitored)
+            for element, (count, error) in monitored.items():
+                self.assertLessEqual(count - error, frequencies[element])
+                self.assertGreaterEqual(count, frequencies[element])
+                self.assertLessEqual(error, tracker.max_error())
+                self.assertEqual(tracker.count(element), (count, error))
+
+    def test_counts_are_exact_below_capacity(self):
+        tracker = SpaceSaving(10)
+        for element in "abracadabra":
+            tracker.add(element)
+        tracker.add("z", 4)
+        self.assertEqual(tracker.candidates()[:2],
+                         [("a", 5, 0), ("z", 4, 0)])
+        self.assertEqual(tracker.count("missing"), (0, 0))
+        self.assertEqual(tracker.max_error(), 0)
+
+
+class TestStreamSketch(unittest.TestCase):
+
+    def test_bounds_hold_the_true_frequency(self):
+        stream = skewed_stream()
+        sketch = StreamSketch(stream, capacity=30, width=256, depth=4)
+        frequencies = collections.Counter(stream)
+        for element, frequency in frequencies.most_common(30):
+            low, high = sketch.bounds(element)
+            self.assertLessEqual(low, frequency)
+            self.assertGreaterEqual(high, frequency)
+
+        top = sketch.top_k(3)
+        self.assertEqual([top[i][0] for i in range(top.length())],
+                         [element for element, _
+                          in frequencies.most_common(3)])
+
+    def test_find_mode_approx_matches_find_mode(self):
+        for stream in (skewed_stream(seed=1), skewed_stream(seed=2)):
+            mode, frequency = find_mode(DynamicArray(stream))
+            approx, estimate = find_mode_approx(DynamicArray(stream),
+                                                capacity=20, width=512)
+            self.assertEqual(approx.length(), 1)
+            self.assertEqual(approx[0], mode[0])
+            self.assertGreaterEqual(estimate, frequency)
+            self.assertLessEqual(estimate - frequency,
+                                 StreamSketch(stream, 20, 512)
+                                 .error_bounds()["max_overestimate"])
+
+    def test_empty_stream(self):
+        mode, frequency = find_mode_approx(iter(()))
+        self.assertEqual((mode.length(), frequency), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()